@@ -0,0 +1,281 @@
+"""
+本地淘宝网关模拟服务
+
+按序号即时生成订单数据（不占内存，可模拟上百万订单），支持
+taobao.trades.sold.get、taobao.trades.sold.increment.get、
+taobao.trade.fullinfo.get，可配置延迟、每页上限和错误注入。
+TaobaoClient 将 api_url 指向本服务即可使用。
+
+用法：
+    python -m benchmarks.fake_taobao_gateway --port 8765 --trades 1000000 --latency-ms 300
+"""
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 淘宝订单状态，按订单序号轮换
+TRADE_STATUSES = [
+    "WAIT_SELLER_SEND_GOODS",
+    "WAIT_BUYER_CONFIRM_GOODS",
+    "TRADE_FINISHED",
+    "TRADE_CLOSED",
+    "TRADE_CLOSED_BY_TAOBAO"
+]
+
+class GatewayConfig:
+    """模拟网关配置"""
+    
+    def __init__(
+        self,
+        trades: int = 100000,
+        span_days: int = 7,
+        latency_ms: float = 0,
+        latency_jitter_ms: float = 0,
+        max_page_size: int = 100,
+        error_rate: float = 0,
+        http_error_rate: float = 0,
+        modified_lag_seconds: int = 600,
+        seller_nick: str = "bench_shop",
+        end_time: Optional[datetime] = None
+    ):
+        """
+        Args:
+            trades: 订单总数
+            span_days: 订单下单时间分布的天数（截止到 end_time）
+            latency_ms: 每次请求的固定延迟（毫秒）
+            latency_jitter_ms: 延迟随机抖动上限（毫秒）
+            max_page_size: 每页最大订单数
+            error_rate: 返回淘宝限流错误（code 7）的概率
+            http_error_rate: 返回 HTTP 502 的概率
+            modified_lag_seconds: 订单修改时间相对下单时间的延后秒数
+            seller_nick: 卖家昵称（店铺ID）
+            end_time: 最后一笔订单的下单时间，默认当前时间
+        """
+        self.trades = trades
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.max_page_size = max_page_size
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.modified_lag = timedelta(seconds=modified_lag_seconds)
+        self.seller_nick = seller_nick
+        self.end_time = end_time or datetime.now().replace(microsecond=0)
+        self.start_time = self.end_time - timedelta(days=span_days)
+        self.interval = (self.end_time - self.start_time).total_seconds() / max(trades, 1)
+
+class FakeTaobaoGateway:
+    """模拟网关的数据生成与接口实现"""
+    
+    def __init__(self, config: GatewayConfig):
+        self.config = config
+        self.requests = 0
+        self._lock = threading.Lock()
+    
+    def created_at(self, index: int) -> datetime:
+        """第 index 笔订单的下单时间"""
+        return self.config.start_time + timedelta(seconds=int(index * self.config.interval))
+    
+    def index_range(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        """下单时间在 [start, end] 内的订单序号范围 [first, last)"""
+        interval = self.config.interval or 1
+        first = math.ceil((start - self.config.start_time).total_seconds() / interval)
+        last = math.floor((end - self.config.start_time).total_seconds() / interval) + 1
+        first = max(first, 0)
+        last = min(last, self.config.trades)
+        return first, max(first, last)
+    
+    def make_trade(self, index: int) -> dict:
+        """按序号生成订单"""
+        created = self.created_at(index)
+        status = TRADE_STATUSES[index % len(TRADE_STATUSES)]
+        payment = f"{(index % 500) + 9.9:.2f}"
+        return {
+            "tid": 1000000000000000 + index,
+            "title": f"商品{index % 1000}",
+            "type": "fixed",
+            "status": status,
+            "payment": payment,
+            "discount_fee": "0.00",
+            "adjust_fee": "0.00",
+            "post_fee": "0.00",
+            "total_fee": payment,
+            "pay_time": (created + timedelta(minutes=1)).strftime(TIME_FORMAT),
+            "end_time": None,
+            "created": created.strftime(TIME_FORMAT),
+            "modified": (created + self.config.modified_lag).strftime(TIME_FORMAT),
+            "seller_nick": self.config.seller_nick,
+            "buyer_nick": f"buyer_{index % 10000}",
+            "buyer_message": "",
+            "receiver_name": f"收件人{index % 10000}",
+            "receiver_state": "浙江省",
+            "receiver_city": "杭州市",
+            "receiver_district": "西湖区",
+            "receiver_address": f"文三路{index % 1000}号",
+            "receiver_zip": "310000",
+            "receiver_mobile": f"138{index % 100000000:08d}",
+            "receiver_phone": ""
+        }
+    
+    def trades_page(self, response_key: str, start: datetime, end: datetime, params: dict) -> dict:
+        """生成一页订单列表响应"""
+        page_no = int(params.get("page_no", 1))
+        page_size = min(int(params.get("page_size", 40)), self.config.max_page_size)
+        use_has_next = str(params.get("use_has_next", "false")).lower() == "true"
+        
+        first, last = self.index_range(start, end)
+        page_first = first + (page_no - 1) * page_size
+        page_last = min(page_first + page_size, last)
+        
+        data = {}
+        if page_first < page_last:
+            data["trades"] = {"trade": [self.make_trade(i) for i in range(page_first, page_last)]}
+        if use_has_next:
+            data["has_next"] = page_last < last
+        else:
+            data["total_results"] = last - first
+        return {response_key: data}
+    
+    def handle(self, params: dict) -> Tuple[int, dict]:
+        """
+        处理一次API调用
+        
+        Returns:
+            (HTTP状态码, 响应体)
+        """
+        with self._lock:
+            self.requests += 1
+        
+        delay = self.config.latency_ms + random.uniform(0, self.config.latency_jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        
+        if self.config.http_error_rate and random.random() < self.config.http_error_rate:
+            return 502, {"message": "Bad Gateway"}
+        
+        if self.config.error_rate and random.random() < self.config.error_rate:
+            return 200, {"error_response": {
+                "code": 7,
+                "msg": "App Call Limited",
+                "sub_code": "accesscontrol.limited-by-app-access-count",
+                "sub_msg": "This ban will last for 1 more seconds"
+            }}
+        
+        method = params.get("method")
+        if method == "taobao.trades.sold.get":
+            start = datetime.strptime(params["start_created"], TIME_FORMAT)
+            end = datetime.strptime(params["end_created"], TIME_FORMAT)
+            return 200, self.trades_page("trades_sold_get_response", start, end, params)
+        
+        if method == "taobao.trades.sold.increment.get":
+            # 修改时间 = 下单时间 + 固定延后，换算回下单时间区间
+            start = datetime.strptime(params["start_modified"], TIME_FORMAT) - self.config.modified_lag
+            end = datetime.strptime(params["end_modified"], TIME_FORMAT) - self.config.modified_lag
+            return 200, self.trades_page("trades_sold_increment_get_response", start, end, params)
+        
+        if method == "taobao.trade.fullinfo.get":
+            index = int(params["tid"]) - 1000000000000000
+            if not 0 <= index < self.config.trades:
+                return 200, {"error_response": {"code": 15, "msg": "Remote service error", "sub_code": "isv.trade-not-exist"}}
+            trade = self.make_trade(index)
+            trade["orders"] = {"order": [{
+                "title": trade["title"],
+                "price": trade["payment"],
+                "num": 1,
+                "total_fee": trade["total_fee"],
+                "payment": trade["payment"],
+                "status": trade["status"]
+            }]}
+            return 200, {"trade_fullinfo_get_response": {"trade": trade}}
+        
+        return 200, {"error_response": {"code": 22, "msg": "Invalid Method"}}
+
+def make_handler(gateway: FakeTaobaoGateway):
+    """创建绑定到网关实例的请求处理类"""
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length).decode("utf-8")
+            params = {key: values[-1] for key, values in parse_qs(body).items()}
+            
+            status, payload = gateway.handle(params)
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json;charset=UTF-8")
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                data = gzip.compress(data)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return Handler
+
+def start_gateway(config: GatewayConfig, host: str = "127.0.0.1", port: int = 0):
+    """
+    在后台线程启动模拟网关
+    
+    Args:
+        config: 网关配置
+        host: 监听地址
+        port: 监听端口，0 表示随机端口
+        
+    Returns:
+        (server, gateway, api_url)，调用 server.shutdown() 停止
+    """
+    gateway = FakeTaobaoGateway(config)
+    server = ThreadingHTTPServer((host, port), make_handler(gateway))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="fake-taobao-gateway", daemon=True)
+    thread.start()
+    api_url = f"http://{host}:{server.server_address[1]}/router/rest"
+    return server, gateway, api_url
+
+def main():
+    parser = argparse.ArgumentParser(description="本地淘宝网关模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--trades", type=int, default=100000, help="订单总数")
+    parser.add_argument("--span-days", type=int, default=7, help="订单分布天数")
+    parser.add_argument("--latency-ms", type=float, default=0, help="每次请求延迟（毫秒）")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0, help="延迟抖动（毫秒）")
+    parser.add_argument("--max-page-size", type=int, default=100, help="每页最大订单数")
+    parser.add_argument("--error-rate", type=float, default=0, help="限流错误概率")
+    parser.add_argument("--http-error-rate", type=float, default=0, help="HTTP 502 概率")
+    args = parser.parse_args()
+    
+    config = GatewayConfig(
+        trades=args.trades,
+        span_days=args.span_days,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        max_page_size=args.max_page_size,
+        error_rate=args.error_rate,
+        http_error_rate=args.http_error_rate
+    )
+    server, _, api_url = start_gateway(config, args.host, args.port)
+    print(f"模拟淘宝网关已启动: {api_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
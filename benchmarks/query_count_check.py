@@ -0,0 +1,134 @@
+"""
+列表接口 SQL 语句数检查
+
+按接口的实际返回方式（crud 查询 + 响应模型序列化）统计每个列表接口执行的 SQL 语句数，
+分别用不同的每页数量运行，语句数随每页数量变化（出现逐行懒加载，即 N+1 查询）时以非零状态退出。
+
+用法：
+    python -m benchmarks.query_count_check
+    python -m benchmarks.query_count_check --page-sizes 10 50 200
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import models
+from models.base import Base
+from crud import order as order_crud
+from crud import invoice as invoice_crud
+from schemas import order as order_schemas
+from schemas import invoice as invoice_schemas
+from utils.query_counter import QueryCounter
+
+def list_endpoints() -> list:
+    """列表接口：[(名称, 函数(db, 每页数量) -> 序列化结果)]"""
+    search = order_schemas.OrderSearchParams(is_bound=None)
+    return [
+        ("GET /api/orders/", lambda db, limit: [
+            order_schemas.Order.model_validate(order).model_dump() for order in order_crud.get_orders(db, limit=limit)
+        ]),
+        ("GET /api/orders/?include_nested=false", lambda db, limit: [
+            order_schemas.Order.model_validate(order).model_dump()
+            for order in order_crud.get_orders(db, limit=limit, include_nested=False)
+        ]),
+        ("POST /api/orders/search", lambda db, limit: [
+            order_schemas.Order.model_validate(order).model_dump()
+            for order in order_crud.search_orders(db, search, limit=limit)
+        ]),
+        ("POST /api/orders/search?fields=id,order_number,status", lambda db, limit: [
+            row._asdict() for row in order_crud.search_orders(db, search, limit=limit, fields=["id", "order_number", "status"])
+        ]),
+        ("GET /api/invoices/", lambda db, limit: [
+            invoice_schemas.Invoice.model_validate(invoice).model_dump() for invoice in invoice_crud.get_invoices(db, limit=limit)
+        ]),
+        ("GET /api/invoices/?include_nested=false", lambda db, limit: [
+            invoice_schemas.Invoice.model_validate(invoice).model_dump()
+            for invoice in invoice_crud.get_invoices(db, limit=limit, include_nested=False)
+        ]),
+    ]
+
+def seed(engine, count: int) -> None:
+    """写入模拟用户、订单和发票，订单均已分配接单人、发票关联不同订单"""
+    now = datetime.now()
+    users = [
+        {"username": f"count_user_{i}", "password_hash": "-", "email": f"count_user_{i}@example.com", "created_at": now, "updated_at": now}
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), users)
+        user_ids = [row.id for row in conn.execute(text("SELECT id FROM users"))]
+        
+        orders = []
+        for i in range(count):
+            created_at = now - timedelta(minutes=i)
+            orders.append({
+                "shop_id": f"shop_{i % 10}",
+                "order_number": str(2000000000000000 + i),
+                "price": 10.0,
+                "status": models.order.OrderStatus.SHIPPED,
+                "user_id": random.choice(user_ids),
+                "created_at": created_at,
+                "updated_at": created_at
+            })
+        conn.execute(insert(models.Order), orders)
+        order_ids = [row.id for row in conn.execute(text("SELECT id FROM orders"))]
+        
+        conn.execute(insert(models.Invoice), [
+            {
+                "invoice_number": f"FP{order_id}",
+                "order_id": order_id,
+                "amount": 10.0,
+                "invoice_type": "增值税普通发票",
+                "issuing_date": now,
+                "created_at": now,
+                "updated_at": now
+            }
+            for order_id in order_ids
+        ])
+
+def check_endpoints(engine, page_sizes: list) -> bool:
+    """
+    统计各接口在不同每页数量下的语句数并打印
+    
+    Returns:
+        是否所有接口的语句数都与每页数量无关
+    """
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    passed = True
+    for name, endpoint in list_endpoints():
+        counts = []
+        for limit in page_sizes:
+            # 每次使用新会话，与接口每个请求一个会话一致，避免身份映射缓存掩盖懒加载
+            db = Session()
+            try:
+                with QueryCounter(engine) as counter:
+                    items = endpoint(db, limit)
+                counts.append(counter.count)
+                if len(items) < limit:
+                    print(f"    警告：{name} 每页 {limit} 只返回 {len(items)} 条，请增大 --seed")
+            finally:
+                db.close()
+        
+        constant = len(set(counts)) == 1
+        passed = passed and constant
+        detail = "，".join(f"每页 {limit}: {count} 条" for limit, count in zip(page_sizes, counts))
+        print(f"[{'OK' if constant else 'N+1'}] {name}：{detail}")
+    return passed
+
+def main():
+    parser = argparse.ArgumentParser(description="列表接口 SQL 语句数检查")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 100], help="参与比较的每页数量")
+    parser.add_argument("--seed", type=int, default=200, help="写入的模拟用户、订单、发票数")
+    args = parser.parse_args()
+    
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    seed(engine, args.seed)
+    
+    sys.exit(0 if check_endpoints(engine, args.page_sizes) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, noload, selectinload
 from models import invoice as models
+from models import order as order_models
 from schemas import invoice as schemas
+from crud.versioning import update_versioned, load_detached
+from utils.pagination import Cursor, paginate
+from typing import Optional
 
 def get_invoice(db: Session, invoice_id: int):
     """根据发票ID获取发票信息"""
@@ -10,9 +14,18 @@ def get_invoice_by_number(db: Session, invoice_number: str):
     """根据发票号获取发票信息"""
     return db.query(models.Invoice).filter(models.Invoice.invoice_number == invoice_number).first()
 
-def get_invoices(db: Session, skip: int = 0, limit: int = 100):
-    """获取发票列表"""
-    return db.query(models.Invoice).offset(skip).limit(limit).all()
+def get_invoices(db: Session, skip: int = 0, limit: int = 100, after: Optional[Cursor] = None, include_nested: bool = True):
+    """
+    获取发票列表（按创建时间倒序，提供游标时按键集分页）
+    
+    关联订单及其接单人用 selectinload 逐层批量加载，语句数与每页数量无关；
+    include_nested=False 时不加载关联订单。
+    """
+    if include_nested:
+        options = selectinload(models.Invoice.order).selectinload(order_models.Order.user)
+    else:
+        options = noload(models.Invoice.order)
+    return paginate(db.query(models.Invoice).options(options), models.Invoice, skip, limit, after).all()
 
 def create_invoice(db: Session, invoice: schemas.InvoiceCreate):
     """创建发票"""
@@ -47,11 +60,36 @@ def update_invoice(db: Session, invoice_id: int, invoice: schemas.InvoiceUpdate)
         db_invoice.issuing_date = invoice.issuing_date
     if invoice.remark is not None:
         db_invoice.remark = invoice.remark
+    db_invoice.version = models.Invoice.version + 1
     
     db.commit()
     db.refresh(db_invoice)
     return db_invoice
 
+def patch_invoice(db: Session, invoice_id: int, patch: schemas.InvoicePatch):
+    """
+    部分更新发票（乐观锁，只写入请求中出现的字段）
+    
+    Returns:
+        与会话分离的发票对象（已加载关联订单及接单人），发票不存在时返回 None
+    
+    Raises:
+        VersionConflictError: 版本号与库中不一致
+    """
+    values = patch.model_dump(exclude_unset=True, exclude={"version"})
+    try:
+        if not update_versioned(db, models.Invoice, invoice_id, patch.version, values):
+            return None
+        db_invoice = load_detached(
+            db, models.Invoice, invoice_id, joinedload(models.Invoice.order).joinedload(order_models.Order.user)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return db_invoice
+
 def delete_invoice(db: Session, invoice_id: int):
     """删除发票"""
     db_invoice = db.query(models.Invoice).filter(models.Invoice.id == invoice_id).first()
@@ -1,20 +1,254 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session, joinedload, noload, selectinload
+from sqlalchemy import and_, or_, func, false, insert, update, bindparam
+from sqlalchemy.exc import IntegrityError
 from models import order as models
+from crud import order_rollup as rollup_crud
+from crud.versioning import update_versioned, load_detached
 from schemas import order as schemas
 from datetime import datetime
+from typing import List, Dict, Tuple, Any, Iterator, Optional
+from utils.pagination import Cursor, paginate
+from utils.cache import TTLCache
+import hashlib
+import json
 
-def get_order(db: Session, order_id: int):
-    """根据订单ID获取订单信息"""
-    return db.query(models.Order).filter(models.Order.id == order_id).first()
+# MySQL ngram 全文索引的分词长度（ngram_token_size 默认值），更短的输入无法走全文索引
+NGRAM_TOKEN_SIZE = 2
+
+# 批量操作单次最多处理的订单数
+BULK_MAX_ORDERS = 5000
+
+# 批量操作按块锁定和更新，每块的订单ID数
+BULK_CHUNK_SIZE = 1000
+
+# 列表可按需选择的订单字段（同步指纹仅供内部使用）
+ORDER_FIELDS = tuple(column.name for column in models.Order.__table__.columns if column.name != "sync_fingerprint")
+
+# 搜索总数与分面统计缓存：同一过滤条件在有效期内翻页不重复统计
+_search_facet_cache = TTLCache(maxsize=1000, ttl=15)
+
+def get_order(db: Session, order_id: int, for_update: bool = False):
+    """根据订单ID获取订单信息，for_update 为 True 时锁定该行直到事务结束（读取变更前快照时使用）"""
+    query = db.query(models.Order).filter(models.Order.id == order_id)
+    if for_update:
+        query = query.with_for_update()
+    return query.first()
 
 def get_order_by_number(db: Session, order_number: str):
     """根据订单号获取订单信息"""
     return db.query(models.Order).filter(models.Order.order_number == order_number).first()
 
-def get_orders(db: Session, skip: int = 0, limit: int = 100):
-    """获取订单列表"""
-    return db.query(models.Order).offset(skip).limit(limit).all()
+def get_orders(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Cursor] = None,
+    fields: Optional[List[str]] = None,
+    include_nested: bool = True
+):
+    """
+    获取订单列表（按创建时间倒序，提供游标时按键集分页）
+    
+    指定 fields 时只查询这些列（另带分页所需的 id、created_at），返回行而非 ORM 对象。
+    include_nested 见 order_load_options。
+    """
+    if fields:
+        query = db.query(*_field_columns(fields))
+    else:
+        query = db.query(models.Order).options(order_load_options(include_nested))
+    return paginate(query, models.Order, skip, limit, after).all()
+
+def order_load_options(include_nested: bool = True):
+    """
+    订单列表的关联加载方式
+    
+    接单人用 selectinload 在一条 IN 查询中批量加载，每页固定多一条语句，
+    避免序列化 schemas.Order 时逐行懒加载；不需要嵌套对象时用 noload，不查询接单人。
+    """
+    return selectinload(models.Order.user) if include_nested else noload(models.Order.user)
+
+def get_orders_by_numbers(db: Session, order_numbers: List[str]) -> Dict[str, Any]:
+    """
+    根据订单号批量获取并锁定已存在订单，返回 {订单号: (id, 同步指纹, 汇总字段)}
+    
+    读到的汇总字段用作更新前快照，加锁保证提交前不被其他事务修改。
+    """
+    if not order_numbers:
+        return {}
+    rollup_columns = [getattr(models.Order, field) for field in rollup_crud.ROLLUP_FIELDS]
+    rows = db.query(models.Order.id, models.Order.order_number, models.Order.sync_fingerprint, *rollup_columns).filter(
+        models.Order.order_number.in_(order_numbers)
+    ).with_for_update().all()
+    return {row.order_number: row for row in rows}
+
+def order_fingerprint(order: dict) -> str:
+    """计算订单同步字段的指纹，用于判断淘宝侧数据是否有变化"""
+    payload = json.dumps(order, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+def bulk_upsert_orders(db: Session, orders: List[dict]) -> Tuple[int, int, int]:
+    """
+    批量写入订单（单个事务）
+
+    一次查询预取已存在的订单号，新订单批量插入，已存在订单批量更新（版本号在 SQL 中自增）。
+    值为 None 的字段在更新时保持原值不变，与 update_order 一致。
+    同步字段指纹与库中一致的订单视为未变化，直接跳过，不产生写入。
+    每日汇总的增量在同一事务中写入。
+
+    Returns:
+        (新建数量, 更新数量, 未变化数量)
+    """
+    # 同一批次内重复的订单号以最后一条为准
+    orders_by_number = {order["order_number"]: order for order in orders}
+    existing = get_orders_by_numbers(db, list(orders_by_number))
+
+    inserts = []
+    updates = []
+    unchanged = 0
+    before = []
+    after = []
+    now = datetime.now()
+    for order_number, order in orders_by_number.items():
+        fingerprint = order_fingerprint(order)
+        db_order = existing.get(order_number)
+        if db_order is None:
+            values = {"created_at": now, "updated_at": now, **order, "sync_fingerprint": fingerprint}
+            inserts.append(values)
+            after.append(rollup_crud.rollup_snapshot(values))
+        elif db_order.sync_fingerprint == fingerprint:
+            unchanged += 1
+        else:
+            values = {key: value for key, value in order.items() if value is not None}
+            values["id"] = db_order.id
+            values["sync_fingerprint"] = fingerprint
+            values["updated_at"] = now
+            updates.append(values)
+            old = dict(db_order._mapping)
+            before.append(rollup_crud.rollup_snapshot(old))
+            after.append(rollup_crud.rollup_snapshot({**old, **values}))
+
+    if not inserts and not updates:
+        # 只做了预取查询，结束只读事务即可
+        db.rollback()
+        return 0, 0, unchanged
+
+    try:
+        if inserts:
+            db.bulk_insert_mappings(models.Order, inserts)
+        if updates:
+            _update_order_rows(db, updates)
+        rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas(before, after))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(inserts), len(updates), unchanged
+
+def _update_order_rows(db: Session, updates: List[dict]):
+    """
+    按订单ID批量更新订单，版本号在 SQL 中自增（version = version + 1），
+    不依赖预取时读到的版本号；字段相同的行合并为一次 executemany
+    
+    Args:
+        updates: 订单字段字典列表，须包含 id
+    """
+    table = models.Order.__table__
+    groups = {}
+    for values in updates:
+        groups.setdefault(tuple(sorted(values)), []).append(values)
+    
+    for rows in groups.values():
+        stmt = update(table).where(table.c.id == bindparam("order_id")).values(version=table.c.version + 1)
+        db.execute(stmt, [
+            {"order_id": values["id"], **{key: value for key, value in values.items() if key != "id"}}
+            for values in rows
+        ])
+
+def insert_new_orders(db: Session, orders: List[dict]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    批量插入订单，跳过库中已存在的订单号（不更新已有订单）
+    
+    一次查询预取已存在的订单号，其余订单以 executemany 写入（SQLAlchemy 2.0 的 insertmanyvalues
+    会合并为多行 INSERT，且语句可缓存编译），每日汇总增量在同一事务中写入。调用方需保证各订单字段一致且订单号不重复。
+    预取与插入之间可能有并发写入同一订单号，整批插入违反约束时回滚并改为逐行插入，见 _insert_orders_one_by_one。
+    
+    Args:
+        orders: 订单字段字典列表
+    
+    Returns:
+        (库中已存在而跳过的订单号, {插入失败的订单号: 原因})
+    """
+    if not orders:
+        return [], {}
+    
+    order_numbers = [order["order_number"] for order in orders]
+    existing = {
+        row.order_number
+        for row in db.query(models.Order.order_number).filter(models.Order.order_number.in_(order_numbers))
+    }
+    now = datetime.now()
+    rows = [
+        {**order, "created_at": order.get("created_at") or now, "updated_at": now}
+        for order in orders if order["order_number"] not in existing
+    ]
+    
+    try:
+        if rows:
+            db.execute(insert(models.Order.__table__), rows)
+            rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas(after=[rollup_crud.rollup_snapshot(row) for row in rows]))
+        db.commit()
+        return [order_number for order_number in order_numbers if order_number in existing], {}
+    except IntegrityError:
+        db.rollback()
+    except Exception:
+        db.rollback()
+        raise
+    
+    duplicated, failed = _insert_orders_one_by_one(db, rows)
+    duplicated = set(duplicated) | existing
+    return [order_number for order_number in order_numbers if order_number in duplicated], failed
+
+def _insert_orders_one_by_one(db: Session, rows: List[dict]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    逐行插入订单，每行一个保存点，所有成功的行和汇总增量在一个事务中提交
+    
+    违反约束的行回滚到保存点后继续：订单号此时已存在（并发写入）的按重复跳过，
+    其余（如接单人不存在）记为失败。
+    
+    Returns:
+        (已存在而跳过的订单号, {插入失败的订单号: 原因})
+    """
+    stmt = insert(models.Order.__table__)
+    inserted = []
+    duplicated = []
+    failed = {}
+    try:
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(stmt, [row])
+                inserted.append(row)
+            except IntegrityError as e:
+                if db.query(models.Order.id).filter(models.Order.order_number == row["order_number"]).first():
+                    duplicated.append(row["order_number"])
+                else:
+                    failed[row["order_number"]] = f"写入失败: {e.orig}"
+        
+        rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas(after=[rollup_crud.rollup_snapshot(row) for row in inserted]))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return duplicated, failed
+
+def set_order_fingerprint(db: Session, order_id: int, fingerprint: str):
+    """更新订单的同步指纹"""
+    db.query(models.Order).filter(models.Order.id == order_id).update(
+        {models.Order.sync_fingerprint: fingerprint}, synchronize_session=False
+    )
+    db.commit()
 
 def create_order(db: Session, order: schemas.OrderCreate):
     """创建订单"""
@@ -35,15 +269,18 @@ def create_order(db: Session, order: schemas.OrderCreate):
         order_type=order.order_type
     )
     db.add(db_order)
+    db.flush()
+    rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas(after=[rollup_crud.rollup_snapshot(db_order)]))
     db.commit()
     db.refresh(db_order)
     return db_order
 
 def update_order(db: Session, order_id: int, order: schemas.OrderUpdate):
     """更新订单信息"""
-    db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
+    db_order = get_order(db, order_id, for_update=True)
     if not db_order:
         return None
+    before = rollup_crud.rollup_snapshot(db_order)
     
     if order.shop_id:
         db_order.shop_id = order.shop_id
@@ -73,33 +310,276 @@ def update_order(db: Session, order_id: int, order: schemas.OrderUpdate):
         db_order.user_id = order.user_id
     if order.order_type:
         db_order.order_type = order.order_type
+    db_order.version = models.Order.version + 1
     
+    rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas([before], [rollup_crud.rollup_snapshot(db_order)]))
     db.commit()
     db.refresh(db_order)
     return db_order
 
+def patch_order(db: Session, order_id: int, patch: schemas.OrderPatch):
+    """
+    部分更新订单（乐观锁）
+    
+    只写入请求中出现的字段，一条带版本号条件的 UPDATE 完成写入，再读取一次作为返回值。
+    修改了汇总相关字段时，先按同一版本号读取变更前的汇总字段：更新成功说明期间版本未变，
+    读到的就是更新前的数据，无需加锁。
+    
+    Returns:
+        与会话分离的订单对象（已加载接单人），订单不存在时返回 None
+    
+    Raises:
+        VersionConflictError: 版本号与库中不一致
+    """
+    values = patch.model_dump(exclude_unset=True, exclude={"version"})
+    rollup_columns = [getattr(models.Order, field) for field in rollup_crud.ROLLUP_FIELDS]
+    try:
+        before = None
+        if set(values) & set(rollup_crud.ROLLUP_FIELDS):
+            before = db.query(*rollup_columns).filter(
+                models.Order.id == order_id, models.Order.version == patch.version
+            ).first()
+        
+        if not update_versioned(db, models.Order, order_id, patch.version, values):
+            return None
+        db_order = load_detached(db, models.Order, order_id, joinedload(models.Order.user))
+        
+        if before is not None:
+            rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas(
+                [rollup_crud.rollup_snapshot(before)], [rollup_crud.rollup_snapshot(db_order)]
+            ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return db_order
+
 def delete_order(db: Session, order_id: int):
     """删除订单"""
-    db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
+    db_order = get_order(db, order_id, for_update=True)
     if not db_order:
         return False
     
+    rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas(before=[rollup_crud.rollup_snapshot(db_order)]))
     db.delete(db_order)
     db.commit()
     return True
 
-def search_orders(db: Session, params: schemas.OrderSearchParams, skip: int = 0, limit: int = 100):
-    """搜索订单"""
+def resolve_bulk_order_ids(db: Session, selection: schemas.OrderBulkSelection) -> List[int]:
+    """
+    解析批量操作的订单范围
+    
+    Args:
+        selection: 订单ID列表或搜索条件
+    
+    Returns:
+        去重后的订单ID列表
+    
+    Raises:
+        ValueError: 未指定或同时指定订单ID和搜索条件，或超出单次处理上限
+    """
+    if (selection.order_ids is None) == (selection.search is None):
+        raise ValueError("需要指定订单ID列表或搜索条件之一")
+    
+    if selection.order_ids is not None:
+        order_ids = list(dict.fromkeys(selection.order_ids))
+    else:
+        query = build_order_search_query(db, selection.search).with_entities(models.Order.id)
+        order_ids = [row.id for row in query.limit(BULK_MAX_ORDERS + 1)]
+    
+    if len(order_ids) > BULK_MAX_ORDERS:
+        raise ValueError(f"单次最多处理 {BULK_MAX_ORDERS} 个订单")
+    return order_ids
+
+def bulk_assign_orders(db: Session, order_ids: List[int], user_id: int) -> dict:
+    """批量将订单分配给接单人"""
+    return _bulk_update_orders(db, order_ids, {"user_id": user_id})
+
+def bulk_ship_orders(db: Session, order_ids: List[int], user_id: int, shipping_time: Optional[datetime] = None) -> dict:
+    """批量发货：仅处理待发货的订单，接单人设为操作人"""
+    values = {
+        "status": models.OrderStatus.SHIPPED,
+        "shipping_time": shipping_time or datetime.now(),
+        "user_id": user_id
+    }
+    return _bulk_update_orders(db, order_ids, values, _check_shippable)
+
+def bulk_update_audit_status(db: Session, order_ids: List[int], audit_status: schemas.AuditStatus) -> dict:
+    """批量修改审核状态：已结算的订单不再修改"""
+    return _bulk_update_orders(db, order_ids, {"audit_status": models.AuditStatus(audit_status)}, _check_not_settled)
+
+def bulk_settle_orders(db: Session, order_ids: List[int], settlement_time: Optional[datetime] = None) -> dict:
+    """批量结算：仅处理已审核或未结算的订单"""
+    values = {
+        "audit_status": models.AuditStatus.SETTLED,
+        "settlement_time": settlement_time or datetime.now()
+    }
+    return _bulk_update_orders(db, order_ids, values, _check_settleable)
+
+def _bulk_update_orders(db: Session, order_ids: List[int], values: dict, check=None) -> dict:
+    """
+    对一批订单写入同一组字段，所有订单在一个事务中完成
+    
+    按块锁定读取订单的汇总字段，未通过状态检查的订单记录原因后跳过，
+    其余订单每块一条 UPDATE ... WHERE id IN (...)；每日汇总增量在同一事务中写入。
+    
+    Args:
+        order_ids: 订单ID列表
+        values: 要写入的字段
+        check: 状态检查函数，参数为订单行，返回未通过的原因，通过时返回 None
+    
+    Returns:
+        {"updated": [订单ID], "failed": [{"id": 订单ID, "reason": 原因}]}
+    """
+    values = {**values, "updated_at": datetime.now(), "version": models.Order.version + 1}
+    columns = [models.Order.id] + [getattr(models.Order, field) for field in rollup_crud.ROLLUP_FIELDS]
+    # 按ID顺序加锁，减少并发批量操作之间的死锁
+    order_ids = sorted(set(order_ids))
+    
+    updated = []
+    failed = []
+    before = []
+    after = []
+    try:
+        for i in range(0, len(order_ids), BULK_CHUNK_SIZE):
+            chunk = order_ids[i:i + BULK_CHUNK_SIZE]
+            rows = {
+                row.id: row
+                for row in db.query(*columns).filter(models.Order.id.in_(chunk)).with_for_update()
+            }
+            
+            ready = []
+            for order_id in chunk:
+                row = rows.get(order_id)
+                reason = "订单不存在" if row is None else (check(row) if check else None)
+                if reason:
+                    failed.append({"id": order_id, "reason": reason})
+                    continue
+                ready.append(order_id)
+                old = dict(row._mapping)
+                before.append(rollup_crud.rollup_snapshot(old))
+                after.append(rollup_crud.rollup_snapshot({**old, **values}))
+            
+            if ready:
+                db.query(models.Order).filter(models.Order.id.in_(ready)).update(values, synchronize_session=False)
+                updated.extend(ready)
+        
+        rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas(before, after))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return {"updated": updated, "failed": failed}
+
+def _check_shippable(row) -> Optional[str]:
+    if row.status != models.OrderStatus.WAITING_FOR_SHIPMENT:
+        return f"订单状态不允许发货，当前状态: {row.status.value}"
+    return None
+
+def _check_not_settled(row) -> Optional[str]:
+    if row.audit_status == models.AuditStatus.SETTLED:
+        return "订单已结算，不能修改审核状态"
+    return None
+
+def _check_settleable(row) -> Optional[str]:
+    if row.audit_status not in (models.AuditStatus.AUDITED, models.AuditStatus.UNSETTLED):
+        current = row.audit_status.value if row.audit_status else models.AuditStatus.UNAUDITED.value
+        return f"订单审核状态不允许结算，当前状态: {current}"
+    return None
+
+def search_orders(
+    db: Session,
+    params: schemas.OrderSearchParams,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Cursor] = None,
+    fields: Optional[List[str]] = None,
+    include_nested: bool = True
+):
+    """搜索订单（按创建时间倒序，提供游标时按键集分页；fields、include_nested 同 get_orders）"""
+    query = build_order_search_query(db, params)
+    if fields:
+        query = query.with_entities(*_field_columns(fields))
+    else:
+        query = query.options(order_load_options(include_nested))
+    
+    # 执行查询
+    return paginate(query, models.Order, skip, limit, after).all()
+
+def iter_order_search_rows(db: Session, params: schemas.OrderSearchParams, columns: List[str], batch_size: int = 1000) -> Iterator[Any]:
+    """
+    逐行读取全部搜索结果（不分页），用于导出
+    
+    只查询指定的列，不构造 ORM 对象；通过 yield_per 使用服务端游标分批读取，
+    内存占用与 batch_size 成正比，与结果总数无关。
+    
+    Args:
+        params: 搜索参数
+        columns: 订单表列名
+        batch_size: 每批从数据库读取的行数
+    
+    Returns:
+        按创建时间倒序的行（可按列名取值）
+    """
+    query = build_order_search_query(db, params).with_entities(*[getattr(models.Order, column) for column in columns])
+    query = query.order_by(models.Order.created_at.desc(), models.Order.id.desc())
+    return iter(query.yield_per(batch_size))
+
+def build_order_search_query(db: Session, params: schemas.OrderSearchParams):
+    """
+    构建订单搜索查询（不含排序和分页）
+    
+    过滤条件按组合索引的列顺序排列：先等值（is_bound、user_id），再状态集合，
+    最后是范围条件；状态排除改写为包含其余状态，使 status 列可以走索引。
+    在 MySQL 上按过滤组合提示使用对应的组合索引，见 choose_search_index。
+    """
     query = db.query(models.Order)
     
-    # 构建查询条件
+    index_name = choose_search_index(params)
+    if index_name:
+        query = query.with_hint(models.Order, f"USE INDEX ({index_name})", "mysql")
+    
+    conditions = order_search_conditions(db, params)
+    
+    # 应用查询条件
+    if conditions:
+        query = query.filter(and_(*conditions))
+    
+    return query
+
+def order_search_conditions(db: Session, params: schemas.OrderSearchParams) -> list:
+    """构建订单搜索的过滤条件列表"""
     conditions = []
     
+    if params.is_bound is not None:
+        conditions.append(models.Order.is_bound == params.is_bound)
+    
+    if params.user_id is not None:
+        conditions.append(models.Order.user_id == params.user_id)
+    
+    statuses = _resolve_statuses(params)
+    if statuses is not None:
+        if not statuses:
+            # 包含与排除互相抵消，不可能有结果
+            conditions.append(false())
+        elif len(statuses) == 1:
+            conditions.append(models.Order.status == statuses[0])
+        else:
+            conditions.append(models.Order.status.in_(statuses))
+    
+    if params.audit_status:
+        conditions.append(models.Order.audit_status.in_(params.audit_status))
+    
     if params.order_number:
-        conditions.append(models.Order.order_number.ilike(f"%{params.order_number}%"))
+        conditions.append(_text_match_condition(db, models.Order.order_number, params.order_number, params.match_mode))
     
     if params.shop_id:
-        conditions.append(models.Order.shop_id.ilike(f"%{params.shop_id}%"))
+        conditions.append(_text_match_condition(db, models.Order.shop_id, params.shop_id, params.match_mode))
+    
+    if params.order_type:
+        conditions.append(models.Order.order_type == params.order_type)
     
     if params.price_gt is not None:
         conditions.append(models.Order.price > params.price_gt)
@@ -107,61 +587,172 @@ def search_orders(db: Session, params: schemas.OrderSearchParams, skip: int = 0,
     if params.price_lt is not None:
         conditions.append(models.Order.price < params.price_lt)
     
-    if params.order_type:
-        conditions.append(models.Order.order_type == params.order_type)
+    # 时间范围
+    time_ranges = [
+        # 假设下单时间使用 created_at 字段
+        (models.Order.created_at, params.order_time_start, params.order_time_end),
+        (models.Order.payment_time, params.payment_time_start, params.payment_time_end),
+        (models.Order.shipping_time, params.shipping_time_start, params.shipping_time_end),
+        (models.Order.closing_time, params.closing_time_start, params.closing_time_end),
+        (models.Order.confirmation_time, params.confirmation_time_start, params.confirmation_time_end),
+    ]
+    for column, range_start, range_end in time_ranges:
+        if range_start and range_end:
+            conditions.append(column.between(range_start, range_end))
     
-    if params.is_bound is not None:
-        conditions.append(models.Order.is_bound == params.is_bound)
+    if params.exclude_user_id is not None:
+        conditions.append(models.Order.user_id != params.exclude_user_id)
     
-    if params.status_exclude:
-        conditions.append(models.Order.status.notin_(params.status_exclude))
+    return conditions
+
+def count_order_search_facets(db: Session, params: schemas.OrderSearchParams) -> dict:
+    """
+    统计搜索结果的总数和按订单状态、审核状态的分面数量
     
-    if params.status_include:
-        conditions.append(models.Order.status.in_(params.status_include))
+    一次按 (status, audit_status) 分组的聚合得到全部数字，结果按规范化后的
+    过滤条件缓存（默认 15 秒），前端翻页时不重复执行聚合。
+    
+    Returns:
+        {"total": 总数, "status_counts": {状态: 数量}, "audit_status_counts": {审核状态: 数量}}
+    """
+    cache_key = _search_cache_key(params)
+    cached = _search_facet_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    query = build_order_search_query(db, params).with_entities(
+        models.Order.status, models.Order.audit_status, func.count(models.Order.id)
+    ).group_by(models.Order.status, models.Order.audit_status)
     
+    facets = {"total": 0, "status_counts": {}, "audit_status_counts": {}}
+    for status, audit_status, count in query.all():
+        facets["total"] += count
+        if status is not None:
+            facets["status_counts"][status.value] = facets["status_counts"].get(status.value, 0) + count
+        if audit_status is not None:
+            facets["audit_status_counts"][audit_status.value] = facets["audit_status_counts"].get(audit_status.value, 0) + count
+    
+    _search_facet_cache.set(cache_key, facets)
+    return facets
+
+def _field_columns(fields: List[str]) -> list:
+    """按需选择的字段对应的列，补上分页游标所需的 id、created_at"""
+    names = list(dict.fromkeys([*fields, "id", "created_at"]))
+    return [getattr(models.Order, name) for name in names]
+
+def _search_cache_key(params: schemas.OrderSearchParams) -> str:
+    """规范化过滤条件作为缓存键：去掉空值，集合类条件排序"""
+    data = params.model_dump(mode="json", exclude_none=True)
+    for key, value in data.items():
+        if isinstance(value, list):
+            data[key] = sorted(set(value))
+    return json.dumps(data, sort_keys=True, ensure_ascii=False)
+
+def choose_search_index(params: schemas.OrderSearchParams) -> Optional[str]:
+    """
+    按过滤组合选择组合索引
+    
+    订单号、店铺ID条件本身选择性最高（唯一索引/全文索引），此时交给优化器；
+    其余情况按 接单人 > 绑定状态+单一订单状态 > 单一审核状态 的优先级选择组合索引。
+    组合索引均以 (created_at, id) 结尾，只在前导列都是等值条件时提示，
+    结果按分页顺序从索引读出，不需要额外排序；多个状态（IN）时不提示，交给优化器。
+    
+    Returns:
+        索引名，不需要提示时返回 None
+    """
+    if params.order_number or params.shop_id:
+        return None
     if params.user_id is not None:
-        conditions.append(models.Order.user_id == params.user_id)
+        return "idx_orders_user_created"
+    statuses = _resolve_statuses(params)
+    if params.is_bound is not None and statuses is not None and len(statuses) == 1:
+        return "idx_orders_bound_status_created"
+    if params.audit_status and len(params.audit_status) == 1:
+        return "idx_orders_audit_created"
+    return None
+
+def _resolve_statuses(params: schemas.OrderSearchParams) -> Optional[List[models.OrderStatus]]:
+    """
+    合并状态包含/排除条件
     
-    if params.exclude_user_id is not None:
-        conditions.append(models.Order.user_id != params.exclude_user_id)
+    状态取值有限，排除条件改写为包含其余状态（NOT IN 无法利用索引做范围查找）。
     
-    if params.order_time_start and params.order_time_end:
-        # 假设下单时间使用 created_at 字段
-        conditions.append(and_(
-            models.Order.created_at >= params.order_time_start,
-            models.Order.created_at <= params.order_time_end
-        ))
-    
-    if params.payment_time_start and params.payment_time_end:
-        conditions.append(and_(
-            models.Order.payment_time >= params.payment_time_start,
-            models.Order.payment_time <= params.payment_time_end
-        ))
-    
-    if params.shipping_time_start and params.shipping_time_end:
-        conditions.append(and_(
-            models.Order.shipping_time >= params.shipping_time_start,
-            models.Order.shipping_time <= params.shipping_time_end
-        ))
-    
-    if params.closing_time_start and params.closing_time_end:
-        conditions.append(and_(
-            models.Order.closing_time >= params.closing_time_start,
-            models.Order.closing_time <= params.closing_time_end
-        ))
-    
-    if params.confirmation_time_start and params.confirmation_time_end:
-        conditions.append(and_(
-            models.Order.confirmation_time >= params.confirmation_time_start,
-            models.Order.confirmation_time <= params.confirmation_time_end
-        ))
+    Returns:
+        需要匹配的状态列表，没有状态条件时返回 None
+    """
+    if not params.status_include and not params.status_exclude:
+        return None
     
-    if params.audit_status:
-        conditions.append(models.Order.audit_status.in_(params.audit_status))
+    if params.status_include:
+        statuses = [models.OrderStatus(status.value) for status in params.status_include]
+    else:
+        statuses = list(models.OrderStatus)
     
-    # 应用查询条件
-    if conditions:
-        query = query.filter(and_(*conditions))
+    excluded = {status.value for status in params.status_exclude or []}
+    return [status for status in dict.fromkeys(statuses) if status.value not in excluded]
+
+def _escape_like(term: str) -> str:
+    """转义 LIKE 通配符"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _resolve_match_mode(term: str, mode: schemas.TextMatchMode) -> Tuple[str, schemas.TextMatchMode]:
+    """
+    确定实际使用的匹配方式
     
-    # 执行查询
-    return query.offset(skip).limit(limit).all()
\ No newline at end of file
+    auto 模式下：末尾带 * 按前缀匹配；短于 ngram 分词长度的输入按前缀匹配（全文索引无法命中，
+    且单字符包含匹配几乎等于全表）；其余按包含匹配（MySQL 上走 ngram 全文索引）。
+    粘贴的订单号可能是中间一段，不能据长度断定为前缀，需要前缀匹配时用 * 或 prefix 模式。
+    
+    Returns:
+        (去掉 * 后的搜索词, 匹配方式)
+    
+    Raises:
+        ValueError: 搜索词只有 *（会匹配全部订单）
+    """
+    term = term.strip()
+    if term.endswith("*") and mode in (schemas.TextMatchMode.AUTO, schemas.TextMatchMode.PREFIX):
+        term = term.rstrip("*")
+        if not term:
+            raise ValueError("搜索词不能只包含 *")
+        return term, schemas.TextMatchMode.PREFIX
+    if mode != schemas.TextMatchMode.AUTO:
+        return term, mode
+    
+    if len(term) < NGRAM_TOKEN_SIZE:
+        return term, schemas.TextMatchMode.PREFIX
+    return term, schemas.TextMatchMode.CONTAINS
+
+def _prefix_condition(column, term: str, pattern: str):
+    """
+    前缀匹配条件：LIKE 之外再加上等价的范围条件 [term, 下一个前缀)
+    
+    MySQL 会把 LIKE 'x%' 改写为索引范围扫描，SQLite 默认不会（LIKE 不区分大小写），
+    显式的范围条件使两者都能走订单号/店铺ID索引。MySQL 的范围比较按列的排序规则
+    （不区分大小写），结果与 LIKE 一致；SQLite 上前缀匹配因此区分大小写。
+    """
+    like = column.like(f"{pattern}%", escape="\\")
+    if not term or ord(term[-1]) >= 0x10FFFF:
+        return like
+    upper = term[:-1] + chr(ord(term[-1]) + 1)
+    return and_(column >= term, column < upper, like)
+
+def _text_match_condition(db: Session, column, term: str, mode: schemas.TextMatchMode):
+    """
+    构建订单号/店铺ID的匹配条件
+    
+    精确和前缀匹配走普通索引；包含匹配在 MySQL 上走 ngram 全文索引（短语模式），
+    再用 LIKE 对候选行做一次复核；其他数据库（如本地 SQLite）退化为 LIKE 扫描。
+    """
+    term, mode = _resolve_match_mode(term, mode)
+    
+    if mode == schemas.TextMatchMode.EXACT:
+        return column == term
+    
+    pattern = _escape_like(term)
+    if mode == schemas.TextMatchMode.PREFIX:
+        return _prefix_condition(column, term, pattern)
+    
+    if db.get_bind().dialect.name == "mysql" and len(term) >= NGRAM_TOKEN_SIZE:
+        phrase = '"' + term.replace('"', " ") + '"'
+        return and_(column.match(phrase), column.like(f"%{pattern}%", escape="\\"))
+    return column.ilike(f"%{pattern}%", escape="\\")
@@ -0,0 +1,241 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from models import order_rollup as models
+from models import order as order_models
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 参与汇总的订单字段
+ROLLUP_FIELDS = ("created_at", "shop_id", "user_id", "status", "audit_status", "price")
+
+# 汇总键：(日期, 维度, 维度值, 订单状态, 审核状态)，值为 [订单数, 金额]
+RollupKey = Tuple[date, str, str, order_models.OrderStatus, order_models.AuditStatus]
+
+def rollup_snapshot(order) -> Optional[tuple]:
+    """
+    提取订单参与汇总的字段，用于计算变更前后的差值
+    
+    Args:
+        order: 订单模型对象或字段字典
+    
+    Returns:
+        汇总字段元组，缺少下单时间或状态的订单不参与汇总时返回 None
+    """
+    if isinstance(order, dict):
+        values = tuple(order.get(field) for field in ROLLUP_FIELDS)
+    else:
+        values = tuple(getattr(order, field, None) for field in ROLLUP_FIELDS)
+    
+    created_at, _, _, status, _, _ = values
+    if created_at is None or status is None:
+        return None
+    return values
+
+def rollup_deltas(before: Iterable[Optional[tuple]] = (), after: Iterable[Optional[tuple]] = ()) -> Dict[RollupKey, list]:
+    """
+    计算订单变更对每日汇总的增量
+    
+    Args:
+        before: 变更前的订单快照（删除或更新前）
+        after: 变更后的订单快照（新建或更新后）
+    
+    Returns:
+        {汇总键: [订单数增量, 金额增量]}，抵消为零的键不返回
+    """
+    deltas = {}
+    for sign, snapshots in ((-1, before), (1, after)):
+        for snapshot in snapshots:
+            if snapshot is None:
+                continue
+            created_at, shop_id, user_id, status, audit_status, price = snapshot
+            _accumulate(deltas, created_at.date(), shop_id, user_id, status, audit_status, sign, sign * float(price or 0))
+    
+    return {key: value for key, value in deltas.items() if value[0] or round(value[1], 2)}
+
+def apply_rollup_deltas(db: Session, deltas: Dict[RollupKey, list]) -> None:
+    """
+    将增量累加到每日汇总表（不提交，由调用方与订单写入放在同一事务中提交）
+    
+    MySQL 使用 INSERT ... ON DUPLICATE KEY UPDATE，SQLite/PostgreSQL 使用 ON CONFLICT，
+    一条语句完成；按汇总键排序写入，减少并发事务之间的死锁。
+    """
+    if not deltas:
+        return
+    
+    now = datetime.now()
+    rows = []
+    for key in sorted(deltas, key=_sort_key):
+        day, dimension, dimension_key, status, audit_status = key
+        order_count, amount = deltas[key]
+        rows.append({
+            "day": day,
+            "dimension": dimension,
+            "dimension_key": dimension_key,
+            "status": status,
+            "audit_status": audit_status,
+            "order_count": order_count,
+            "amount": round(amount, 2),
+            "updated_at": now
+        })
+    
+    table = models.OrderDailyRollup.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            order_count=table.c.order_count + stmt.inserted.order_count,
+            amount=table.c.amount + stmt.inserted.amount,
+            updated_at=stmt.inserted.updated_at
+        )
+        db.execute(stmt)
+    elif dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["day", "dimension", "dimension_key", "status", "audit_status"],
+            set_={
+                "order_count": table.c.order_count + stmt.excluded.order_count,
+                "amount": table.c.amount + stmt.excluded.amount,
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+        db.execute(stmt)
+    else:
+        for row in rows:
+            _apply_rollup_row(db, row)
+
+def rebuild_order_rollups(db: Session, start_day: date, end_day: date) -> int:
+    """
+    按订单表重新计算指定日期范围的每日汇总（回补或校正）
+    
+    逐天处理：先锁定当天的汇总行（MySQL 的 FOR UPDATE 同时锁住索引间隙），再聚合订单表，
+    删除当天的汇总行后按店铺、接单人分组写入，每天一个事务。并发的订单写入在累加当天
+    汇总时会等待重算提交后再写入增量；已在重算加锁前写入增量的事务提交后重算才能拿到锁，
+    聚合结果包含其变更，因此重算期间无需停止写入。
+    
+    Args:
+        start_day: 开始日期（含）
+        end_day: 结束日期（含）
+    
+    Returns:
+        写入的汇总行数
+    """
+    written = 0
+    day = start_day
+    while day <= end_day:
+        day_start = datetime.combine(day, datetime.min.time())
+        day_end = day_start + timedelta(days=1)
+        
+        try:
+            db.query(models.OrderDailyRollup.id).filter(models.OrderDailyRollup.day == day).with_for_update().all()
+            
+            deltas = {}
+            for dimension, column in (("shop", order_models.Order.shop_id), ("user", order_models.Order.user_id)):
+                rows = db.query(
+                    column,
+                    order_models.Order.status,
+                    order_models.Order.audit_status,
+                    func.count(order_models.Order.id),
+                    func.coalesce(func.sum(order_models.Order.price), 0)
+                ).filter(
+                    order_models.Order.created_at >= day_start,
+                    order_models.Order.created_at < day_end,
+                    column.isnot(None)
+                ).group_by(column, order_models.Order.status, order_models.Order.audit_status).all()
+                for dimension_key, status, audit_status, order_count, amount in rows:
+                    key = (day, dimension, str(dimension_key), status, audit_status or order_models.AuditStatus.UNAUDITED)
+                    value = deltas.setdefault(key, [0, 0.0])
+                    value[0] += order_count
+                    value[1] += float(amount)
+            
+            db.query(models.OrderDailyRollup).filter(models.OrderDailyRollup.day == day).delete(synchronize_session=False)
+            apply_rollup_deltas(db, deltas)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        written += len(deltas)
+        day += timedelta(days=1)
+    
+    return written
+
+def get_daily_report(
+    db: Session,
+    dimension: str,
+    start_day: date,
+    end_day: date,
+    dimension_key: Optional[str] = None,
+    status: Optional[List[order_models.OrderStatus]] = None,
+    audit_status: Optional[List[order_models.AuditStatus]] = None
+) -> List[dict]:
+    """
+    从每日汇总表读取报表，按 (日期, 维度值) 合并各状态
+    
+    Returns:
+        [{day, dimension_key, order_count, amount, status_counts, audit_status_counts}]，按日期、维度值排序
+    """
+    query = db.query(models.OrderDailyRollup).filter(
+        models.OrderDailyRollup.dimension == dimension,
+        models.OrderDailyRollup.day >= start_day,
+        models.OrderDailyRollup.day <= end_day,
+        models.OrderDailyRollup.order_count != 0
+    )
+    if dimension_key is not None:
+        query = query.filter(models.OrderDailyRollup.dimension_key == dimension_key)
+    if status:
+        query = query.filter(models.OrderDailyRollup.status.in_(status))
+    if audit_status:
+        query = query.filter(models.OrderDailyRollup.audit_status.in_(audit_status))
+    
+    report = {}
+    for rollup in query.all():
+        item = report.setdefault((rollup.day, rollup.dimension_key), {
+            "day": rollup.day,
+            "dimension_key": rollup.dimension_key,
+            "order_count": 0,
+            "amount": 0.0,
+            "status_counts": {},
+            "audit_status_counts": {}
+        })
+        item["order_count"] += rollup.order_count
+        item["amount"] = round(item["amount"] + rollup.amount, 2)
+        item["status_counts"][rollup.status.value] = item["status_counts"].get(rollup.status.value, 0) + rollup.order_count
+        item["audit_status_counts"][rollup.audit_status.value] = item["audit_status_counts"].get(rollup.audit_status.value, 0) + rollup.order_count
+    
+    return [report[key] for key in sorted(report)]
+
+def _accumulate(deltas: dict, day: date, shop_id, user_id, status, audit_status, order_count: int, amount: float) -> None:
+    """按店铺、接单人两个维度累加一笔订单的增量"""
+    status = order_models.OrderStatus(status)
+    audit_status = order_models.AuditStatus(audit_status or order_models.AuditStatus.UNAUDITED)
+    
+    keys = [("shop", str(shop_id))]
+    if user_id is not None:
+        keys.append(("user", str(user_id)))
+    
+    for dimension, dimension_key in keys:
+        value = deltas.setdefault((day, dimension, dimension_key, status, audit_status), [0, 0.0])
+        value[0] += order_count
+        value[1] += amount
+
+def _sort_key(key: RollupKey) -> tuple:
+    day, dimension, dimension_key, status, audit_status = key
+    return day, dimension, dimension_key, status.value, audit_status.value
+
+def _apply_rollup_row(db: Session, row: dict) -> None:
+    """其他数据库：先更新，不存在时插入"""
+    rollup = db.query(models.OrderDailyRollup).filter(
+        models.OrderDailyRollup.day == row["day"],
+        models.OrderDailyRollup.dimension == row["dimension"],
+        models.OrderDailyRollup.dimension_key == row["dimension_key"],
+        models.OrderDailyRollup.status == row["status"],
+        models.OrderDailyRollup.audit_status == row["audit_status"]
+    ).with_for_update().first()
+    if rollup is None:
+        db.add(models.OrderDailyRollup(**row))
+    else:
+        rollup.order_count += row["order_count"]
+        rollup.amount += row["amount"]
+        rollup.updated_at = row["updated_at"]
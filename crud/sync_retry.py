@@ -0,0 +1,175 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
+from models import sync_retry as models
+from crud import sync_state as sync_state_crud
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+# 默认最大重试次数，达到后不再领取；永久失败的记录直接置为该值
+MAX_ATTEMPTS = 5
+
+def get_sync_retries(db: Session, shop_id: Optional[str] = None, kind: Optional[str] = None, skip: int = 0, limit: int = 100):
+    """获取同步重试列表"""
+    query = db.query(models.SyncRetry)
+    if shop_id:
+        query = query.filter(models.SyncRetry.shop_id == shop_id)
+    if kind:
+        query = query.filter(models.SyncRetry.kind == kind)
+    return query.order_by(models.SyncRetry.next_attempt_at).offset(skip).limit(limit).all()
+
+def count_sync_retries(db: Session, max_attempts: Optional[int] = None) -> Dict[str, int]:
+    """按类型统计重试记录数，指定 max_attempts 时只统计仍会重试的记录"""
+    query = db.query(models.SyncRetry.kind, func.count(models.SyncRetry.id))
+    if max_attempts is not None:
+        query = query.filter(models.SyncRetry.attempts < max_attempts)
+    return dict(query.group_by(models.SyncRetry.kind).all())
+
+def enqueue_sync_retries(db: Session, entries: List[dict]) -> int:
+    """
+    批量登记同步失败的订单或页
+
+    按去重键预取已存在的记录：已存在的覆盖数据和失败原因，重试次数重置为登记值、
+    立即可领取并释放锁；不存在的批量插入，单个事务提交。登记项带 attempts 时
+    （如永久失败直接置为 MAX_ATTEMPTS）按给定值写入已重试次数，否则为 0。
+    时间统一取数据库时间，与领取时的比较保持一致。
+
+    Args:
+        entries: [{kind, shop_id, dedupe_key, payload, last_error, 可选 attempts}]
+
+    Returns:
+        登记的数量
+    """
+    if not entries:
+        return 0
+    
+    entries_by_key = {entry["dedupe_key"]: entry for entry in entries}
+    existing = dict(db.query(models.SyncRetry.dedupe_key, models.SyncRetry.id).filter(
+        models.SyncRetry.dedupe_key.in_(list(entries_by_key))
+    ).all())
+    
+    now = sync_state_crud.get_db_now(db)
+    inserts = []
+    updates = []
+    for key, entry in entries_by_key.items():
+        values = {
+            **entry,
+            "attempts": entry.get("attempts", 0),
+            "last_error": (entry.get("last_error") or "")[:500],
+            "next_attempt_at": now,
+            "updated_at": now
+        }
+        if key in existing:
+            values.update({"id": existing[key], "locked_by": None, "locked_until": None})
+            updates.append(values)
+        else:
+            values["created_at"] = now
+            inserts.append(values)
+    
+    try:
+        if inserts:
+            db.bulk_insert_mappings(models.SyncRetry, inserts)
+        if updates:
+            db.bulk_update_mappings(models.SyncRetry, updates)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return len(entries_by_key)
+
+def claim_sync_retries(db: Session, owner: str, limit: int = 500, max_attempts: int = MAX_ATTEMPTS, lock_seconds: int = 600):
+    """
+    领取到期的重试记录
+
+    先选出候选记录，再用带条件的 UPDATE 加锁，最后只返回本进程锁住的记录，
+    多个进程同时重放时不会重复处理同一条记录。锁的过期时间按数据库时间计算，
+    不受各进程时钟偏差影响。
+    """
+    now = sync_state_crud.get_db_now(db)
+    unlocked = or_(models.SyncRetry.locked_until.is_(None), models.SyncRetry.locked_until < now)
+    candidate_ids = [row.id for row in db.query(models.SyncRetry.id).filter(
+        models.SyncRetry.next_attempt_at <= now,
+        models.SyncRetry.attempts < max_attempts,
+        unlocked
+    ).order_by(models.SyncRetry.next_attempt_at).limit(limit).all()]
+    
+    if not candidate_ids:
+        db.rollback()
+        return []
+    
+    db.query(models.SyncRetry).filter(
+        models.SyncRetry.id.in_(candidate_ids),
+        unlocked
+    ).update({
+        models.SyncRetry.locked_by: owner,
+        models.SyncRetry.locked_until: now + timedelta(seconds=lock_seconds)
+    }, synchronize_session=False)
+    db.commit()
+    
+    return db.query(models.SyncRetry).filter(
+        models.SyncRetry.id.in_(candidate_ids),
+        models.SyncRetry.locked_by == owner
+    ).all()
+
+def delete_sync_retries(db: Session, retry_ids: List[int], owner: str):
+    """删除已重试成功的记录，只删除仍由本进程持有锁的记录（重放期间被重新登记的保留）"""
+    if not retry_ids:
+        return
+    db.query(models.SyncRetry).filter(
+        models.SyncRetry.id.in_(retry_ids),
+        models.SyncRetry.locked_by == owner
+    ).delete(synchronize_session=False)
+    db.commit()
+
+def mark_sync_retries_failed(db: Session, failures: Dict[int, Tuple[int, str]], base_delay: int = 60, max_delay: int = 6 * 3600):
+    """
+    记录重试失败：重试次数加一，按指数退避设置下次重试时间并释放锁
+
+    Args:
+        failures: {重试记录ID: (已重试次数, 失败原因)}
+        base_delay: 第一次重试失败后的等待秒数，之后每次翻倍
+        max_delay: 最长等待秒数
+    """
+    if not failures:
+        return
+    
+    now = sync_state_crud.get_db_now(db)
+    updates = []
+    for retry_id, (attempts, error) in failures.items():
+        attempts = (attempts or 0) + 1
+        delay = min(base_delay * (2 ** (attempts - 1)), max_delay)
+        updates.append({
+            "id": retry_id,
+            "attempts": attempts,
+            "last_error": str(error)[:500],
+            "next_attempt_at": now + timedelta(seconds=delay),
+            "locked_by": None,
+            "locked_until": None,
+            "updated_at": now
+        })
+    db.bulk_update_mappings(models.SyncRetry, updates)
+    db.commit()
+
+def give_up_sync_retries(db: Session, failures: Dict[int, str], max_attempts: int = MAX_ATTEMPTS):
+    """
+    记录永久失败（如数据校验不通过）：重试次数直接置为 max_attempts 并释放锁，
+    不再领取，保留在表中供人工排查
+
+    Args:
+        failures: {重试记录ID: 失败原因}
+        max_attempts: 最大重试次数
+    """
+    if not failures:
+        return
+    
+    now = sync_state_crud.get_db_now(db)
+    updates = [{
+        "id": retry_id,
+        "attempts": max_attempts,
+        "last_error": str(error)[:500],
+        "locked_by": None,
+        "locked_until": None,
+        "updated_at": now
+    } for retry_id, error in failures.items()]
+    db.bulk_update_mappings(models.SyncRetry, updates)
+    db.commit()
@@ -0,0 +1,97 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
+from models import sync_state as models
+from datetime import datetime, timedelta
+
+def get_sync_state(db: Session, shop_id: str):
+    """根据店铺ID获取同步状态"""
+    return db.query(models.SyncState).filter(models.SyncState.shop_id == shop_id).first()
+
+def get_sync_watermarks(db: Session):
+    """获取所有已有水位的店铺的增量同步水位：[(shop_id, last_modified)]"""
+    return db.query(models.SyncState.shop_id, models.SyncState.last_modified).filter(
+        models.SyncState.last_modified.isnot(None)
+    ).all()
+
+def update_sync_watermark(db: Session, shop_id: str, last_modified: datetime):
+    """更新店铺的增量同步水位，不存在时创建"""
+    db_state = get_sync_state(db, shop_id)
+    if not db_state:
+        db_state = models.SyncState(shop_id=shop_id)
+        db.add(db_state)
+    
+    db_state.last_modified = last_modified
+    db_state.last_synced_at = datetime.now()
+    db.commit()
+    db.refresh(db_state)
+    return db_state
+
+def upsert_sync_shop(
+    db: Session,
+    shop_id: str,
+    session_key: str,
+    sync_interval: int = 300,
+    concurrency: int = 1,
+    enabled: bool = True
+):
+    """登记或更新需要定时同步的店铺"""
+    db_state = get_sync_state(db, shop_id)
+    if not db_state:
+        db_state = models.SyncState(shop_id=shop_id)
+        db.add(db_state)
+    
+    db_state.session_key = session_key
+    db_state.sync_interval = sync_interval
+    db_state.concurrency = concurrency
+    db_state.enabled = enabled
+    db.commit()
+    db.refresh(db_state)
+    return db_state
+
+def get_db_now(db: Session) -> datetime:
+    """获取数据库当前时间，租约的过期时间统一按数据库时钟计算，不受各进程时钟偏差影响"""
+    return db.query(func.now()).scalar()
+
+def get_due_sync_states(db: Session, now: datetime, limit: int = 100):
+    """获取已到同步时间、且租约空闲或已过期（按数据库时间）的店铺"""
+    return db.query(models.SyncState).filter(
+        models.SyncState.enabled == True,
+        models.SyncState.session_key.isnot(None),
+        or_(models.SyncState.next_run_at.is_(None), models.SyncState.next_run_at <= now),
+        or_(models.SyncState.lease_expires_at.is_(None), models.SyncState.lease_expires_at < func.now())
+    ).order_by(models.SyncState.next_run_at).limit(limit).all()
+
+def acquire_sync_lease(db: Session, shop_id: str, owner: str, ttl_seconds: int) -> bool:
+    """
+    获取或续期店铺的同步租约
+
+    通过一条带条件的 UPDATE 原子地抢占：只有租约空闲、已过期或本身就由 owner
+    持有时才会更新成功，多个进程同时抢占时只有一个能拿到。过期判断和新的过期时间
+    都以数据库时间为准，各进程时钟不一致时也不会提前抢走他人的租约。
+    """
+    db_now = get_db_now(db)
+    updated = db.query(models.SyncState).filter(
+        models.SyncState.shop_id == shop_id,
+        or_(
+            models.SyncState.lease_owner.is_(None),
+            models.SyncState.lease_expires_at < func.now(),
+            models.SyncState.lease_owner == owner
+        )
+    ).update({
+        models.SyncState.lease_owner: owner,
+        models.SyncState.lease_expires_at: db_now + timedelta(seconds=ttl_seconds)
+    }, synchronize_session=False)
+    db.commit()
+    return updated == 1
+
+def release_sync_lease(db: Session, shop_id: str, owner: str, next_run_at: datetime):
+    """释放店铺的同步租约并设置下次同步时间"""
+    db.query(models.SyncState).filter(
+        models.SyncState.shop_id == shop_id,
+        models.SyncState.lease_owner == owner
+    ).update({
+        models.SyncState.lease_owner: None,
+        models.SyncState.lease_expires_at: None,
+        models.SyncState.next_run_at: next_run_at
+    }, synchronize_session=False)
+    db.commit()
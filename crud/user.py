@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
 from models import user as models
 from schemas import user as schemas
+from crud.versioning import update_versioned, load_detached
 from passlib.context import CryptContext
+from utils.pagination import Cursor, paginate
+from typing import Optional
 
 # 密码加密上下文
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -14,9 +17,9 @@ def get_user_by_username(db: Session, username: str):
     """根据用户名获取用户信息"""
     return db.query(models.User).filter(models.User.username == username).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    """获取用户列表"""
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, after: Optional[Cursor] = None):
+    """获取用户列表（按创建时间倒序，提供游标时按键集分页）"""
+    return paginate(db.query(models.User), models.User, skip, limit, after).all()
 
 def create_user(db: Session, user: schemas.UserCreate):
     """创建用户"""
@@ -51,11 +54,36 @@ def update_user(db: Session, user_id: int, user: schemas.UserUpdate):
         db_user.is_active = user.is_active
     if user.is_first_login is not None:
         db_user.is_first_login = user.is_first_login
+    db_user.version = models.User.version + 1
     
     db.commit()
     db.refresh(db_user)
     return db_user
 
+def patch_user(db: Session, user_id: int, patch: schemas.UserPatch):
+    """
+    部分更新用户（乐观锁，只写入请求中出现的字段）
+    
+    Returns:
+        与会话分离的用户对象，用户不存在时返回 None
+    
+    Raises:
+        VersionConflictError: 版本号与库中不一致
+    """
+    values = patch.model_dump(exclude_unset=True, exclude={"version"})
+    if "password" in values:
+        values["password_hash"] = pwd_context.hash(values.pop("password"))
+    try:
+        if not update_versioned(db, models.User, user_id, patch.version, values):
+            return None
+        db_user = load_detached(db, models.User, user_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return db_user
+
 def delete_user(db: Session, user_id: int):
     """删除用户"""
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
@@ -0,0 +1,53 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any
+
+class VersionConflictError(Exception):
+    """乐观锁冲突：记录在读取后已被其他请求修改"""
+    
+    def __init__(self, current_version: int):
+        super().__init__(f"记录已被修改，当前版本: {current_version}")
+        self.current_version = current_version
+
+def update_versioned(db: Session, model: Any, record_id: int, version: int, values: dict) -> bool:
+    """
+    按版本号更新一条记录（不提交）
+    
+    一条 UPDATE ... WHERE id = ? AND version = ? 写入指定字段并将版本号加一，
+    只有更新失败时才再查询一次，区分记录不存在和版本冲突。
+    
+    Args:
+        model: 模型类，需有 id、version、updated_at 字段
+        record_id: 记录ID
+        version: 客户端读取时的版本号
+        values: 要写入的字段
+    
+    Returns:
+        是否已更新，记录不存在时返回 False
+    
+    Raises:
+        VersionConflictError: 版本号不一致
+    """
+    result = db.execute(
+        update(model.__table__)
+        .where(model.id == record_id, model.version == version)
+        .values(**values, version=model.version + 1, updated_at=datetime.now())
+    )
+    if result.rowcount:
+        return True
+    
+    current = db.query(model.version).filter(model.id == record_id).scalar()
+    if current is None:
+        return False
+    raise VersionConflictError(current)
+
+def load_detached(db: Session, model: Any, record_id: int, *options) -> Any:
+    """
+    读取更新后的记录（按 options 预加载关联）并与会话分离
+    
+    分离后提交不会使对象过期，响应序列化时无需再 refresh 查询。
+    """
+    record = db.query(model).options(*options).populate_existing().filter(model.id == record_id).one()
+    db.expunge_all()
+    return record
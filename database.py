@@ -1,10 +1,22 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from utils.cache import TTLCache
+import hashlib
+import itertools
+import os
+import threading
 
 # 数据库连接URL，从环境变量获取或使用默认值
 SQLALCHEMY_DATABASE_URL = "mysql+pymysql://root:password@db:3306/order_management?charset=utf8mb4"
 
+# 只读副本连接URL，多个用逗号分隔；未配置时读请求也走主库
+REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()]
+
+# 客户端发起写请求后，该时间（秒）内的读请求仍走主库，避免因副本复制延迟读不到自己刚写入的数据
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
 # 创建数据库引擎
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
@@ -17,6 +29,21 @@ engine = create_engine(
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 只读副本的会话工厂，读请求轮询使用
+replica_session_factories = [
+    sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=create_engine(url, pool_size=10, max_overflow=20, pool_timeout=30, pool_recycle=3600)
+    )
+    for url in REPLICA_DATABASE_URLS
+]
+_replica_cycle = itertools.cycle(replica_session_factories)
+_replica_lock = threading.Lock()
+
+# 读己之写窗口内的客户端（进程内记录，多 worker 部署时需保证同一客户端落在同一进程）
+_recent_writers = TTLCache(maxsize=10000, ttl=READ_YOUR_WRITES_SECONDS)
+
 # 基类，用于创建数据库模型
 Base = declarative_base()
 
@@ -28,4 +55,31 @@ def get_db():
     finally:
         db.close()
 
+def client_key(request: Request) -> str:
+    """识别客户端：带登录令牌时按令牌，否则按来源地址"""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return "token:" + hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+    return "ip:" + (request.client.host if request.client else "")
+
+def mark_write(request: Request) -> None:
+    """记录客户端发起了写请求，读己之写窗口内其读请求走主库"""
+    if replica_session_factories:
+        _recent_writers.set(client_key(request), True)
+
+def read_sessionmaker(request: Request) -> sessionmaker:
+    """选择读请求的会话工厂：未配置副本或客户端处于读己之写窗口内时用主库，否则轮询副本"""
+    if not replica_session_factories or _recent_writers.get(client_key(request)):
+        return SessionLocal
+    with _replica_lock:
+        return next(_replica_cycle)
+
+# 只读接口的数据库依赖（列表、详情、搜索、报表），写操作仍使用 get_db
+def get_read_db(request: Request):
+    db = read_sessionmaker(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
 # print("Database module is imported successfully.")
\ No newline at end of file
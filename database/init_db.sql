@@ -11,10 +11,12 @@ CREATE TABLE IF NOT EXISTS users (
     phone VARCHAR(20) UNIQUE COMMENT '手机号',
     is_active TINYINT(1) DEFAULT 1 COMMENT '账号是否启用',
     is_first_login TINYINT(1) DEFAULT 1 COMMENT '是否首次登录',
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    version INT NOT NULL DEFAULT 1 COMMENT '版本号（乐观锁）',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     INDEX idx_username (username),
-    INDEX idx_email (email)
+    INDEX idx_email (email),
+    INDEX idx_users_created_at_id (created_at, id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='用户表';
 
 -- 创建订单表
@@ -32,15 +34,23 @@ CREATE TABLE IF NOT EXISTS orders (
     closing_time DATETIME COMMENT '关闭时间',
     confirmation_time DATETIME COMMENT '确认收货时间',
     is_bound TINYINT(1) DEFAULT 1 COMMENT '订单绑定状态',
+    sync_fingerprint VARCHAR(32) COMMENT '淘宝同步字段指纹',
     user_id INT COMMENT '接单人ID',
     order_type ENUM('淘宝网') DEFAULT '淘宝网' COMMENT '订单类型',
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    version INT NOT NULL DEFAULT 1 COMMENT '版本号（乐观锁）',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     INDEX idx_shop_id (shop_id),
     INDEX idx_order_number (order_number),
     INDEX idx_status (status),
     INDEX idx_audit_status (audit_status),
     INDEX idx_user_id (user_id),
+    INDEX idx_orders_created_at_id (created_at, id),
+    INDEX idx_orders_bound_status_created (is_bound, status, created_at, id),
+    INDEX idx_orders_user_created (user_id, created_at, id),
+    INDEX idx_orders_audit_created (audit_status, created_at, id),
+    FULLTEXT INDEX ft_orders_order_number (order_number) WITH PARSER ngram,
+    FULLTEXT INDEX ft_orders_shop_id (shop_id) WITH PARSER ngram,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='订单表';
 
@@ -53,12 +63,64 @@ CREATE TABLE IF NOT EXISTS invoices (
     invoice_type VARCHAR(50) NOT NULL COMMENT '发票类型',
     issuing_date DATETIME NOT NULL COMMENT '开票日期',
     remark VARCHAR(255) COMMENT '备注',
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    version INT NOT NULL DEFAULT 1 COMMENT '版本号（乐观锁）',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     INDEX idx_invoice_number (invoice_number),
+    INDEX idx_invoices_created_at_id (created_at, id),
     FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='发票表';
 
+-- 创建订单同步状态表
+CREATE TABLE IF NOT EXISTS sync_states (
+    id INT AUTO_INCREMENT PRIMARY KEY COMMENT 'ID',
+    shop_id VARCHAR(50) NOT NULL UNIQUE COMMENT '店铺ID',
+    last_modified DATETIME COMMENT '增量同步水位（已同步到的订单修改时间）',
+    last_synced_at DATETIME COMMENT '最近一次成功同步时间',
+    session_key VARCHAR(255) COMMENT '淘宝会话令牌',
+    enabled TINYINT(1) DEFAULT 1 COMMENT '是否启用定时同步',
+    sync_interval INT DEFAULT 300 COMMENT '同步间隔（秒）',
+    concurrency INT DEFAULT 1 COMMENT '单店铺同步时并发预取的页数',
+    next_run_at DATETIME COMMENT '下次同步时间',
+    lease_owner VARCHAR(100) COMMENT '租约持有者',
+    lease_expires_at DATETIME COMMENT '租约过期时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    INDEX idx_next_run_at (next_run_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='订单同步状态表';
+
+-- 创建同步失败重试表
+CREATE TABLE IF NOT EXISTS sync_retries (
+    id INT AUTO_INCREMENT PRIMARY KEY COMMENT 'ID',
+    kind VARCHAR(10) NOT NULL COMMENT '类型：trade 单个订单，page 一页订单',
+    shop_id VARCHAR(50) COMMENT '店铺ID',
+    dedupe_key VARCHAR(255) NOT NULL UNIQUE COMMENT '去重键，同一订单/页只保留一条',
+    payload TEXT NOT NULL COMMENT '重试所需数据（JSON）：订单原始数据或页请求参数',
+    attempts INT NOT NULL DEFAULT 0 COMMENT '已重试次数',
+    last_error VARCHAR(500) COMMENT '最近一次失败原因',
+    next_attempt_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '下次重试时间',
+    locked_by VARCHAR(100) COMMENT '正在重试的进程',
+    locked_until DATETIME COMMENT '重试锁过期时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    INDEX idx_shop_id (shop_id),
+    INDEX idx_next_attempt_at (next_attempt_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='同步失败重试表';
+
+-- 创建订单每日汇总表
+CREATE TABLE IF NOT EXISTS order_daily_rollups (
+    id INT AUTO_INCREMENT PRIMARY KEY COMMENT 'ID',
+    day DATE NOT NULL COMMENT '下单日期',
+    dimension VARCHAR(10) NOT NULL COMMENT '维度：shop 店铺，user 接单人',
+    dimension_key VARCHAR(50) NOT NULL COMMENT '维度值：店铺ID或接单人ID',
+    status ENUM('买家已付款等待发货', '交易关闭', '交易成功', '部分退款', '卖家已发货等待买家确认') NOT NULL COMMENT '订单状态',
+    audit_status ENUM('未审核', '已审核', '已结算', '未结算') NOT NULL COMMENT '审核状态',
+    order_count INT NOT NULL DEFAULT 0 COMMENT '订单数',
+    amount DECIMAL(14, 2) NOT NULL DEFAULT 0 COMMENT '订单金额合计',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    UNIQUE KEY uq_order_daily_rollups_key (day, dimension, dimension_key, status, audit_status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='订单每日汇总表';
+
 -- 添加示例数据
 -- 添加管理员用户
 INSERT INTO users (username, password_hash, email, is_active, is_first_login)
@@ -0,0 +1,11 @@
+-- 增量同步水位表
+USE order_management;
+
+CREATE TABLE IF NOT EXISTS sync_states (
+    id INT AUTO_INCREMENT PRIMARY KEY COMMENT 'ID',
+    shop_id VARCHAR(50) NOT NULL UNIQUE COMMENT '店铺ID',
+    last_modified DATETIME COMMENT '增量同步水位（已同步到的订单修改时间）',
+    last_synced_at DATETIME COMMENT '最近一次成功同步时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='订单同步状态表';
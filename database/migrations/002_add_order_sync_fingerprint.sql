@@ -0,0 +1,5 @@
+-- 订单同步字段指纹，用于跳过未变化订单的写入
+USE order_management;
+
+ALTER TABLE orders
+    ADD COLUMN sync_fingerprint VARCHAR(32) COMMENT '淘宝同步字段指纹' AFTER is_bound;
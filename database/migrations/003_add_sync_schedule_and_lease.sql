@@ -0,0 +1,12 @@
+-- 定时同步配置与同步租约
+USE order_management;
+
+ALTER TABLE sync_states
+    ADD COLUMN session_key VARCHAR(255) COMMENT '淘宝会话令牌' AFTER last_synced_at,
+    ADD COLUMN enabled TINYINT(1) DEFAULT 1 COMMENT '是否启用定时同步' AFTER session_key,
+    ADD COLUMN sync_interval INT DEFAULT 300 COMMENT '同步间隔（秒）' AFTER enabled,
+    ADD COLUMN concurrency INT DEFAULT 1 COMMENT '单店铺同步时并发预取的页数' AFTER sync_interval,
+    ADD COLUMN next_run_at DATETIME COMMENT '下次同步时间' AFTER concurrency,
+    ADD COLUMN lease_owner VARCHAR(100) COMMENT '租约持有者' AFTER next_run_at,
+    ADD COLUMN lease_expires_at DATETIME COMMENT '租约过期时间' AFTER lease_owner,
+    ADD INDEX idx_next_run_at (next_run_at);
@@ -0,0 +1,19 @@
+-- 同步失败重试表
+USE order_management;
+
+CREATE TABLE IF NOT EXISTS sync_retries (
+    id INT AUTO_INCREMENT PRIMARY KEY COMMENT 'ID',
+    kind VARCHAR(10) NOT NULL COMMENT '类型：trade 单个订单，page 一页订单',
+    shop_id VARCHAR(50) COMMENT '店铺ID',
+    dedupe_key VARCHAR(255) NOT NULL UNIQUE COMMENT '去重键，同一订单/页只保留一条',
+    payload TEXT NOT NULL COMMENT '重试所需数据（JSON）：订单原始数据或页请求参数',
+    attempts INT NOT NULL DEFAULT 0 COMMENT '已重试次数',
+    last_error VARCHAR(500) COMMENT '最近一次失败原因',
+    next_attempt_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '下次重试时间',
+    locked_by VARCHAR(100) COMMENT '正在重试的进程',
+    locked_until DATETIME COMMENT '重试锁过期时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    INDEX idx_shop_id (shop_id),
+    INDEX idx_next_attempt_at (next_attempt_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='同步失败重试表';
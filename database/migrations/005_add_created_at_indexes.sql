@@ -0,0 +1,6 @@
+-- 列表按 (创建时间, ID) 倒序键集分页所需的索引
+USE order_management;
+
+ALTER TABLE orders ADD INDEX idx_orders_created_at_id (created_at, id);
+ALTER TABLE invoices ADD INDEX idx_invoices_created_at_id (created_at, id);
+ALTER TABLE users ADD INDEX idx_users_created_at_id (created_at, id);
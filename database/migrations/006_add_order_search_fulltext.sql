@@ -0,0 +1,5 @@
+-- 订单号/店铺ID包含搜索使用的 ngram 全文索引（分词长度取 ngram_token_size，默认 2）
+USE order_management;
+
+ALTER TABLE orders ADD FULLTEXT INDEX ft_orders_order_number (order_number) WITH PARSER ngram;
+ALTER TABLE orders ADD FULLTEXT INDEX ft_orders_shop_id (shop_id) WITH PARSER ngram;
@@ -0,0 +1,10 @@
+-- 订单搜索常用过滤组合的组合索引
+-- 待发货/已发货看板：is_bound + status + 付款时间范围
+-- 我的订单：user_id + status，按创建时间排序
+-- 审核看板：audit_status，按创建时间排序
+USE order_management;
+
+ALTER TABLE orders
+    ADD INDEX idx_orders_bound_status_payment (is_bound, status, payment_time),
+    ADD INDEX idx_orders_user_status_created (user_id, status, created_at),
+    ADD INDEX idx_orders_audit_created (audit_status, created_at);
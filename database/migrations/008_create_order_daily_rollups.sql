@@ -0,0 +1,15 @@
+-- 订单每日汇总表（按店铺、接单人维度），创建后运行 python -m scripts.backfill_order_rollups 回补历史数据
+USE order_management;
+
+CREATE TABLE IF NOT EXISTS order_daily_rollups (
+    id INT AUTO_INCREMENT PRIMARY KEY COMMENT 'ID',
+    day DATE NOT NULL COMMENT '下单日期',
+    dimension VARCHAR(10) NOT NULL COMMENT '维度：shop 店铺，user 接单人',
+    dimension_key VARCHAR(50) NOT NULL COMMENT '维度值：店铺ID或接单人ID',
+    status ENUM('买家已付款等待发货', '交易关闭', '交易成功', '部分退款', '卖家已发货等待买家确认') NOT NULL COMMENT '订单状态',
+    audit_status ENUM('未审核', '已审核', '已结算', '未结算') NOT NULL COMMENT '审核状态',
+    order_count INT NOT NULL DEFAULT 0 COMMENT '订单数',
+    amount DECIMAL(14, 2) NOT NULL DEFAULT 0 COMMENT '订单金额合计',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    UNIQUE KEY uq_order_daily_rollups_key (day, dimension, dimension_key, status, audit_status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='订单每日汇总表';
@@ -0,0 +1,6 @@
+-- 订单、发票、用户增加版本号，用于 PATCH 接口的乐观锁
+USE order_management;
+
+ALTER TABLE orders ADD COLUMN version INT NOT NULL DEFAULT 1 COMMENT '版本号（乐观锁）' AFTER order_type;
+ALTER TABLE invoices ADD COLUMN version INT NOT NULL DEFAULT 1 COMMENT '版本号（乐观锁）' AFTER remark;
+ALTER TABLE users ADD COLUMN version INT NOT NULL DEFAULT 1 COMMENT '版本号（乐观锁）' AFTER is_first_login;
@@ -0,0 +1,6 @@
+-- 失败页的重试数据不再保存淘宝会话令牌，重放时按 shop_id 从 sync_states 读取
+USE order_management;
+
+UPDATE sync_retries
+SET payload = JSON_REMOVE(payload, '$.session')
+WHERE kind = 'page' AND JSON_VALID(payload) AND JSON_CONTAINS_PATH(payload, 'one', '$.session');
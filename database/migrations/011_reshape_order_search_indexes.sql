@@ -0,0 +1,13 @@
+-- 订单搜索组合索引改为以 (created_at, id) 结尾，提示索引时结果按索引顺序返回，不再额外排序
+-- 待发货/已发货看板：is_bound + status，付款时间范围在索引扫描时过滤
+-- 我的订单：user_id，状态在索引扫描时过滤
+-- 审核看板：audit_status
+USE order_management;
+
+ALTER TABLE orders
+    DROP INDEX idx_orders_bound_status_payment,
+    DROP INDEX idx_orders_user_status_created,
+    DROP INDEX idx_orders_audit_created,
+    ADD INDEX idx_orders_bound_status_created (is_bound, status, created_at, id),
+    ADD INDEX idx_orders_user_created (user_id, created_at, id),
+    ADD INDEX idx_orders_audit_created (audit_status, created_at, id);
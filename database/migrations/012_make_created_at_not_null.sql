@@ -0,0 +1,12 @@
+-- 列表按 (created_at, id) 键集分页，游标不能为空：订单、发票、用户的创建时间改为必填
+-- 历史空值按更新时间（为空时取当前时间）补齐；补齐的订单此前未计入每日汇总，
+-- 执行后用 python -m scripts.backfill_order_rollups 重算受影响的日期
+USE order_management;
+
+UPDATE orders SET created_at = COALESCE(updated_at, NOW()) WHERE created_at IS NULL;
+UPDATE invoices SET created_at = COALESCE(updated_at, NOW()) WHERE created_at IS NULL;
+UPDATE users SET created_at = COALESCE(updated_at, NOW()) WHERE created_at IS NULL;
+
+ALTER TABLE orders MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间';
+ALTER TABLE invoices MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间';
+ALTER TABLE users MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间';
@@ -1,9 +1,10 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from models import invoice, order, user
 from database import SessionLocal, engine
 from routers import user, order, invoice
+import asyncio
 import sys
 import os
 
@@ -12,17 +13,46 @@ order_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, order_dir)
 
 from models import invoice, order, user
-from database import SessionLocal, engine
-from routers import user, order, invoice
+from database import SessionLocal, engine, mark_write
+from routers import user, order, invoice, sync, report
+from services.sync_scheduler import SyncScheduler
+from utils.taobao_client import TaobaoClient
+from contextlib import asynccontextmanager
 
 # 创建数据库表
 models.Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：按配置启动/停止订单定时同步调度器"""
+    scheduler = None
+    if os.getenv("SYNC_SCHEDULER_ENABLED", "false").lower() == "true":
+        taobao_client = TaobaoClient(
+            app_key=os.getenv("TAOBAO_APP_KEY", ""),
+            app_secret=os.getenv("TAOBAO_APP_SECRET", ""),
+            sandbox=os.getenv("TAOBAO_SANDBOX", "false").lower() == "true"
+        )
+        scheduler = SyncScheduler(
+            SessionLocal,
+            taobao_client,
+            max_concurrent_shops=int(os.getenv("SYNC_MAX_CONCURRENT_SHOPS", "4")),
+            poll_interval=int(os.getenv("SYNC_POLL_INTERVAL", "10"))
+        )
+        scheduler.start()
+    
+    yield
+    
+    if scheduler:
+        # stop 会等待正在执行的同步任务结束，放到线程中执行，不阻塞事件循环
+        await asyncio.to_thread(scheduler.stop)
+        scheduler.taobao_client.close()
+
 # 创建FastAPI应用实例
 app = FastAPI(
     title="订单管理系统",
     description="用于对接淘宝网订单的管理系统",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # 配置CORS
@@ -37,8 +67,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 允许前端读取列表接口返回的下一页游标
+    expose_headers=["X-Next-Cursor"],
 )
 
+# 请求体传搜索条件的只读 POST 接口，不视为写请求
+READ_ONLY_POST_SUFFIXES = ("/search", "/export")
+
+@app.middleware("http")
+async def track_writes(request: Request, call_next):
+    """
+    记录发起写请求的客户端，读己之写窗口内其读请求走主库
+    
+    写请求处理完成、且成功（状态码小于 400）后才记录：窗口从写入提交后开始计算，
+    失败的写请求不会让该客户端的读请求无谓地回到主库。
+    """
+    response = await call_next(request)
+    if (
+        response.status_code < 400
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and not request.url.path.rstrip("/").endswith(READ_ONLY_POST_SUFFIXES)
+    ):
+        mark_write(request)
+    return response
+
 # 数据库依赖
 def get_db():
     db = SessionLocal()
@@ -51,6 +103,8 @@ def get_db():
 app.include_router(user.router, prefix="/api/users", tags=["用户管理"])
 app.include_router(order.router, prefix="/api/orders", tags=["订单管理"])
 app.include_router(invoice.router, prefix="/api/invoices", tags=["发票管理"])
+app.include_router(sync.router, prefix="/api/sync", tags=["订单同步"])
+app.include_router(report.router, prefix="/api/reports", tags=["报表"])
 
 # 根路径
 @app.get("/")
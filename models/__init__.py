@@ -2,4 +2,7 @@
 from .token import Token
 from .invoice import Invoice
 from .order import Order
-from .user import User
\ No newline at end of file
+from .user import User
+from .sync_state import SyncState
+from .sync_retry import SyncRetry
+from .order_rollup import OrderDailyRollup
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -6,6 +6,10 @@ from .base import Base
 class Invoice(Base):
     """发票表模型"""
     __tablename__ = "invoices"
+    __table_args__ = (
+        # 列表按 (创建时间, ID) 倒序键集分页
+        Index("idx_invoices_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, comment="发票ID")
     invoice_number = Column(String(50), unique=True, index=True, nullable=False, comment="发票号")
@@ -18,5 +22,6 @@ class Invoice(Base):
     # 关联订单表
     order = relationship("Order", backref="invoices")
     
-    created_at = Column(DateTime, default=datetime.now, comment="创建时间")
+    version = Column(Integer, default=1, nullable=False, comment="版本号（乐观锁）")
+    created_at = Column(DateTime, default=datetime.now, nullable=False, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -26,6 +26,18 @@ class OrderType(str, enum.Enum):
 class Order(Base):
     """订单表模型"""
     __tablename__ = "orders"
+    __table_args__ = (
+        # 列表按 (创建时间, ID) 倒序键集分页
+        Index("idx_orders_created_at_id", "created_at", "id"),
+        # 订单搜索常用过滤组合，见 crud.order.choose_search_index；
+        # 等值列之后以 (创建时间, ID) 结尾，结果按索引顺序返回，分页不需要额外排序
+        Index("idx_orders_bound_status_created", "is_bound", "status", "created_at", "id"),
+        Index("idx_orders_user_created", "user_id", "created_at", "id"),
+        Index("idx_orders_audit_created", "audit_status", "created_at", "id"),
+        # 订单号/店铺ID包含搜索（仅 MySQL 生效）
+        Index("ft_orders_order_number", "order_number", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+        Index("ft_orders_shop_id", "shop_id", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, comment="订单ID")
     shop_id = Column(String(50), index=True, nullable=False, comment="店铺ID")
@@ -40,6 +52,7 @@ class Order(Base):
     closing_time = Column(DateTime, nullable=True, comment="关闭时间")
     confirmation_time = Column(DateTime, nullable=True, comment="确认收货时间")
     is_bound = Column(Boolean, default=True, comment="订单绑定状态")
+    sync_fingerprint = Column(String(32), nullable=True, comment="淘宝同步字段指纹")
     
     # 关联用户表
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, comment="接单人ID")
@@ -48,5 +61,6 @@ class Order(Base):
     # 订单类型
     order_type = Column(Enum(OrderType), default=OrderType.TAOBAO, comment="订单类型")
     
-    created_at = Column(DateTime, default=datetime.now, comment="创建时间")
+    version = Column(Integer, default=1, nullable=False, comment="版本号（乐观锁）")
+    created_at = Column(DateTime, default=datetime.now, nullable=False, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum, UniqueConstraint
+from datetime import datetime
+from .base import Base
+from .order import OrderStatus, AuditStatus
+
+class OrderDailyRollup(Base):
+    """订单每日汇总表模型（按店铺、接单人两个维度）"""
+    __tablename__ = "order_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "dimension", "dimension_key", "status", "audit_status", name="uq_order_daily_rollups_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True, comment="ID")
+    day = Column(Date, nullable=False, comment="下单日期")
+    dimension = Column(String(10), nullable=False, comment="维度：shop 店铺，user 接单人")
+    dimension_key = Column(String(50), nullable=False, comment="维度值：店铺ID或接单人ID")
+    status = Column(Enum(OrderStatus), nullable=False, comment="订单状态")
+    audit_status = Column(Enum(AuditStatus), nullable=False, comment="审核状态")
+    order_count = Column(Integer, default=0, nullable=False, comment="订单数")
+    amount = Column(Float, default=0, nullable=False, comment="订单金额合计")
+    
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
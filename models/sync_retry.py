@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from datetime import datetime
+from .base import Base
+
+class SyncRetry(Base):
+    """同步失败重试表模型"""
+    __tablename__ = "sync_retries"
+    
+    id = Column(Integer, primary_key=True, index=True, comment="ID")
+    kind = Column(String(10), nullable=False, comment="类型：trade 单个订单，page 一页订单")
+    shop_id = Column(String(50), index=True, nullable=True, comment="店铺ID")
+    dedupe_key = Column(String(255), unique=True, nullable=False, comment="去重键，同一订单/页只保留一条")
+    payload = Column(Text, nullable=False, comment="重试所需数据（JSON）：订单原始数据或页请求参数")
+    attempts = Column(Integer, default=0, nullable=False, comment="已重试次数")
+    last_error = Column(String(500), nullable=True, comment="最近一次失败原因")
+    next_attempt_at = Column(DateTime, default=datetime.now, index=True, comment="下次重试时间")
+    locked_by = Column(String(100), nullable=True, comment="正在重试的进程")
+    locked_until = Column(DateTime, nullable=True, comment="重试锁过期时间")
+    
+    created_at = Column(DateTime, default=datetime.now, comment="创建时间")
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from datetime import datetime
+from .base import Base
+
+class SyncState(Base):
+    """订单同步状态表模型"""
+    __tablename__ = "sync_states"
+    
+    id = Column(Integer, primary_key=True, index=True, comment="ID")
+    shop_id = Column(String(50), unique=True, index=True, nullable=False, comment="店铺ID")
+    last_modified = Column(DateTime, nullable=True, comment="增量同步水位（已同步到的订单修改时间）")
+    last_synced_at = Column(DateTime, nullable=True, comment="最近一次成功同步时间")
+    
+    # 定时同步配置
+    session_key = Column(String(255), nullable=True, comment="淘宝会话令牌")
+    enabled = Column(Boolean, default=True, comment="是否启用定时同步")
+    sync_interval = Column(Integer, default=300, comment="同步间隔（秒）")
+    concurrency = Column(Integer, default=1, comment="单店铺同步时并发预取的页数")
+    next_run_at = Column(DateTime, nullable=True, index=True, comment="下次同步时间")
+    
+    # 同步租约，保证同一店铺同一时刻只有一个进程在同步
+    lease_owner = Column(String(100), nullable=True, comment="租约持有者")
+    lease_expires_at = Column(DateTime, nullable=True, comment="租约过期时间")
+    
+    created_at = Column(DateTime, default=datetime.now, comment="创建时间")
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
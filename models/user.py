@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -6,6 +6,10 @@ from .base import Base
 class User(Base):
     """用户表模型"""
     __tablename__ = "users"
+    __table_args__ = (
+        # 列表按 (创建时间, ID) 倒序键集分页
+        Index("idx_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, comment="用户ID")
     username = Column(String(50), unique=True, index=True, nullable=False, comment="用户名")
@@ -14,7 +18,8 @@ class User(Base):
     phone = Column(String(20), unique=True, index=True, nullable=True, comment="手机号")
     is_active = Column(Boolean, default=True, comment="账号是否启用")
     is_first_login = Column(Boolean, default=True, comment="是否首次登录")
-    created_at = Column(DateTime, default=datetime.now, comment="创建时间")
+    version = Column(Integer, default=1, nullable=False, comment="版本号（乐观锁）")
+    created_at = Column(DateTime, default=datetime.now, nullable=False, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
     # 定义与订单表的关系
@@ -3,9 +3,12 @@ from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from schemas import user as schemas
 from crud import user as crud
+from crud.order import ORDER_FIELDS
 from database import get_db
 from jose import JWTError, jwt
 from fastapi.security import OAuth2PasswordBearer
+from utils.pagination import Cursor, decode_cursor
+from typing import List, Optional
 import os
 
 # 安全设置
@@ -35,4 +38,23 @@ async def get_current_active_user(token: str = Depends(oauth2_scheme), db: Sessi
         raise credentials_exception
     if not user.is_active:
         raise HTTPException(status_code=400, detail="非活跃用户")
-    return user
\ No newline at end of file
+    return user
+
+def get_page_cursor(cursor: Optional[str] = None) -> Optional[Cursor]:
+    """解析列表接口的分页游标参数，格式错误时返回 400"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def get_order_fields(fields: Optional[str] = None) -> Optional[List[str]]:
+    """解析订单列表的字段选择参数（逗号分隔），包含不支持的字段时返回 400"""
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in ORDER_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"不支持的字段: {', '.join(unknown)}，可选字段: {', '.join(ORDER_FIELDS)}")
+    return names or None
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from schemas import invoice as schemas
 from crud import invoice as crud
-from database import get_db
-from typing import List
+from crud.versioning import VersionConflictError
+from database import get_db, get_read_db
+from typing import List, Optional
+from utils.pagination import Cursor, NEXT_CURSOR_HEADER, next_cursor
+from .dependencies import get_page_cursor
 
 # 路由实例
 router = APIRouter()
@@ -23,13 +26,23 @@ def create_invoice(invoice: schemas.InvoiceCreate, db: Session = Depends(get_db)
     return crud.create_invoice(db=db, invoice=invoice)
 
 @router.get("/", response_model=List[schemas.Invoice])
-def read_invoices(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """获取发票列表"""
-    invoices = crud.get_invoices(db, skip=skip, limit=limit)
+def read_invoices(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Cursor] = Depends(get_page_cursor),
+    include_nested: bool = True,
+    db: Session = Depends(get_read_db)
+):
+    """获取发票列表（下一页游标见响应头 X-Next-Cursor，传入 cursor 参数翻页；include_nested=false 时不返回关联订单）"""
+    invoices = crud.get_invoices(db, skip=skip, limit=limit, after=after, include_nested=include_nested)
+    cursor = next_cursor(invoices, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
     return invoices
 
 @router.get("/{invoice_id}", response_model=schemas.Invoice)
-def read_invoice(invoice_id: int, db: Session = Depends(get_db)):
+def read_invoice(invoice_id: int, db: Session = Depends(get_read_db)):
     """获取单个发票"""
     db_invoice = crud.get_invoice(db, invoice_id=invoice_id)
     if db_invoice is None:
@@ -44,6 +57,17 @@ def update_invoice(invoice_id: int, invoice: schemas.InvoiceUpdate, db: Session
         raise HTTPException(status_code=404, detail="发票不存在")
     return db_invoice
 
+@router.patch("/{invoice_id}", response_model=schemas.Invoice)
+def patch_invoice(invoice_id: int, patch: schemas.InvoicePatch, db: Session = Depends(get_db)):
+    """部分更新发票：只修改请求中的字段，version 与库中不一致（已被他人修改）时返回 409"""
+    try:
+        db_invoice = crud.patch_invoice(db, invoice_id=invoice_id, patch=patch)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=f"发票已被修改，请刷新后重试（当前版本 {e.current_version}）")
+    if db_invoice is None:
+        raise HTTPException(status_code=404, detail="发票不存在")
+    return db_invoice
+
 @router.delete("/{invoice_id}", response_model=schemas.MessageResponse)
 def delete_invoice(invoice_id: int, db: Session = Depends(get_db)):
     """删除发票"""
@@ -1,9 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from schemas import order as schemas
 from crud import order as crud
-from database import get_db
-from typing import List
+from models import order as models
+from crud import order_rollup as rollup_crud
+from crud import user as user_crud
+from crud.versioning import VersionConflictError
+from services.order_import import OrderImportService
+from services.order_export import OrderExportService
+from database import get_db, get_read_db, read_sessionmaker
+from datetime import datetime
+from typing import Any, List, Optional, Union
+import enum
+from utils.pagination import Cursor, NEXT_CURSOR_HEADER, next_cursor
+from .dependencies import get_order_fields, get_page_cursor
 from user import get_current_user
 from schemas.user import User
 
@@ -19,14 +30,58 @@ def create_order(order: schemas.OrderCreate, db: Session = Depends(get_db)):
     
     return crud.create_order(db=db, order=order)
 
+@router.post("/import", response_model=schemas.OrderImportResult)
+def import_orders(
+    file: UploadFile = File(...),
+    format: Optional[schemas.FileFormat] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    批量导入订单（CSV 或 NDJSON）
+    
+    CSV 首行为字段名，字段与创建订单一致，另可带 created_at 作为下单时间。
+    未指定 format 时按文件扩展名判断（.csv / .ndjson / .jsonl）。
+    订单号已存在的行跳过，校验失败的行在结果中按行号列出。
+    """
+    if format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv"):
+            format = schemas.FileFormat.CSV
+        elif filename.endswith((".ndjson", ".jsonl")):
+            format = schemas.FileFormat.NDJSON
+        else:
+            raise HTTPException(status_code=400, detail="无法识别文件格式，请指定 format 参数（csv 或 ndjson）")
+    
+    return OrderImportService(db).import_orders(file.file, format)
+
 @router.get("/", response_model=List[schemas.Order])
-def read_orders(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """获取订单列表"""
-    orders = crud.get_orders(db, skip=skip, limit=limit)
+def read_orders(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Cursor] = Depends(get_page_cursor),
+    fields: Optional[List[str]] = Depends(get_order_fields),
+    include_nested: bool = True,
+    db: Session = Depends(get_read_db)
+):
+    """
+    获取订单列表（下一页游标见响应头 X-Next-Cursor，传入 cursor 参数翻页）
+    
+    fields=id,order_number,status 时只查询并返回这些字段（不含接单人对象）；
+    include_nested=false 时不加载接单人，user 返回空。
+    """
+    orders = crud.get_orders(db, skip=skip, limit=limit, after=after, fields=fields, include_nested=include_nested)
+    cursor = next_cursor(orders, limit)
+    if fields:
+        return _projected_response([_project_row(row, fields) for row in orders], cursor)
+    
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
     return orders
 
 @router.get("/{order_id}", response_model=schemas.Order)
-def read_order(order_id: int, db: Session = Depends(get_db)):
+def read_order(order_id: int, db: Session = Depends(get_read_db)):
     """获取单个订单"""
     db_order = crud.get_order(db, order_id=order_id)
     if db_order is None:
@@ -41,6 +96,17 @@ def update_order(order_id: int, order: schemas.OrderUpdate, db: Session = Depend
         raise HTTPException(status_code=404, detail="订单不存在")
     return db_order
 
+@router.patch("/{order_id}", response_model=schemas.Order)
+def patch_order(order_id: int, patch: schemas.OrderPatch, db: Session = Depends(get_db)):
+    """部分更新订单：只修改请求中的字段，version 与库中不一致（已被他人修改）时返回 409"""
+    try:
+        db_order = crud.patch_order(db, order_id=order_id, patch=patch)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=f"订单已被修改，请刷新后重试（当前版本 {e.current_version}）")
+    if db_order is None:
+        raise HTTPException(status_code=404, detail="订单不存在")
+    return db_order
+
 @router.delete("/{order_id}", response_model=schemas.MessageResponse)
 def delete_order(order_id: int, db: Session = Depends(get_db)):
     """删除订单"""
@@ -49,16 +115,138 @@ def delete_order(order_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="订单不存在")
     return {"message": "订单已删除"}
 
-@router.post("/search", response_model=List[schemas.Order])
+@router.post("/search", response_model=Union[schemas.OrderSearchResult, List[schemas.Order]])
 def search_orders(
     params: schemas.OrderSearchParams, 
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    with_facets: bool = False,
+    after: Optional[Cursor] = Depends(get_page_cursor),
+    fields: Optional[List[str]] = Depends(get_order_fields),
+    include_nested: bool = True,
+    db: Session = Depends(get_read_db)
 ):
-    """搜索订单"""
-    orders = crud.search_orders(db, params=params, skip=skip, limit=limit)
-    return orders
+    """
+    搜索订单（下一页游标见响应头 X-Next-Cursor，传入 cursor 参数翻页）
+    
+    with_facets=true 时返回包含总数、订单状态/审核状态分面统计的结果对象，
+    统计按过滤条件短暂缓存，翻页时不重复计算。
+    fields、include_nested 用法同订单列表。
+    """
+    orders = crud.search_orders(
+        db, params=params, skip=skip, limit=limit, after=after, fields=fields, include_nested=include_nested
+    )
+    cursor = next_cursor(orders, limit)
+    if fields:
+        items = [_project_row(row, fields) for row in orders]
+        if not with_facets:
+            return _projected_response(items, cursor)
+        facets = crud.count_order_search_facets(db, params)
+        return _projected_response({"items": items, "next_cursor": cursor, **facets}, cursor)
+    
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    
+    if not with_facets:
+        return orders
+    
+    facets = crud.count_order_search_facets(db, params)
+    return schemas.OrderSearchResult(items=orders, next_cursor=cursor, **facets)
+
+def _project_row(row, fields: List[str]) -> dict:
+    """将按需查询的行转为可直接 JSON 序列化的字典（不经过 ORM 对象和响应模型校验）"""
+    item = {}
+    for name in fields:
+        value = getattr(row, name)
+        if isinstance(value, enum.Enum):
+            value = value.value
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        item[name] = value
+    return item
+
+def _projected_response(content: Any, cursor: Optional[str]) -> JSONResponse:
+    """直接返回 JSON 响应，跳过 response_model 校验"""
+    headers = {NEXT_CURSOR_HEADER: cursor} if cursor else None
+    return JSONResponse(content=content, headers=headers)
+
+@router.post("/export")
+def export_orders(
+    params: schemas.OrderSearchParams,
+    request: Request,
+    format: schemas.FileFormat = schemas.FileFormat.CSV,
+    compress: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    导出符合搜索条件的全部订单（CSV 或 NDJSON，compress=true 时 gzip 压缩）
+    
+    边读边输出，内存占用与结果总数无关。流式响应在路由函数返回后才读取数据，
+    而 get_db 的会话在返回时即关闭，因此导出使用独立的会话（按读请求路由），输出结束后关闭。
+    """
+    session_factory = read_sessionmaker(request)
+    
+    def stream():
+        db = session_factory()
+        try:
+            yield from OrderExportService(db).export_orders(params, format, compress=compress)
+        finally:
+            db.close()
+    
+    filename = f"orders_{datetime.now():%Y%m%d%H%M%S}.{format.value}" + (".gz" if compress else "")
+    media_type = "text/csv; charset=utf-8" if format == schemas.FileFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        stream(),
+        media_type="application/gzip" if compress else media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/bulk/assign", response_model=schemas.OrderBulkResult)
+def bulk_assign_orders(
+    payload: schemas.OrderBulkAssign,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """批量分配订单（按订单ID列表或搜索条件），返回未处理订单及原因"""
+    if user_crud.get_user(db, user_id=payload.user_id) is None:
+        raise HTTPException(status_code=404, detail="用户不存在")
+    
+    return crud.bulk_assign_orders(db, _bulk_order_ids(db, payload), user_id=payload.user_id)
+
+@router.post("/bulk/ship", response_model=schemas.OrderBulkResult)
+def bulk_ship_orders(
+    payload: schemas.OrderBulkShip,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """批量发货，接单人设为当前用户；非待发货状态的订单不处理"""
+    return crud.bulk_ship_orders(db, _bulk_order_ids(db, payload), user_id=current_user.id)
+
+@router.post("/bulk/audit", response_model=schemas.OrderBulkResult)
+def bulk_audit_orders(
+    payload: schemas.OrderBulkAudit,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """批量修改审核状态；已结算的订单不处理"""
+    return crud.bulk_update_audit_status(db, _bulk_order_ids(db, payload), audit_status=payload.audit_status)
+
+@router.post("/bulk/settle", response_model=schemas.OrderBulkResult)
+def bulk_settle_orders(
+    payload: schemas.OrderBulkSettle,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """批量结算；仅处理已审核或未结算的订单"""
+    return crud.bulk_settle_orders(db, _bulk_order_ids(db, payload), settlement_time=payload.settlement_time)
+
+def _bulk_order_ids(db: Session, selection: schemas.OrderBulkSelection) -> List[int]:
+    """解析批量操作的订单范围，参数错误时返回 400"""
+    try:
+        return crud.resolve_bulk_order_ids(db, selection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{order_id}/assign", response_model=schemas.Order)
 def assign_order_to_user(
@@ -68,8 +256,8 @@ def assign_order_to_user(
     current_user: User = Depends(get_current_user)
 ):
     """将订单分配给用户"""
-    # 检查订单是否存在
-    db_order = crud.get_order(db, order_id=order_id)
+    # 检查订单是否存在，同时锁定订单行，变更前的汇总快照在提交前不会被其他事务修改
+    db_order = crud.get_order(db, order_id=order_id, for_update=True)
     if db_order is None:
         raise HTTPException(status_code=404, detail="订单不存在")
     
@@ -79,7 +267,10 @@ def assign_order_to_user(
         raise HTTPException(status_code=404, detail="用户不存在")
     
     # 分配订单
+    before = rollup_crud.rollup_snapshot(db_order)
     db_order.user_id = user_id
+    db_order.version = models.Order.version + 1
+    rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas([before], [rollup_crud.rollup_snapshot(db_order)]))
     db.commit()
     db.refresh(db_order)
     
@@ -92,8 +283,8 @@ def ship_order(
     current_user: User = Depends(get_current_user)
 ):
     """发货操作"""
-    # 检查订单是否存在
-    db_order = crud.get_order(db, order_id=order_id)
+    # 检查订单是否存在，同时锁定订单行，变更前的汇总快照在提交前不会被其他事务修改
+    db_order = crud.get_order(db, order_id=order_id, for_update=True)
     if db_order is None:
         raise HTTPException(status_code=404, detail="订单不存在")
     
@@ -105,9 +296,12 @@ def ship_order(
         )
     
     # 更新订单状态和发货时间
+    before = rollup_crud.rollup_snapshot(db_order)
     db_order.status = schemas.OrderStatus.SHIPPED
     db_order.shipping_time = datetime.now()
     db_order.user_id = current_user.id  # 设置接单人
+    db_order.version = models.Order.version + 1
+    rollup_crud.apply_rollup_deltas(db, rollup_crud.rollup_deltas([before], [rollup_crud.rollup_snapshot(db_order)]))
     
     db.commit()
     db.refresh(db_order)
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from schemas import report as schemas
+from schemas.order import OrderStatus, AuditStatus
+from crud import order_rollup as rollup_crud
+from database import get_read_db
+from datetime import date
+from typing import List, Optional
+
+# 报表最大查询天数
+MAX_REPORT_DAYS = 366
+
+# 路由实例
+router = APIRouter()
+
+@router.get("/daily", response_model=List[schemas.DailyReportRow])
+def read_daily_report(
+    start_day: date,
+    end_day: date,
+    dimension: schemas.ReportDimension = schemas.ReportDimension.SHOP,
+    dimension_key: Optional[str] = None,
+    status: Optional[List[OrderStatus]] = Query(None),
+    audit_status: Optional[List[AuditStatus]] = Query(None),
+    db: Session = Depends(get_read_db)
+):
+    """
+    获取订单每日报表（按店铺或接单人）
+    
+    从每日汇总表读取，不扫描订单表；历史数据需先运行 scripts.backfill_order_rollups 回补。
+    """
+    if end_day < start_day:
+        raise HTTPException(status_code=400, detail="结束日期不能早于开始日期")
+    if (end_day - start_day).days >= MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail=f"查询范围不能超过 {MAX_REPORT_DAYS} 天")
+    
+    return rollup_crud.get_daily_report(
+        db,
+        dimension=dimension.value,
+        start_day=start_day,
+        end_day=end_day,
+        dimension_key=dimension_key,
+        status=status,
+        audit_status=audit_status
+    )
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from schemas import sync as schemas
+from crud import sync_retry as sync_retry_crud
+from crud import sync_state as sync_state_crud
+from database import get_db, get_read_db
+from utils.metrics import REGISTRY, SYNC_WATERMARK_LAG, SYNC_RETRY_QUEUE
+from datetime import datetime
+from typing import List, Optional
+
+# 路由实例
+router = APIRouter()
+
+@router.get("/retries", response_model=List[schemas.SyncRetry])
+def read_sync_retries(
+    shop_id: Optional[str] = None,
+    kind: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db)
+):
+    """获取同步失败重试列表（按下次重试时间排序）"""
+    return sync_retry_crud.get_sync_retries(db, shop_id=shop_id, kind=kind, skip=skip, limit=limit)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_sync_metrics(db: Session = Depends(get_db)):
+    """
+    获取同步指标（Prometheus 文本格式）
+    
+    API耗时、写库耗时、订单计数等为本进程内的统计；
+    水位延迟和重试队列长度在请求时从数据库读取，各进程一致。
+    """
+    now = datetime.now()
+    # 先从数据库读出全部数值再整体替换，并发请求不会读到清空后未填完的指标
+    watermark_lags = {
+        (shop_id,): (now - last_modified).total_seconds()
+        for shop_id, last_modified in sync_state_crud.get_sync_watermarks(db)
+    }
+    retry_counts = {(kind,): count for kind, count in sync_retry_crud.count_sync_retries(db).items()}
+    SYNC_WATERMARK_LAG.replace(watermark_lags)
+    SYNC_RETRY_QUEUE.replace(retry_counts)
+    
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from schemas import user as schemas
 from crud import user as crud
-from typing import List
+from crud.versioning import VersionConflictError
+from typing import List, Optional
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
@@ -12,8 +13,9 @@ import secrets
 from schemas.token import Token
 from schemas.user import User, UserCreate, UserInDBBase
 from models import user as user_model
-from database import get_db
-from .dependencies import get_current_active_user
+from database import get_db, get_read_db
+from .dependencies import get_current_active_user, get_page_cursor
+from utils.pagination import Cursor, NEXT_CURSOR_HEADER, next_cursor
 from .auth import (
     get_current_active_user,
     get_user,
@@ -127,6 +129,7 @@ def change_password(
     # 更新密码
     hashed_password = crud.get_password_hash(password_data.new_password)
     current_user.password_hash = hashed_password
+    current_user.version = user_model.User.version + 1
     db.commit()
     
     return {"message": "密码修改成功"}
@@ -141,13 +144,22 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     return crud.create_user(db=db, user=user)
 
 @router.get("/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """获取用户列表（管理员权限）"""
-    users = crud.get_users(db, skip=skip, limit=limit)
+def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Cursor] = Depends(get_page_cursor),
+    db: Session = Depends(get_read_db)
+):
+    """获取用户列表（管理员权限，下一页游标见响应头 X-Next-Cursor）"""
+    users = crud.get_users(db, skip=skip, limit=limit, after=after)
+    cursor = next_cursor(users, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
     return users
 
 @router.get("/{user_id}", response_model=schemas.User)
-def read_user(user_id: int, db: Session = Depends(get_db)):
+def read_user(user_id: int, db: Session = Depends(get_read_db)):
     """获取单个用户（管理员权限）"""
     db_user = crud.get_user(db, user_id=user_id)
     if db_user is None:
@@ -162,6 +174,17 @@ def update_user(user_id: int, user: schemas.UserUpdate, db: Session = Depends(ge
         raise HTTPException(status_code=404, detail="用户不存在")
     return db_user
 
+@router.patch("/{user_id}", response_model=schemas.User)
+def patch_user(user_id: int, patch: schemas.UserPatch, db: Session = Depends(get_db)):
+    """部分更新用户（管理员权限）：只修改请求中的字段，version 与库中不一致时返回 409"""
+    try:
+        db_user = crud.patch_user(db, user_id=user_id, patch=patch)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=f"用户已被修改，请刷新后重试（当前版本 {e.current_version}）")
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="用户不存在")
+    return db_user
+
 @router.delete("/{user_id}", response_model=schemas.MessageResponse)
 def delete_user(user_id: int, db: Session = Depends(get_db)):
     """删除用户（管理员权限）"""
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
-from order import Order
+from .order import Order
 
 class InvoiceBase(BaseModel):
     """发票基本信息模型"""
@@ -20,9 +20,20 @@ class InvoiceUpdate(InvoiceBase):
     """更新发票模型"""
     pass
 
+class InvoicePatch(BaseModel):
+    """部分更新发票模型：只写入请求中出现的字段，version 为读取发票时的版本号"""
+    version: int = Field(..., description="版本号")
+    invoice_number: str = Field(None, max_length=50, description="发票号")
+    order_id: int = Field(None, description="关联订单ID")
+    amount: float = Field(None, description="金额")
+    invoice_type: str = Field(None, max_length=50, description="发票类型")
+    issuing_date: datetime = Field(None, description="开票日期")
+    remark: Optional[str] = Field(None, max_length=255, description="备注")
+
 class InvoiceInDBBase(InvoiceBase):
     """数据库中发票的基本模型"""
     id: int
+    version: int
     created_at: datetime
     updated_at: datetime
     
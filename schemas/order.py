@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, List, Union
-from user import User
+from typing import Optional, List, Union, Dict
+from .user import User
 import enum
 
 class OrderStatus(str, enum.Enum):
@@ -23,6 +23,13 @@ class OrderType(str, enum.Enum):
     """订单类型枚举类"""
     TAOBAO = "淘宝网"
 
+class TextMatchMode(str, enum.Enum):
+    """订单号/店铺ID匹配方式枚举类"""
+    AUTO = "auto"
+    EXACT = "exact"
+    PREFIX = "prefix"
+    CONTAINS = "contains"
+
 class OrderBase(BaseModel):
     """订单基本信息模型"""
     shop_id: str = Field(..., max_length=50, description="店铺ID")
@@ -48,9 +55,32 @@ class OrderUpdate(OrderBase):
     """更新订单模型"""
     pass
 
+class OrderPatch(BaseModel):
+    """部分更新订单模型：只写入请求中出现的字段，version 为读取订单时的版本号"""
+    version: int = Field(..., description="版本号")
+    shop_id: str = Field(None, max_length=50, description="店铺ID")
+    order_number: str = Field(None, max_length=50, description="订单号")
+    price: float = Field(None, description="价格")
+    status: OrderStatus = Field(None, description="订单状态")
+    audit_status: AuditStatus = Field(None, description="审核状态")
+    remark: Optional[str] = Field(None, max_length=255, description="备注")
+    settlement_time: Optional[datetime] = Field(None, description="结算时间")
+    payment_time: Optional[datetime] = Field(None, description="付款时间")
+    shipping_time: Optional[datetime] = Field(None, description="发货时间")
+    closing_time: Optional[datetime] = Field(None, description="关闭时间")
+    confirmation_time: Optional[datetime] = Field(None, description="确认收货时间")
+    is_bound: bool = Field(None, description="订单绑定状态")
+    user_id: Optional[int] = Field(None, description="接单人ID")
+    order_type: OrderType = Field(None, description="订单类型")
+
+class OrderImportRow(OrderBase):
+    """导入订单的一行（可带下单时间，默认导入时间）"""
+    created_at: Optional[datetime] = Field(None, description="下单时间")
+
 class OrderInDBBase(OrderBase):
     """数据库中订单的基本模型"""
     id: int
+    version: int
     created_at: datetime
     updated_at: datetime
     
@@ -61,10 +91,22 @@ class Order(OrderInDBBase):
     """返回给客户端的订单模型"""
     user: Optional[User] = None
 
+class OrderSearchResult(BaseModel):
+    """订单搜索结果模型（含总数和分面统计）"""
+    items: List[Order] = Field(..., description="本页订单")
+    total: int = Field(..., description="符合条件的订单总数")
+    status_counts: Dict[str, int] = Field(..., description="各订单状态的数量")
+    audit_status_counts: Dict[str, int] = Field(..., description="各审核状态的数量")
+    next_cursor: Optional[str] = Field(None, description="下一页游标，已是最后一页时为空")
+
 class OrderSearchParams(BaseModel):
     """订单搜索参数模型"""
     order_number: Optional[str] = Field(None, description="订单号")
     shop_id: Optional[str] = Field(None, description="店铺ID")
+    match_mode: TextMatchMode = Field(
+        TextMatchMode.AUTO,
+        description="订单号/店铺ID匹配方式：auto 按输入自动选择，exact 精确，prefix 前缀（末尾加 * 亦可），contains 包含"
+    )
     price_gt: Optional[float] = Field(None, description="价格大于")
     price_lt: Optional[float] = Field(None, description="价格小于")
     order_type: Optional[OrderType] = Field(None, description="订单类型")
@@ -84,4 +126,63 @@ class OrderSearchParams(BaseModel):
     closing_time_end: Optional[datetime] = Field(None, description="关闭时间结束")
     confirmation_time_start: Optional[datetime] = Field(None, description="确认收货时间开始")
     confirmation_time_end: Optional[datetime] = Field(None, description="确认收货时间结束")
-    audit_status: Optional[List[AuditStatus]] = Field(None, description="审核状态")
\ No newline at end of file
+    audit_status: Optional[List[AuditStatus]] = Field(None, description="审核状态")
+    
+    @field_validator("order_number", "shop_id")
+    @classmethod
+    def reject_bare_wildcard(cls, value: Optional[str]) -> Optional[str]:
+        """只有 * 的搜索词会匹配全部订单，不允许"""
+        if value and not value.strip().rstrip("*").strip():
+            raise ValueError("搜索词不能只包含 *")
+        return value
+
+class OrderBulkSelection(BaseModel):
+    """批量操作的订单范围：订单ID列表或搜索条件，二选一"""
+    order_ids: Optional[List[int]] = Field(None, description="订单ID列表")
+    search: Optional[OrderSearchParams] = Field(None, description="搜索条件，作用于所有符合条件的订单")
+
+class OrderBulkAssign(OrderBulkSelection):
+    """批量分配订单模型"""
+    user_id: int = Field(..., description="接单人ID")
+
+class OrderBulkShip(OrderBulkSelection):
+    """批量发货模型（接单人为当前用户）"""
+    pass
+
+class OrderBulkAudit(OrderBulkSelection):
+    """批量修改审核状态模型"""
+    audit_status: AuditStatus = Field(..., description="审核状态")
+
+class OrderBulkSettle(OrderBulkSelection):
+    """批量结算模型"""
+    settlement_time: Optional[datetime] = Field(None, description="结算时间，默认当前时间")
+
+class OrderBulkFailure(BaseModel):
+    """批量操作中未处理的订单"""
+    id: int = Field(..., description="订单ID")
+    reason: str = Field(..., description="未处理原因")
+
+class OrderBulkResult(BaseModel):
+    """批量操作结果模型"""
+    updated: List[int] = Field(..., description="已更新的订单ID")
+    failed: List[OrderBulkFailure] = Field(..., description="未通过状态检查或不存在的订单")
+
+class FileFormat(str, enum.Enum):
+    """订单导入导出文件格式枚举类"""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+class OrderImportError(BaseModel):
+    """导入失败的行"""
+    row: int = Field(..., description="行号（CSV 含表头行，从 1 开始）")
+    order_number: Optional[str] = Field(None, description="订单号")
+    error: str = Field(..., description="失败原因")
+
+class OrderImportResult(BaseModel):
+    """订单导入结果模型"""
+    total: int = Field(..., description="读取的数据行数")
+    created: int = Field(..., description="新建的订单数")
+    duplicated: int = Field(..., description="订单号已存在而跳过的行数")
+    failed: int = Field(..., description="校验或写入失败的行数")
+    errors: List[OrderImportError] = Field(..., description="失败行明细（超出上限时截断）")
+    errors_truncated: bool = Field(False, description="失败行明细是否被截断")
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from datetime import date
+from enum import Enum
+from typing import Dict
+
+class ReportDimension(str, Enum):
+    """报表维度枚举类"""
+    SHOP = "shop"
+    USER = "user"
+
+class DailyReportRow(BaseModel):
+    """每日报表行：某天某店铺/接单人的订单汇总"""
+    day: date = Field(..., description="下单日期")
+    dimension_key: str = Field(..., description="维度值：店铺ID或接单人ID")
+    order_count: int = Field(..., description="订单数")
+    amount: float = Field(..., description="订单金额合计")
+    status_counts: Dict[str, int] = Field(default_factory=dict, description="各订单状态的订单数")
+    audit_status_counts: Dict[str, int] = Field(default_factory=dict, description="各审核状态的订单数")
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+class SyncRetry(BaseModel):
+    """同步失败重试记录模型（不返回 payload，其中可能含有会话令牌）"""
+    id: int
+    kind: str = Field(..., description="类型：trade 单个订单，page 一页订单")
+    shop_id: Optional[str] = Field(None, description="店铺ID")
+    dedupe_key: str = Field(..., description="去重键")
+    attempts: int = Field(..., description="已重试次数")
+    last_error: Optional[str] = Field(None, description="最近一次失败原因")
+    next_attempt_at: Optional[datetime] = Field(None, description="下次重试时间")
+    locked_by: Optional[str] = Field(None, description="正在重试的进程")
+    locked_until: Optional[datetime] = Field(None, description="重试锁过期时间")
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
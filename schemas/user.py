@@ -18,9 +18,20 @@ class UserUpdate(UserBase):
     password: Optional[str] = Field(None, min_length=8, description="密码")
     is_first_login: Optional[bool] = Field(None, description="是否首次登录")
 
+class UserPatch(BaseModel):
+    """部分更新用户模型：只写入请求中出现的字段，version 为读取用户时的版本号"""
+    version: int = Field(..., description="版本号")
+    username: str = Field(None, max_length=50, description="用户名")
+    email: EmailStr = Field(None, description="邮箱")
+    phone: Optional[str] = Field(None, max_length=20, description="手机号")
+    is_active: bool = Field(None, description="账号是否启用")
+    password: str = Field(None, min_length=8, description="密码")
+    is_first_login: bool = Field(None, description="是否首次登录")
+
 class UserInDBBase(UserBase):
     """数据库中用户的基本模型"""
     id: int
+    version: int
     created_at: datetime
     updated_at: datetime
     
@@ -0,0 +1,121 @@
+from sqlalchemy.orm import Session
+from schemas import order as order_schemas
+from crud import order as order_crud
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+import csv
+import enum
+import io
+import json
+import zlib
+
+# 导出的订单字段
+EXPORT_COLUMNS = list(order_crud.ORDER_FIELDS)
+
+# 每批从数据库读取的行数
+EXPORT_BATCH_SIZE = 1000
+
+# 输出缓冲达到该字节数时产出一块
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# 以这些字符开头的 CSV 单元格会被 Excel 等表格软件当作公式执行，导出时前面加 ' 转义
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+class OrderExportService:
+    """订单搜索结果导出服务（CSV / NDJSON，可选 gzip，流式输出）"""
+    
+    def __init__(self, db: Session, batch_size: int = EXPORT_BATCH_SIZE):
+        """
+        初始化订单导出服务
+        
+        Args:
+            db: 数据库会话，需在导出流读完后再关闭
+            batch_size: 每批从数据库读取的行数
+        """
+        self.db = db
+        self.batch_size = batch_size
+    
+    def export_orders(
+        self,
+        params: order_schemas.OrderSearchParams,
+        fmt: order_schemas.FileFormat,
+        compress: bool = False,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[bytes]:
+        """
+        导出符合搜索条件的全部订单
+        
+        按服务端游标分批读取，每读到一批即编码输出，不在内存中保留完整结果。
+        CSV 带 UTF-8 BOM 以便 Excel 直接打开，可能被当作公式的文本单元格加 ' 前缀
+        （导入时去掉），导出的文件可直接用于订单导入。
+        
+        Args:
+            params: 搜索参数
+            fmt: 文件格式
+            compress: 是否 gzip 压缩
+            columns: 导出的字段，默认 EXPORT_COLUMNS
+        
+        Returns:
+            文件内容的字节块迭代器
+        """
+        columns = columns or EXPORT_COLUMNS
+        rows = order_crud.iter_order_search_rows(self.db, params, columns, batch_size=self.batch_size)
+        if fmt == order_schemas.FileFormat.CSV:
+            chunks = _encode_csv(rows, columns)
+        else:
+            chunks = _encode_ndjson(rows, columns)
+        return _gzip(chunks) if compress else chunks
+
+def _export_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    value = _export_value(value)
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def _encode_csv(rows: Iterable, columns: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+def _encode_ndjson(rows: Iterable, columns: List[str]) -> Iterator[bytes]:
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(
+            {column: _export_value(value) for column, value in zip(columns, row)},
+            ensure_ascii=False
+        ) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+            size = 0
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """流式 gzip 压缩"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,149 @@
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from schemas import order as order_schemas
+from crud import order as order_crud
+from services.order_export import CSV_FORMULA_PREFIXES
+from typing import IO, Iterator, Optional, Tuple
+import csv
+import io
+import json
+import logging
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 每批校验、去重、写入的行数
+IMPORT_CHUNK_SIZE = 1000
+
+# 结果中最多返回的失败行明细数
+MAX_IMPORT_ERRORS = 1000
+
+class OrderImportService:
+    """订单批量导入服务（CSV / NDJSON，流式读取）"""
+    
+    def __init__(self, db: Session, chunk_size: int = IMPORT_CHUNK_SIZE, max_errors: int = MAX_IMPORT_ERRORS):
+        """
+        初始化订单导入服务
+        
+        Args:
+            db: 数据库会话
+            chunk_size: 每批处理的行数，内存占用与该值成正比，与文件大小无关
+            max_errors: 结果中最多返回的失败行明细数
+        """
+        self.db = db
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+    
+    def import_orders(self, stream: IO[bytes], fmt: order_schemas.FileFormat) -> dict:
+        """
+        导入订单文件
+        
+        逐行读取并校验，每 chunk_size 行一批：批内订单号去重，一次查询跳过库中已存在的订单号，
+        其余订单一条多行 INSERT 写入并提交；整批违反约束（如并发导入同一订单号）时改为逐行写入，
+        写入失败的行计入失败明细。已提交的批次不会因后续批次失败而回滚，
+        重新导入同一文件时已导入的订单按重复跳过。
+        
+        Args:
+            stream: 文件的二进制流（UTF-8，可带 BOM）
+            fmt: 文件格式
+        
+        Returns:
+            导入结果，字段见 schemas.order.OrderImportResult
+        """
+        result = {"total": 0, "created": 0, "duplicated": 0, "failed": 0, "errors": [], "errors_truncated": False}
+        rows = _iter_csv(stream) if fmt == order_schemas.FileFormat.CSV else _iter_ndjson(stream)
+        
+        chunk = {}
+        for row_number, data, error in rows:
+            result["total"] += 1
+            order_number = data.get("order_number") if data else None
+            if error is None:
+                try:
+                    order = order_schemas.OrderImportRow.model_validate(data).model_dump()
+                except ValidationError as e:
+                    error = _format_validation_error(e)
+            
+            if error is not None:
+                self._add_error(result, row_number, order_number, error)
+            elif order["order_number"] in chunk:
+                result["duplicated"] += 1
+            else:
+                chunk[order["order_number"]] = (row_number, order)
+                if len(chunk) >= self.chunk_size:
+                    self._write_chunk(result, chunk)
+                    chunk = {}
+        
+        self._write_chunk(result, chunk)
+        logger.info(
+            f"订单导入完成：读取 {result['total']} 行，新建 {result['created']}，"
+            f"重复 {result['duplicated']}，失败 {result['failed']}"
+        )
+        return result
+    
+    def _write_chunk(self, result: dict, chunk: dict) -> None:
+        if not chunk:
+            return
+        duplicated, failed = order_crud.insert_new_orders(self.db, [order for _, order in chunk.values()])
+        result["created"] += len(chunk) - len(duplicated) - len(failed)
+        result["duplicated"] += len(duplicated)
+        for order_number, error in failed.items():
+            self._add_error(result, chunk[order_number][0], order_number, error)
+    
+    def _add_error(self, result: dict, row_number: int, order_number: Optional[str], error: str) -> None:
+        result["failed"] += 1
+        if len(result["errors"]) >= self.max_errors:
+            result["errors_truncated"] = True
+            return
+        result["errors"].append({
+            "row": row_number,
+            "order_number": str(order_number) if order_number is not None else None,
+            "error": error
+        })
+
+def _iter_csv(stream: IO[bytes]) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """逐行读取 CSV（首行为字段名，空值视为未填），产出 (行号, 字段, 解析错误)"""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    try:
+        for data in reader:
+            if None in data:
+                yield reader.line_num, None, "列数多于表头"
+                continue
+            yield reader.line_num, {
+                key.strip(): _unescape_csv_value(value)
+                for key, value in data.items()
+                if value is not None
+            }, None
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield reader.line_num, None, f"文件解析失败: {e}"
+
+def _unescape_csv_value(value: str) -> Optional[str]:
+    """去掉导出时为防止公式注入加的 ' 前缀（见 services.order_export），空值视为未填"""
+    if value.startswith("'") and value[1:].startswith(CSV_FORMULA_PREFIXES):
+        value = value[1:]
+    return value.strip() or None
+
+def _iter_ndjson(stream: IO[bytes]) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """逐行读取 NDJSON（每行一个 JSON 对象，跳过空行），产出 (行号, 字段, 解析错误)"""
+    row_number = 0
+    try:
+        for row_number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"JSON 解析失败: {e}"
+                continue
+            if not isinstance(data, dict):
+                yield row_number, None, "每行应为一个 JSON 对象"
+                continue
+            yield row_number, data, None
+    except UnicodeDecodeError as e:
+        yield row_number + 1, None, f"文件解析失败: {e}"
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
@@ -2,14 +2,55 @@ from sqlalchemy.orm import Session
 from models import order as order_models
 from schemas import order as order_schemas
 from crud import order as order_crud
+from crud import sync_state as sync_state_crud
+from crud import sync_retry as sync_retry_crud
 from utils.taobao_client import TaobaoClient
+from utils.metrics import (
+    SYNC_PAGES,
+    SYNC_TRADES,
+    SYNC_PAGE_WRITE_SECONDS,
+    SYNC_RUN_SECONDS,
+    SYNC_RUN_THROUGHPUT,
+    SYNC_RUN_PAGES_PER_SECOND
+)
 from datetime import datetime, timedelta
+from typing import List, Tuple, Iterator, Callable, Optional
+from collections import deque
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import json
 import logging
+import os
+import socket
+import threading
+import time
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 连续多少页获取失败后放弃本次同步（失败的页已登记重试）
+MAX_CONSECUTIVE_PAGE_FAILURES = 3
+
+class SyncStats:
+    """订单同步结果统计"""
+    
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        # 写入的页数（流式同步按写入批次计）
+        self.pages = 0
+    
+    @property
+    def synced(self) -> int:
+        """成功处理的订单数（含未变化跳过的订单）"""
+        return self.created + self.updated + self.unchanged
+    
+    def __str__(self) -> str:
+        return f"新建 {self.created}，更新 {self.updated}，未变化 {self.unchanged}，失败 {self.failed}"
+
 class OrderSyncService:
     """订单同步服务"""
     
@@ -23,14 +64,33 @@ class OrderSyncService:
         """
         self.db = db
         self.taobao_client = taobao_client
+        # 最近一次同步的统计结果
+        self.stats = SyncStats()
+        # 本页处理失败、待登记重试的订单：[(淘宝订单数据, 异常)]
+        self._failed_trades = []
+        # 可重试失败的订单中最早的修改时间，增量同步的水位不能越过该时间
+        self._earliest_failed_modified: Optional[datetime] = None
     
-    def sync_orders(self, session: str, days: int = 7) -> int:
+    def sync_orders(
+        self,
+        session: str,
+        days: int = 7,
+        batch: bool = True,
+        concurrency: int = 1,
+        page_size: int = 100,
+        shop_id: Optional[str] = None
+    ) -> int:
         """
         从淘宝同步订单
         
         Args:
             session: 淘宝会话令牌
             days: 同步最近多少天的订单
+            batch: 是否按页批量写入（每页一次预取查询、一个事务）
+            concurrency: 并发预取的页数，大于1时启用流水线模式
+            page_size: 每页订单数量
+            shop_id: 店铺ID（卖家昵称），获取失败的页按店铺登记重试，
+                重放时使用 sync_states 中登记的会话令牌；不指定时失败的页不登记
             
         Returns:
             同步的订单数量
@@ -44,69 +104,1008 @@ class OrderSyncService:
         
         logger.info(f"开始同步淘宝订单，时间范围: {start_time_str} - {end_time_str}")
         
-        page_no = 1
-        page_size = 100
+        self.stats = SyncStats()
+        started = time.perf_counter()
+        fetch_page = partial(self._fetch_page, session, start_time_str, end_time_str, page_size=page_size)
+        page_spec = {
+            "method": "sold",
+            "shop_id": shop_id,
+            "start_time": start_time_str,
+            "end_time": end_time_str,
+            "page_size": page_size
+        }
+        total_synced = self._sync_pages(
+            fetch_page, batch, concurrency, on_page_error=partial(self._record_failed_page, page_spec)
+        )
+        
+        self._record_run("full", started)
+        logger.info(f"订单同步完成，共同步 {total_synced} 个订单（{self.stats}）")
+        return total_synced
+    
+    def sync_orders_stream(
+        self,
+        session: str,
+        days: int = 7,
+        batch: bool = True,
+        page_size: int = 100,
+        chunk_size: int = 50,
+        shop_id: Optional[str] = None
+    ) -> int:
+        """
+        以流式方式从淘宝同步订单
+        
+        订单边接收边解析，每攒够 chunk_size 笔就写库，不必等整页响应解析完成；
+        列表只请求同步所需的字段，页大小增大时内存占用保持平稳。
+        某页获取失败时登记该页等待重放并停止同步；写库失败时回滚并抛出异常。
+        
+        Args:
+            session: 淘宝会话令牌
+            days: 同步最近多少天的订单
+            batch: 是否批量写入
+            page_size: 每页订单数量
+            chunk_size: 每次写库的订单数量
+            shop_id: 店铺ID（卖家昵称），获取失败的页按店铺登记重试；不指定时失败的页不登记
+            
+        Returns:
+            同步的订单数量
+        """
+        end_time = datetime.now()
+        start_time = end_time - timedelta(days=days)
+        
+        start_time_str = start_time.strftime("%Y-%m-%d %H:%M:%S")
+        end_time_str = end_time.strftime("%Y-%m-%d %H:%M:%S")
+        
+        logger.info(f"开始流式同步淘宝订单，时间范围: {start_time_str} - {end_time_str}")
+        
+        self.stats = SyncStats()
+        started = time.perf_counter()
+        page_spec = {
+            "method": "sold",
+            "shop_id": shop_id,
+            "start_time": start_time_str,
+            "end_time": end_time_str,
+            "page_size": page_size
+        }
         total_synced = 0
-        has_next = True
+        chunk = []
+        try:
+            for trade in self._iter_stream_trades(session, page_spec):
+                chunk.append(trade)
+                if len(chunk) >= chunk_size:
+                    total_synced += self._process_page(chunk, batch)
+                    chunk = []
+            
+            if chunk:
+                total_synced += self._process_page(chunk, batch)
+        except Exception:
+            self.db.rollback()
+            raise
         
-        while has_next:
-            # 获取淘宝订单
+        self._record_run("stream", started)
+        logger.info(f"订单同步完成，共同步 {total_synced} 个订单（{self.stats}）")
+        return total_synced
+    
+    def sync_incremental(
+        self,
+        session: str,
+        shop_id: str,
+        days: int = 1,
+        overlap_seconds: int = 60,
+        batch: bool = True,
+        concurrency: int = 1,
+        page_size: int = 100,
+        cancel_event: Optional[threading.Event] = None
+    ) -> int:
+        """
+        按修改时间增量同步淘宝订单
+        
+        从店铺上次成功同步的水位开始，只拉取此后有修改的订单。
+        增量接口要求单次查询跨度不超过一天，因此按天切分时间段，
+        每完成一个时间段就推进一次水位；获取失败时停止，水位停在
+        最后一个完整同步的时间段，下次从该处继续。时间段内有订单写入失败
+        （可重试的失败）时，水位只推进到失败订单中最早的修改时间，之后的
+        时间段照常同步但不再推进水位；校验不通过的永久失败已登记为失败，
+        重新同步也无法写入，不阻塞水位。
+        
+        Args:
+            session: 淘宝会话令牌
+            shop_id: 店铺ID（卖家昵称），用于区分各店铺的水位
+            days: 首次同步（无水位）时回溯的天数
+            overlap_seconds: 每次从水位往前重叠的秒数，防止遗漏延迟写入的订单
+            batch: 是否按页批量写入
+            concurrency: 并发预取的页数
+            page_size: 每页订单数量
+            cancel_event: 取消信号（如同步租约已丢失），置位后在获取下一页前停止，
+                水位停在最后一个完整同步的时间段
+            
+        Returns:
+            同步的订单数量
+        """
+        end_time = datetime.now()
+        state = sync_state_crud.get_sync_state(self.db, shop_id)
+        previous_watermark = state.last_modified if state else None
+        if previous_watermark:
+            start_time = previous_watermark - timedelta(seconds=overlap_seconds)
+        else:
+            start_time = end_time - timedelta(days=days)
+        
+        logger.info(f"开始增量同步店铺 {shop_id} 的淘宝订单，修改时间范围: {start_time} - {end_time}")
+        
+        self.stats = SyncStats()
+        started = time.perf_counter()
+        total_synced = 0
+        held_at = None
+        window_start = start_time
+        while window_start < end_time:
+            window_end = min(window_start + timedelta(days=1), end_time)
+            self._earliest_failed_modified = None
+            fetch_page = partial(
+                self._fetch_increment_page,
+                session,
+                window_start.strftime("%Y-%m-%d %H:%M:%S"),
+                window_end.strftime("%Y-%m-%d %H:%M:%S"),
+                page_size=page_size
+            )
+            if cancel_event is not None:
+                fetch_page = partial(self._fetch_unless_cancelled, cancel_event, fetch_page)
             try:
-                response = self.taobao_client.get_orders(
-                    session=session,
-                    start_time=start_time_str,
-                    end_time=end_time_str,
-                    page_no=page_no,
-                    page_size=page_size
-                )
+                total_synced += self._sync_pages(fetch_page, batch, concurrency, strict=True)
             except Exception as e:
-                logger.error(f"获取淘宝订单失败: {str(e)}")
+                logger.error(f"增量同步店铺 {shop_id} 失败，水位停留在 {held_at or window_start}: {str(e)}")
                 break
             
-            # 检查响应
-            if "trades_sold_get_response" not in response:
-                logger.error(f"获取淘宝订单失败，响应格式错误: {response}")
+            if held_at is None:
+                failed_at = self._earliest_failed_modified
+                if failed_at is not None:
+                    held_at = min(max(failed_at, window_start), window_end)
+                    logger.warning(f"店铺 {shop_id} 有订单写入失败，水位停留在 {held_at}")
+                watermark = held_at or window_end
+                # 失败点落在重叠区间内时保持原水位，不回退
+                if previous_watermark is None or watermark > previous_watermark:
+                    sync_state_crud.update_sync_watermark(self.db, shop_id, watermark)
+            window_start = window_end
+        
+        self._record_run("incremental", started)
+        logger.info(f"店铺 {shop_id} 增量同步完成，共同步 {total_synced} 个订单（{self.stats}）")
+        return total_synced
+    
+    def _fetch_unless_cancelled(
+        self,
+        cancel_event: threading.Event,
+        fetch_page: Callable[[int], Tuple[List[dict], bool]],
+        page_no: int
+    ) -> Tuple[List[dict], bool]:
+        """
+        取消信号未置位时获取一页订单，否则抛出异常结束本次同步
+        
+        Args:
+            cancel_event: 取消信号
+            fetch_page: 按页码获取一页订单的函数
+            page_no: 页码
+            
+        Returns:
+            (订单列表, 是否还有下一页)
+        """
+        if cancel_event.is_set():
+            raise Exception("同步已取消")
+        return fetch_page(page_no)
+    
+    def sync_orders_sharded(
+        self,
+        session: str,
+        start_time: datetime,
+        end_time: datetime,
+        window_hours: int = 24,
+        max_workers: int = 4,
+        split_threshold: int = 5000,
+        min_window_minutes: int = 10,
+        batch: bool = True,
+        page_size: int = 100,
+        windows: Optional[List[Tuple[datetime, datetime]]] = None
+    ) -> Tuple[int, List[Tuple[datetime, datetime]]]:
+        """
+        按时间窗口分片并行同步淘宝订单，用于大范围历史回补
+        
+        时间范围先按 window_hours 切成若干窗口，由线程池并行获取；
+        某个窗口的订单总数超过 split_threshold 时对半拆分后重新获取，
+        避免单个窗口翻页过深。写库只在当前线程进行，同一时刻最多
+        缓冲 2 * max_workers 个窗口的数据。
+        
+        Args:
+            session: 淘宝会话令牌
+            start_time: 下单开始时间
+            end_time: 下单结束时间
+            window_hours: 初始窗口长度（小时）
+            max_workers: 并行获取的线程数
+            split_threshold: 窗口订单数超过该值时继续拆分
+            min_window_minutes: 最小窗口长度（分钟），达到后不再拆分
+            batch: 是否按页批量写入
+            page_size: 每页订单数量
+            windows: 指定要同步的窗口列表（如上次失败的窗口），为空时按时间范围切分
+            
+        Returns:
+            (同步的订单数量, 失败的窗口列表)，失败窗口可通过 windows 参数重试
+        """
+        if windows is None:
+            windows = []
+            window_start = start_time
+            while window_start < end_time:
+                window_end = min(window_start + timedelta(hours=window_hours), end_time)
+                windows.append((window_start, window_end))
+                window_start = window_end
+        
+        logger.info(f"开始分片同步淘宝订单，时间范围: {start_time} - {end_time}，窗口数: {len(windows)}")
+        
+        self.stats = SyncStats()
+        started = time.perf_counter()
+        backlog = deque(windows)
+        running = {}
+        failed_windows = []
+        total_synced = 0
+        min_window = timedelta(minutes=min_window_minutes)
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="taobao-shard") as executor:
+            while backlog or running:
+                # 限制同时提交的窗口数，控制内存占用
+                while backlog and len(running) < max_workers * 2:
+                    window = backlog.popleft()
+                    future = executor.submit(
+                        self._fetch_window, session, window, page_size, split_threshold, min_window
+                    )
+                    running[future] = window
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window = running.pop(future)
+                    try:
+                        sub_windows, trades = future.result()
+                    except Exception as e:
+                        logger.error(f"获取窗口 {window[0]} - {window[1]} 的订单失败: {str(e)}")
+                        failed_windows.append(window)
+                        continue
+                    
+                    if sub_windows:
+                        backlog.extend(sub_windows)
+                        continue
+                    
+                    for i in range(0, len(trades), page_size):
+                        total_synced += self._process_page(trades[i:i + page_size], batch)
+                    logger.info(f"窗口 {window[0]} - {window[1]} 同步完成，订单数: {len(trades)}，累计: {total_synced}")
+        
+        self._record_run("sharded", started)
+        logger.info(f"分片同步完成，共同步 {total_synced} 个订单（{self.stats}），失败窗口数: {len(failed_windows)}")
+        return total_synced, failed_windows
+    
+    def replay_failed(self, limit: int = 500, max_attempts: int = sync_retry_crud.MAX_ATTEMPTS, owner: Optional[str] = None) -> int:
+        """
+        重放同步失败的订单和页
+        
+        领取到期的重试记录：订单按订单号从淘宝重新获取最新数据后批量写入
+        （不写入登记时保存的旧数据，避免覆盖之后同步进来的新数据），批量失败时逐条处理；
+        页重新获取后按正常流程写入，页内再失败的订单会单独登记。
+        成功的记录删除，失败的记录重试次数加一并按指数退避推迟；
+        数据校验不通过等永久失败直接置为失败；达到 max_attempts 的记录不再领取，
+        保留在表中供人工排查。
+        
+        Args:
+            limit: 单次最多重放的记录数
+            max_attempts: 最大重试次数
+            owner: 重试锁持有者标识，默认为 主机名:进程号
+            
+        Returns:
+            重放成功的记录数
+        """
+        owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        claimed = sync_retry_crud.claim_sync_retries(self.db, owner, limit=limit, max_attempts=max_attempts)
+        if not claimed:
+            return 0
+        
+        # 转为普通数据，后续提交/回滚不会触发重新加载
+        retries = [(retry.id, retry.kind, retry.attempts, retry.payload) for retry in claimed]
+        logger.info(f"开始重放同步失败记录，共 {len(retries)} 条")
+        
+        self.stats = SyncStats()
+        started = time.perf_counter()
+        succeeded = []
+        failures = {}
+        permanent_failures = {}
+        
+        trade_retries = []
+        for retry_id, kind, attempts, payload in retries:
+            try:
+                data = json.loads(payload)
+            except Exception as e:
+                permanent_failures[retry_id] = e
+                continue
+            
+            if kind == "trade":
+                trade_retries.append((retry_id, attempts, data))
+                continue
+            
+            try:
+                trades, _ = self._fetch_retry_page(data)
+            except Exception as e:
+                failures[retry_id] = (attempts, e)
+                continue
+            if trades:
+                self._process_page(trades, batch=True)
+            succeeded.append(retry_id)
+        
+        before = self._snapshot_stats()
+        self._replay_trades(trade_retries, succeeded, failures, permanent_failures)
+        self._record_trade_metrics(before)
+        
+        sync_retry_crud.delete_sync_retries(self.db, succeeded, owner)
+        sync_retry_crud.mark_sync_retries_failed(self.db, failures)
+        sync_retry_crud.give_up_sync_retries(self.db, permanent_failures, max_attempts)
+        
+        self._record_run("replay", started)
+        logger.info(
+            f"重放完成，成功 {len(succeeded)} 条，失败 {len(failures)} 条，"
+            f"永久失败 {len(permanent_failures)} 条（{self.stats}）"
+        )
+        return len(succeeded)
+    
+    def _replay_trades(
+        self,
+        trade_retries: List[Tuple[int, int, dict]],
+        succeeded: List[int],
+        failures: dict,
+        permanent_failures: dict
+    ) -> None:
+        """
+        按订单号重新获取最新数据后批量重放失败的订单，批量写入失败时逐条处理
+        
+        Args:
+            trade_retries: [(重试记录ID, 已重试次数, 登记时的淘宝订单数据)]
+            succeeded: 成功的重试记录ID列表（就地追加）
+            failures: 失败的重试记录 {ID: (已重试次数, 异常)}（就地追加）
+            permanent_failures: 永久失败的重试记录 {ID: 异常}（就地追加）
+        """
+        current_trades = self._refetch_trades(trade_retries, failures, permanent_failures)
+        
+        orders = []
+        valid_retries = []
+        for retry_id, attempts, trade in current_trades:
+            try:
+                orders.append(self._validate_order(self._map_taobao_order(trade)))
+                valid_retries.append((retry_id, attempts, trade))
+            except Exception as e:
+                self.stats.failed += 1
+                if self._is_permanent_error(e):
+                    permanent_failures[retry_id] = e
+                else:
+                    failures[retry_id] = (attempts, e)
+        
+        if not orders:
+            return
+        
+        try:
+            created, updated, unchanged = order_crud.bulk_upsert_orders(self.db, orders)
+            self.stats.created += created
+            self.stats.updated += updated
+            self.stats.unchanged += unchanged
+            succeeded.extend(retry_id for retry_id, _, _ in valid_retries)
+            return
+        except Exception as e:
+            logger.error(f"批量重放订单失败，改为逐条处理: {str(e)}")
+        
+        for retry_id, attempts, trade in valid_retries:
+            try:
+                outcome = self._process_taobao_order(trade)
+                setattr(self.stats, outcome, getattr(self.stats, outcome) + 1)
+                succeeded.append(retry_id)
+            except Exception as e:
+                self.db.rollback()
+                self.stats.failed += 1
+                failures[retry_id] = (attempts, e)
+    
+    def _refetch_trades(
+        self,
+        trade_retries: List[Tuple[int, int, dict]],
+        failures: dict,
+        permanent_failures: dict
+    ) -> List[Tuple[int, int, dict]]:
+        """
+        按店铺登记的会话令牌，从淘宝重新获取待重放订单的最新数据
+        
+        Args:
+            trade_retries: [(重试记录ID, 已重试次数, 登记时的淘宝订单数据)]
+            failures: 失败的重试记录 {ID: (已重试次数, 异常)}（就地追加）
+            permanent_failures: 永久失败的重试记录 {ID: 异常}（就地追加）
+            
+        Returns:
+            [(重试记录ID, 已重试次数, 最新的淘宝订单数据)]
+        """
+        by_shop = {}
+        for retry_id, attempts, trade in trade_retries:
+            tid = trade.get("tid")
+            if not tid:
+                permanent_failures[retry_id] = ValueError("订单缺少必要字段: tid")
+                continue
+            by_shop.setdefault(trade.get("seller_nick"), []).append((retry_id, attempts, int(tid)))
+        
+        current_trades = []
+        for shop_id, entries in by_shop.items():
+            try:
+                session = self._shop_session(shop_id)
+            except Exception as e:
+                for retry_id, attempts, _ in entries:
+                    failures[retry_id] = (attempts, e)
+                continue
+            
+            details = self.taobao_client.get_order_details(session, [tid for _, _, tid in entries])
+            for retry_id, attempts, tid in entries:
+                detail = details.get(tid, {})
+                trade = detail.get("trade_fullinfo_get_response", {}).get("trade")
+                if trade is None:
+                    failures[retry_id] = (attempts, Exception(f"重新获取订单 {tid} 失败: {detail.get('error_response', detail)}"))
+                    continue
+                current_trades.append((retry_id, attempts, trade))
+        return current_trades
+    
+    def _shop_session(self, shop_id: Optional[str]) -> str:
+        """
+        获取店铺在 sync_states 中登记的会话令牌
+        
+        Args:
+            shop_id: 店铺ID（卖家昵称）
+            
+        Returns:
+            会话令牌
+        """
+        state = sync_state_crud.get_sync_state(self.db, shop_id) if shop_id else None
+        if not state or not state.session_key:
+            raise Exception(f"店铺 {shop_id} 未登记会话令牌")
+        return state.session_key
+    
+    def _is_permanent_error(self, error: Exception) -> bool:
+        """
+        是否为重试也无法成功的永久失败
+        
+        订单映射和字段校验失败（缺少字段、未知的淘宝订单状态等，Pydantic 校验异常
+        也是 ValueError）不会因为重试而改变，不应进入重试队列反复重放。
+        
+        Args:
+            error: 处理订单时的异常
+            
+        Returns:
+            是否为永久失败
+        """
+        return isinstance(error, ValueError)
+    
+    def _fetch_retry_page(self, page_spec: dict) -> Tuple[List[dict], bool]:
+        """
+        按登记的参数重新获取一页订单
+        
+        Args:
+            page_spec: 页请求参数（见 _record_failed_page），会话令牌按 shop_id 从 sync_states 读取
+            
+        Returns:
+            (订单列表, 是否还有下一页)
+        """
+        fetchers = {"sold": self._fetch_page, "increment": self._fetch_increment_page}
+        fetcher = fetchers.get(page_spec.get("method"))
+        if fetcher is None:
+            raise ValueError(f"未知的页请求类型: {page_spec.get('method')}")
+        
+        return fetcher(
+            self._shop_session(page_spec.get("shop_id")),
+            page_spec["start_time"],
+            page_spec["end_time"],
+            page_spec["page_no"],
+            page_spec["page_size"]
+        )
+    
+    def _record_failed_page(self, page_spec: dict, page_no: int, error: Exception) -> None:
+        """
+        登记获取失败的页，等待重放
+        
+        会话令牌不写入重试表（重试列表可通过接口查询），重放时按 shop_id 从
+        sync_states 读取；未指定店铺的页无法重放，只记录日志。
+        
+        Args:
+            page_spec: 页请求参数：method、shop_id、start_time、end_time、page_size
+            page_no: 页码
+            error: 失败原因
+        """
+        shop_id = page_spec.get("shop_id")
+        if not shop_id:
+            logger.error(f"未指定店铺，获取失败的页 {page_no} 无法登记重试")
+            return
+        
+        key = f"page:{shop_id}:{page_spec['method']}:{page_spec['start_time']}:{page_spec['end_time']}:{page_no}:{page_spec['page_size']}"
+        entry = {
+            "kind": "page",
+            "shop_id": shop_id,
+            "dedupe_key": key,
+            "payload": json.dumps({**page_spec, "page_no": page_no}, ensure_ascii=False),
+            "last_error": str(error)
+        }
+        try:
+            sync_retry_crud.enqueue_sync_retries(self.db, [entry])
+        except Exception as e:
+            logger.error(f"登记失败页 {page_no} 失败: {str(e)}")
+    
+    def _record_failed_trades(self) -> None:
+        """登记本页处理失败的订单，等待重放；永久失败的订单只登记、不再重放"""
+        if not self._failed_trades:
+            return
+        
+        failed_trades, self._failed_trades = self._failed_trades, []
+        entries = []
+        for trade, error in failed_trades:
+            if not self._is_permanent_error(error):
+                self._track_failed_modified(trade)
+            tid = trade.get("tid") or order_crud.order_fingerprint(trade)
+            entry = {
+                "kind": "trade",
+                "shop_id": trade.get("seller_nick"),
+                "dedupe_key": f"trade:{tid}",
+                "payload": json.dumps(trade, ensure_ascii=False, default=str),
+                "last_error": str(error)
+            }
+            # 永久失败直接置为失败，不再自动重放
+            if self._is_permanent_error(error):
+                entry["attempts"] = sync_retry_crud.MAX_ATTEMPTS
+            entries.append(entry)
+        try:
+            sync_retry_crud.enqueue_sync_retries(self.db, entries)
+        except Exception as e:
+            logger.error(f"登记失败订单失败: {str(e)}")
+    
+    def _track_failed_modified(self, trade: dict) -> None:
+        """
+        记录可重试失败订单的修改时间，保留最早的一个
+        
+        Args:
+            trade: 淘宝订单数据，修改时间缺失或无法解析时按最早时间处理
+        """
+        try:
+            modified = datetime.strptime(trade.get("modified"), "%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            modified = datetime.min
+        if self._earliest_failed_modified is None or modified < self._earliest_failed_modified:
+            self._earliest_failed_modified = modified
+    
+    def _fetch_window(
+        self,
+        session: str,
+        window: Tuple[datetime, datetime],
+        page_size: int,
+        split_threshold: int,
+        min_window: timedelta
+    ) -> Tuple[List[Tuple[datetime, datetime]], List[dict]]:
+        """
+        获取一个时间窗口内的全部订单（在工作线程中执行）
+        
+        Args:
+            session: 淘宝会话令牌
+            window: (开始时间, 结束时间)
+            page_size: 每页数量
+            split_threshold: 订单数超过该值时拆分窗口
+            min_window: 最小窗口长度
+            
+        Returns:
+            (拆分后的子窗口列表, 订单列表)，需要拆分时订单列表为空
+        """
+        window_start, window_end = window
+        start_str = window_start.strftime("%Y-%m-%d %H:%M:%S")
+        end_str = window_end.strftime("%Y-%m-%d %H:%M:%S")
+        
+        # 第一页不使用 has_next，以便拿到窗口内的订单总数
+        response = self.taobao_client.get_orders(
+            session=session,
+            start_time=start_str,
+            end_time=end_str,
+            page_no=1,
+            page_size=page_size,
+            use_has_next=False
+        )
+        trades, _ = self._parse_trades_response(response, "trades_sold_get_response")
+        total_results = int(response["trades_sold_get_response"].get("total_results", len(trades)))
+        
+        if total_results > split_threshold and window_end - window_start > min_window:
+            middle = window_start + (window_end - window_start) / 2
+            return [(window_start, middle), (middle, window_end)], []
+        
+        trades = list(trades)
+        total_pages = (total_results + page_size - 1) // page_size
+        for page_no in range(2, total_pages + 1):
+            page_trades, _ = self._fetch_page(session, start_str, end_str, page_no, page_size)
+            if not page_trades:
                 break
+            trades.extend(page_trades)
+        
+        return [], trades
+    
+    def _sync_pages(
+        self,
+        fetch_page: Callable[[int], Tuple[List[dict], bool]],
+        batch: bool,
+        concurrency: int,
+        strict: bool = False,
+        on_page_error: Optional[Callable[[int, Exception], None]] = None
+    ) -> int:
+        """
+        获取并写入所有页
+        
+        Args:
+            fetch_page: 按页码获取一页订单的函数
+            batch: 是否批量写入
+            concurrency: 并发预取的页数，大于1时启用流水线模式
+            strict: 获取失败时是否抛出异常（否则记录日志后结束）
+            on_page_error: 获取失败时的回调（页码, 异常），提供时跳过失败的页继续同步
             
-            response_data = response["trades_sold_get_response"]
+        Returns:
+            同步的订单数量
+        """
+        if concurrency > 1:
+            pages = self._iter_pages_pipelined(fetch_page, concurrency, strict, on_page_error)
+        else:
+            pages = self._iter_pages(fetch_page, strict, on_page_error)
+        
+        total_synced = 0
+        for page_no, trades, has_next in pages:
+            total_synced += self._process_page(trades, batch)
+            logger.info(f"已同步 {total_synced} 个订单，当前页: {page_no}, 还有下一页: {has_next}")
+        return total_synced
+    
+    def _fetch_page(self, session: str, start_time: str, end_time: str, page_no: int, page_size: int) -> Tuple[List[dict], bool]:
+        """
+        获取一页淘宝订单
+        
+        Args:
+            session: 淘宝会话令牌
+            start_time: 开始时间
+            end_time: 结束时间
+            page_no: 页码
+            page_size: 每页数量
             
-            if "trades" not in response_data or "trade" not in response_data["trades"]:
+        Returns:
+            (订单列表, 是否还有下一页)，没有订单时返回空列表
+        """
+        response = self.taobao_client.get_orders(
+            session=session,
+            start_time=start_time,
+            end_time=end_time,
+            page_no=page_no,
+            page_size=page_size
+        )
+        return self._parse_trades_response(response, "trades_sold_get_response")
+    
+    def _fetch_increment_page(self, session: str, start_modified: str, end_modified: str, page_no: int, page_size: int) -> Tuple[List[dict], bool]:
+        """
+        按修改时间获取一页淘宝订单
+        
+        Args:
+            session: 淘宝会话令牌
+            start_modified: 修改开始时间
+            end_modified: 修改结束时间
+            page_no: 页码
+            page_size: 每页数量
+            
+        Returns:
+            (订单列表, 是否还有下一页)，没有订单时返回空列表
+        """
+        response = self.taobao_client.get_increment_orders(
+            session=session,
+            start_modified=start_modified,
+            end_modified=end_modified,
+            page_no=page_no,
+            page_size=page_size
+        )
+        return self._parse_trades_response(response, "trades_sold_increment_get_response")
+    
+    def _parse_trades_response(self, response: dict, response_key: str) -> Tuple[List[dict], bool]:
+        """
+        解析订单列表响应
+        
+        Args:
+            response: 淘宝API响应
+            response_key: 响应数据所在的键
+            
+        Returns:
+            (订单列表, 是否还有下一页)，没有订单时返回空列表
+        """
+        # 检查响应
+        if response_key not in response:
+            raise ValueError(f"响应格式错误: {response}")
+        
+        response_data = response[response_key]
+        
+        if "trades" not in response_data or "trade" not in response_data["trades"]:
+            return [], False
+        
+        return response_data["trades"]["trade"], response_data.get("has_next", False)
+    
+    def _iter_stream_trades(self, session: str, page_spec: dict) -> Iterator[dict]:
+        """
+        逐页流式获取淘宝订单，逐笔产出
+        
+        只捕获获取订单的异常：某页获取失败时登记该页等待重放并结束，
+        调用方写库抛出的异常不经过这里。
+        
+        Args:
+            session: 淘宝会话令牌
+            page_spec: 页请求参数：method、shop_id、start_time、end_time、page_size
+            
+        Yields:
+            订单数据
+        """
+        page_no = 1
+        has_next = True
+        
+        while has_next:
+            try:
+                has_next = yield from self.taobao_client.iter_trades_page(
+                    session,
+                    page_spec["start_time"],
+                    page_spec["end_time"],
+                    page_no,
+                    page_size=page_spec["page_size"]
+                )
+            except Exception as e:
+                logger.error(f"获取淘宝订单失败，当前页: {page_no}: {str(e)}")
+                self._record_failed_page(page_spec, page_no, e)
+                return
+            page_no += 1
+    
+    def _iter_pages(
+        self,
+        fetch_page: Callable[[int], Tuple[List[dict], bool]],
+        strict: bool = False,
+        on_page_error: Optional[Callable[[int, Exception], None]] = None
+    ) -> Iterator[Tuple[int, List[dict], bool]]:
+        """
+        逐页串行获取淘宝订单
+        
+        Args:
+            fetch_page: 按页码获取一页订单的函数
+            strict: 获取失败时是否抛出异常（否则记录日志后结束）
+            on_page_error: 获取失败时的回调，提供时跳过失败的页，连续失败过多才结束
+        
+        Yields:
+            (页码, 订单列表, 是否还有下一页)
+        """
+        page_no = 1
+        has_next = True
+        consecutive_failures = 0
+        
+        while has_next:
+            try:
+                trades, has_next = fetch_page(page_no)
+            except Exception as e:
+                logger.error(f"获取淘宝订单失败: {str(e)}")
+                if strict:
+                    raise
+                if on_page_error is None:
+                    break
+                on_page_error(page_no, e)
+                consecutive_failures += 1
+                if consecutive_failures >= MAX_CONSECUTIVE_PAGE_FAILURES:
+                    logger.error(f"连续 {consecutive_failures} 页获取失败，停止同步")
+                    break
+                page_no += 1
+                continue
+            
+            consecutive_failures = 0
+            if not trades:
                 logger.info(f"没有更多订单需要同步")
                 break
             
-            trades = response_data["trades"]["trade"]
+            yield page_no, trades, has_next
+            page_no += 1
+    
+    def _iter_pages_pipelined(
+        self,
+        fetch_page: Callable[[int], Tuple[List[dict], bool]],
+        concurrency: int,
+        strict: bool = False,
+        on_page_error: Optional[Callable[[int, Exception], None]] = None
+    ) -> Iterator[Tuple[int, List[dict], bool]]:
+        """
+        流水线方式获取淘宝订单
+        
+        线程池预取后续页，调用方（写库方）按页码顺序消费。
+        只有消费完一页才会补充新的预取任务，因此在途和待写的页数
+        始终不超过 concurrency，写库慢时自动形成背压。
+        由于 has_next 要拿到上一页才知道，末尾最多会多请求 concurrency-1 个空页。
+        
+        Args:
+            fetch_page: 按页码获取一页订单的函数
+            concurrency: 并发预取的页数
+            strict: 获取失败时是否抛出异常（否则记录日志后结束）
+            on_page_error: 获取失败时的回调，提供时跳过失败的页，连续失败过多才结束
+        
+        Yields:
+            (页码, 订单列表, 是否还有下一页)
+        """
+        pending = deque()
+        next_page_no = 1
+        consecutive_failures = 0
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="taobao-fetch") as executor:
+            try:
+                while True:
+                    # 补满预取窗口
+                    while len(pending) < concurrency:
+                        future = executor.submit(fetch_page, next_page_no)
+                        pending.append((next_page_no, future))
+                        next_page_no += 1
+                    
+                    page_no, future = pending.popleft()
+                    try:
+                        trades, has_next = future.result()
+                    except Exception as e:
+                        logger.error(f"获取淘宝订单失败: {str(e)}")
+                        if strict:
+                            raise
+                        if on_page_error is None:
+                            break
+                        on_page_error(page_no, e)
+                        consecutive_failures += 1
+                        if consecutive_failures >= MAX_CONSECUTIVE_PAGE_FAILURES:
+                            logger.error(f"连续 {consecutive_failures} 页获取失败，停止同步")
+                            break
+                        continue
+                    
+                    consecutive_failures = 0
+                    if not trades:
+                        logger.info(f"没有更多订单需要同步")
+                        break
+                    
+                    yield page_no, trades, has_next
+                    
+                    if not has_next:
+                        break
+            finally:
+                # 取消尚未开始的预取任务
+                for _, future in pending:
+                    future.cancel()
+    
+    def _process_page(self, trades: List[dict], batch: bool = True) -> int:
+        """
+        写入一页淘宝订单
+        
+        Args:
+            trades: 淘宝订单数据列表
+            batch: 是否批量写入
             
-            # 处理每个订单
-            for trade in trades:
-                try:
-                    self._process_taobao_order(trade)
-                    total_synced += 1
-                except Exception as e:
-                    logger.error(f"处理订单 {trade.get('tid')} 失败: {str(e)}")
+        Returns:
+            成功同步的订单数量（含未变化跳过的订单）
+        """
+        before = self._snapshot_stats()
+        started = time.perf_counter()
+        try:
+            if batch:
+                return self._process_taobao_orders(trades)
             
-            # 检查是否有下一页
-            has_next = response_data.get("has_next", False)
-            page_no += 1
+            return self._process_taobao_orders_one_by_one(trades)
+        finally:
+            SYNC_PAGE_WRITE_SECONDS.observe(time.perf_counter() - started)
+            SYNC_PAGES.inc()
+            self.stats.pages += 1
+            self._record_trade_metrics(before)
+            self._record_failed_trades()
+    
+    def _snapshot_stats(self) -> Tuple[int, int, int, int]:
+        """当前统计结果快照，用于计算增量"""
+        return self.stats.created, self.stats.updated, self.stats.unchanged, self.stats.failed
+    
+    def _record_trade_metrics(self, before: Tuple[int, int, int, int]) -> None:
+        """
+        将快照之后新增的订单处理结果计入指标
+        
+        Args:
+            before: 处理前的统计快照
+        """
+        for outcome, previous, current in zip(("created", "updated", "unchanged", "failed"), before, self._snapshot_stats()):
+            if current > previous:
+                SYNC_TRADES.labels(outcome).inc(current - previous)
+    
+    def _record_run(self, mode: str, started: float) -> None:
+        """
+        记录一次同步的耗时和吞吐
+        
+        Args:
+            mode: 同步方式：full、stream、incremental、sharded、replay
+            started: 开始时间（time.perf_counter）
+        """
+        elapsed = time.perf_counter() - started
+        SYNC_RUN_SECONDS.labels(mode).set(elapsed)
+        if elapsed > 0:
+            SYNC_RUN_THROUGHPUT.labels(mode).set(self.stats.synced / elapsed)
+            SYNC_RUN_PAGES_PER_SECOND.labels(mode).set(self.stats.pages / elapsed)
+    
+    def _process_taobao_orders_one_by_one(self, trades: List[dict]) -> int:
+        """
+        逐条处理淘宝订单
+        
+        Args:
+            trades: 淘宝订单数据列表
+            
+        Returns:
+            成功同步的订单数量（含未变化跳过的订单）
+        """
+        synced = 0
+        for trade in trades:
+            try:
+                outcome = self._process_taobao_order(trade)
+                setattr(self.stats, outcome, getattr(self.stats, outcome) + 1)
+                synced += 1
+            except Exception as e:
+                self.db.rollback()
+                self.stats.failed += 1
+                self._failed_trades.append((trade, e))
+                logger.error(f"处理订单 {trade.get('tid')} 失败: {str(e)}")
+        return synced
+    
+    def _process_taobao_orders(self, trades: List[dict]) -> int:
+        """
+        批量处理一页淘宝订单
+        
+        一次查询预取本页已存在的订单，整页在一个事务内写入；
+        批量写入失败时回退为逐条处理，避免单条坏数据拖垮整页。
+        
+        Args:
+            trades: 淘宝订单数据列表
             
-            logger.info(f"已同步 {total_synced} 个订单，当前页: {page_no-1}, 还有下一页: {has_next}")
+        Returns:
+            成功同步的订单数量（含未变化跳过的订单）
+        """
+        orders = []
+        valid_trades = []
+        for trade in trades:
+            try:
+                orders.append(self._validate_order(self._map_taobao_order(trade)))
+                valid_trades.append(trade)
+            except Exception as e:
+                self.stats.failed += 1
+                self._failed_trades.append((trade, e))
+                logger.error(f"处理订单 {trade.get('tid')} 失败: {str(e)}")
         
-        logger.info(f"订单同步完成，共同步 {total_synced} 个订单")
-        return total_synced
+        if not orders:
+            return 0
+        
+        try:
+            created, updated, unchanged = order_crud.bulk_upsert_orders(self.db, orders)
+        except Exception as e:
+            logger.error(f"批量写入订单失败，改为逐条处理: {str(e)}")
+            return self._process_taobao_orders_one_by_one(valid_trades)
+        
+        self.stats.created += created
+        self.stats.updated += updated
+        self.stats.unchanged += unchanged
+        return len(orders)
     
-    def _process_taobao_order(self, trade: dict) -> None:
+    def _validate_order(self, order_data: dict) -> dict:
         """
-        处理单个淘宝订单
+        校验订单字段（复用 Pydantic 模型），只保留同步映射的字段
+        
+        Args:
+            order_data: 订单字段字典
+            
+        Returns:
+            校验后的订单字段字典
+        """
+        order_create = order_schemas.OrderCreate(**order_data)
+        return order_create.model_dump(include=set(order_data))
+    
+    def _map_taobao_order(self, trade: dict) -> dict:
+        """
+        将淘宝订单数据转换为订单字段
         
         Args:
             trade: 淘宝订单数据
+            
+        Returns:
+            订单字段字典
         """
-        # 检查订单是否已存在
         tid = trade.get("tid")
         if not tid:
             raise ValueError("订单缺少必要字段: tid")
         
-        db_order = order_crud.get_order_by_number(self.db, order_number=str(tid))
-        
         # 转换订单状态
         status_map = {
             "WAIT_SELLER_SEND_GOODS": order_schemas.OrderStatus.WAITING_FOR_SHIPMENT,
@@ -125,7 +1124,7 @@ class OrderSyncService:
             pay_time = datetime.strptime(pay_time, "%Y-%m-%d %H:%M:%S")
         
         # 转换订单数据
-        order_data = {
+        return {
             "shop_id": trade.get("seller_nick", ""),
             "order_number": str(tid),
             "price": float(trade.get("payment", 0)),
@@ -133,12 +1132,34 @@ class OrderSyncService:
             "payment_time": pay_time,
             "remark": trade.get("buyer_message", "")
         }
+    
+    def _process_taobao_order(self, trade: dict) -> str:
+        """
+        处理单个淘宝订单
+        
+        Args:
+            trade: 淘宝订单数据
+            
+        Returns:
+            处理结果：created、updated 或 unchanged
+        """
+        order_data = self._map_taobao_order(trade)
+        fingerprint = order_crud.order_fingerprint(self._validate_order(order_data))
+        
+        # 检查订单是否已存在
+        db_order = order_crud.get_order_by_number(self.db, order_number=order_data["order_number"])
         
         if db_order:
+            if db_order.sync_fingerprint == fingerprint:
+                return "unchanged"
             # 更新现有订单
             order_update = order_schemas.OrderUpdate(**order_data)
             order_crud.update_order(self.db, db_order.id, order_update)
-        else:
-            # 创建新订单
-            order_create = order_schemas.OrderCreate(**order_data)
-            order_crud.create_order(self.db, order_create)
\ No newline at end of file
+            order_crud.set_order_fingerprint(self.db, db_order.id, fingerprint)
+            return "updated"
+        
+        # 创建新订单
+        order_create = order_schemas.OrderCreate(**order_data)
+        db_order = order_crud.create_order(self.db, order_create)
+        order_crud.set_order_fingerprint(self.db, db_order.id, fingerprint)
+        return "created"
\ No newline at end of file
@@ -0,0 +1,187 @@
+from sqlalchemy.orm import Session
+from crud import sync_state as sync_state_crud
+from services.order_sync import OrderSyncService
+from utils.taobao_client import TaobaoClient
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+import logging
+import os
+import socket
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class SyncScheduler:
+    """多店铺订单定时同步调度器"""
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        taobao_client: TaobaoClient,
+        max_concurrent_shops: int = 4,
+        poll_interval: int = 10,
+        lease_ttl: int = 120,
+        owner: Optional[str] = None,
+        replay_interval: int = 60,
+        replay_batch_size: int = 500
+    ):
+        """
+        初始化调度器
+        
+        每个进程（uvicorn worker / 副本）各运行一个调度器，店铺的同步租约保存在
+        sync_states 表中，因此同一店铺在所有进程中同一时刻只会有一个同步任务。
+        
+        Args:
+            session_factory: 数据库会话工厂，每个同步任务使用独立会话
+            taobao_client: 淘宝API客户端（线程安全，多个任务共享连接池）
+            max_concurrent_shops: 本进程同时同步的店铺数上限
+            poll_interval: 轮询到期店铺的间隔（秒），同时也是续租间隔
+            lease_ttl: 租约有效期（秒），须大于 poll_interval，进程异常退出后租约到期自动释放
+            owner: 租约持有者标识，默认为 主机名:进程号:随机串
+            replay_interval: 重放同步失败记录的间隔（秒），0 表示不重放
+            replay_batch_size: 单次重放的记录数上限
+        """
+        self.session_factory = session_factory
+        self.taobao_client = taobao_client
+        self.max_concurrent_shops = max_concurrent_shops
+        self.poll_interval = poll_interval
+        self.lease_ttl = lease_ttl
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.replay_interval = replay_interval
+        self.replay_batch_size = replay_batch_size
+        
+        # 正在同步的店铺及其取消信号，续租失败或停止调度时置位
+        self._running: Dict[str, threading.Event] = {}
+        self._running_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._replay_future = None
+        self._next_replay_at = datetime.now()
+    
+    def start(self) -> None:
+        """启动调度线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        # 多留一个线程给失败重放，不占用店铺同步的名额
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_shops + 1, thread_name_prefix="order-sync")
+        self._thread = threading.Thread(target=self._loop, name="sync-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"订单同步调度器已启动: {self.owner}")
+    
+    def stop(self) -> None:
+        """停止调度，通知正在执行的同步任务在获取下一页前结束，并等待其退出"""
+        self._stop_event.set()
+        with self._running_lock:
+            for cancel_event in self._running.values():
+                cancel_event.set()
+        if self._thread:
+            self._thread.join()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+        logger.info(f"订单同步调度器已停止: {self.owner}")
+    
+    def _loop(self) -> None:
+        """调度主循环"""
+        while not self._stop_event.is_set():
+            try:
+                self._tick()
+            except Exception as e:
+                logger.error(f"订单同步调度失败: {str(e)}")
+            self._stop_event.wait(self.poll_interval)
+    
+    def _tick(self) -> None:
+        """为本进程正在同步的店铺续租，领取到期的店铺，并按间隔触发失败重放"""
+        self._schedule_replay()
+        
+        db = self.session_factory()
+        try:
+            with self._running_lock:
+                running_shops = list(self._running)
+            
+            # 续租，防止长时间同步期间租约过期被其他进程抢走；
+            # 续期失败说明租约可能已被其他进程接手，通知本进程的任务停止，避免两个进程同时同步
+            for shop_id in running_shops:
+                if not sync_state_crud.acquire_sync_lease(db, shop_id, self.owner, self.lease_ttl):
+                    logger.warning(f"店铺 {shop_id} 的同步租约续期失败，停止本进程的同步任务")
+                    with self._running_lock:
+                        cancel_event = self._running.get(shop_id)
+                    if cancel_event:
+                        cancel_event.set()
+            
+            free_slots = self.max_concurrent_shops - len(running_shops)
+            if free_slots <= 0:
+                return
+            
+            for state in sync_state_crud.get_due_sync_states(db, datetime.now(), limit=free_slots * 2):
+                if free_slots <= 0:
+                    break
+                if state.shop_id in running_shops:
+                    continue
+                if not sync_state_crud.acquire_sync_lease(db, state.shop_id, self.owner, self.lease_ttl):
+                    # 已被其他进程领取
+                    continue
+                
+                cancel_event = threading.Event()
+                with self._running_lock:
+                    self._running[state.shop_id] = cancel_event
+                self._executor.submit(
+                    self._run_shop, state.shop_id, state.session_key, state.concurrency or 1, state.sync_interval or 300, cancel_event
+                )
+                free_slots -= 1
+        finally:
+            db.close()
+    
+    def _run_shop(self, shop_id: str, session_key: str, concurrency: int, sync_interval: int, cancel_event: threading.Event) -> None:
+        """
+        同步单个店铺（在工作线程中执行）
+        
+        Args:
+            shop_id: 店铺ID
+            session_key: 淘宝会话令牌
+            concurrency: 并发预取的页数
+            sync_interval: 同步间隔（秒）
+            cancel_event: 取消信号，续租失败或停止调度时置位
+        """
+        db = self.session_factory()
+        try:
+            service = OrderSyncService(db, self.taobao_client)
+            service.sync_incremental(session_key, shop_id, concurrency=concurrency, cancel_event=cancel_event)
+        except Exception as e:
+            logger.error(f"店铺 {shop_id} 定时同步失败: {str(e)}")
+        finally:
+            try:
+                db.rollback()
+                next_run_at = datetime.now() + timedelta(seconds=sync_interval)
+                sync_state_crud.release_sync_lease(db, shop_id, self.owner, next_run_at)
+            except Exception as e:
+                logger.error(f"释放店铺 {shop_id} 的同步租约失败: {str(e)}")
+            finally:
+                db.close()
+                with self._running_lock:
+                    self._running.pop(shop_id, None)
+    
+    def _schedule_replay(self) -> None:
+        """到达重放间隔且上一次重放已结束时，提交一次失败重放"""
+        if not self.replay_interval or datetime.now() < self._next_replay_at:
+            return
+        if self._replay_future and not self._replay_future.done():
+            return
+        
+        self._next_replay_at = datetime.now() + timedelta(seconds=self.replay_interval)
+        self._replay_future = self._executor.submit(self._run_replay)
+    
+    def _run_replay(self) -> None:
+        """重放同步失败的订单和页（在工作线程中执行）"""
+        db = self.session_factory()
+        try:
+            service = OrderSyncService(db, self.taobao_client)
+            service.replay_failed(limit=self.replay_batch_size, owner=self.owner)
+        except Exception as e:
+            logger.error(f"重放同步失败记录失败: {str(e)}")
+        finally:
+            db.close()
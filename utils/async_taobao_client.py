@@ -0,0 +1,262 @@
+import asyncio
+import copy
+import json
+import logging
+import time
+import httpx
+from typing import Dict, Any, Optional, List, Tuple
+from utils.taobao_client import (
+    BaseTaobaoClient,
+    RETRY_HTTP_STATUS,
+    TRADE_LIST_FIELDS,
+    TRADE_INCREMENT_FIELDS,
+    TRADE_DETAIL_FIELDS
+)
+from utils.metrics import TAOBAO_API_LATENCY, TAOBAO_API_REQUESTS, TAOBAO_API_RETRIES, TAOBAO_RATE_LIMIT_WAIT
+
+logger = logging.getLogger(__name__)
+
+class AsyncTaobaoClient(BaseTaobaoClient):
+    """淘宝API异步客户端，接口与 TaobaoClient 一致，可在同一事件循环上并发大量调用"""
+    
+    def __init__(self, app_key: str, app_secret: str, sandbox: bool = False, pool_size: int = 100, **kwargs):
+        """
+        初始化淘宝API异步客户端
+        
+        Args:
+            app_key: 应用Key
+            app_secret: 应用密钥
+            sandbox: 是否使用沙箱环境
+            pool_size: 最大连接数
+            **kwargs: 超时、重试与限流参数，见 BaseTaobaoClient
+        """
+        super().__init__(app_key, app_secret, sandbox, **kwargs)
+        
+        connect_timeout, read_timeout = self.timeout
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        
+        # 正在请求中的订单详情，相同订单的并发请求共用一次调用
+        self._inflight: Dict[Tuple[str, int, Optional[str]], asyncio.Task] = {}
+    
+    async def aclose(self) -> None:
+        """关闭连接池"""
+        await self.http.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+    
+    async def execute(self, method: str, params: Dict[str, Any], session: Optional[str] = None) -> Dict[str, Any]:
+        """
+        执行API请求
+        
+        Args:
+            method: API方法名
+            params: 请求参数
+            session: 会话令牌（可选）
+            
+        Returns:
+            API响应结果
+        """
+        all_params = self._build_params(method, params, session)
+        
+        limiters = self._get_limiters(session)
+        
+        attempt = 0
+        while True:
+            waited_from = time.perf_counter()
+            for limiter in limiters:
+                await limiter.acquire_async()
+            TAOBAO_RATE_LIMIT_WAIT.labels(method).observe(time.perf_counter() - waited_from)
+            
+            # 发送请求
+            try:
+                with TAOBAO_API_LATENCY.labels(method).time():
+                    response = await self.http.post(self.api_url, data=all_params)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                TAOBAO_API_REQUESTS.labels(method, "network_error").inc()
+                if attempt >= self.max_retries:
+                    raise Exception(f"请求淘宝API失败: {str(e)}")
+                await self._backoff(method, attempt, str(e))
+                attempt += 1
+                continue
+            
+            self._record_status(method, response.status_code)
+            if response.status_code in RETRY_HTTP_STATUS and attempt < self.max_retries:
+                await self._backoff(method, attempt, f"HTTP {response.status_code}")
+                attempt += 1
+                continue
+            if response.status_code != 200 and attempt >= self.max_retries:
+                raise Exception(f"请求淘宝API失败: HTTP {response.status_code}: {response.text}")
+            
+            # 解析响应
+            try:
+                result = response.json()
+            except json.JSONDecodeError:
+                raise Exception(f"解析响应失败: {response.text}")
+            
+            if response.status_code == 200:
+                self._record_result(method, result)
+            if self._is_retryable_error(result) and attempt < self.max_retries:
+                await self._backoff(method, attempt, str(result["error_response"]))
+                attempt += 1
+                continue
+            
+            return result
+    
+    async def _backoff(self, method: str, attempt: int, reason: str) -> None:
+        """
+        重试前等待（不阻塞事件循环）
+        
+        Args:
+            method: API方法名
+            attempt: 已重试次数
+            reason: 重试原因
+        """
+        delay = self._backoff_delay(attempt)
+        TAOBAO_API_RETRIES.labels(method).inc()
+        logger.warning(f"调用 {method} 失败，{delay:.2f} 秒后第 {attempt + 1} 次重试: {reason}")
+        await asyncio.sleep(delay)
+    
+    async def get_orders(self, session: str, start_time: str, end_time: str, page_no: int = 1, page_size: int = 20, use_has_next: bool = True) -> Dict[str, Any]:
+        """
+        获取淘宝订单列表
+        
+        Args:
+            session: 会话令牌
+            start_time: 开始时间（格式：YYYY-MM-DD HH:MM:SS）
+            end_time: 结束时间（格式：YYYY-MM-DD HH:MM:SS）
+            page_no: 页码
+            page_size: 每页数量
+            use_has_next: 为True时只返回 has_next，为False时返回 total_results（总数）
+            
+        Returns:
+            订单列表结果
+        """
+        method = "taobao.trades.sold.get"
+        params = {
+            "fields": TRADE_LIST_FIELDS,
+            "start_created": start_time,
+            "end_created": end_time,
+            "page_no": page_no,
+            "page_size": page_size,
+            "use_has_next": use_has_next
+        }
+        
+        return await self.execute(method, params, session)
+    
+    async def get_increment_orders(self, session: str, start_modified: str, end_modified: str, page_no: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """
+        按修改时间增量获取淘宝订单列表
+        
+        Args:
+            session: 会话令牌
+            start_modified: 修改开始时间（格式：YYYY-MM-DD HH:MM:SS）
+            end_modified: 修改结束时间（格式：YYYY-MM-DD HH:MM:SS），与开始时间跨度不能超过一天
+            page_no: 页码
+            page_size: 每页数量
+            
+        Returns:
+            订单列表结果
+        """
+        method = "taobao.trades.sold.increment.get"
+        params = {
+            "fields": TRADE_INCREMENT_FIELDS,
+            "start_modified": start_modified,
+            "end_modified": end_modified,
+            "page_no": page_no,
+            "page_size": page_size,
+            "use_has_next": True
+        }
+        
+        return await self.execute(method, params, session)
+    
+    async def get_order_detail(self, session: str, tid: int, modified: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取淘宝订单详情
+        
+        优先读取缓存；同一会话对同一订单的并发请求只会发起一次调用。
+        
+        Args:
+            session: 会话令牌
+            tid: 订单ID
+            modified: 订单修改时间（可选），传入后订单有修改即不会命中旧缓存
+            
+        Returns:
+            订单详情结果（每个调用方各自的副本）
+        """
+        cached = self._get_cached_detail(session, tid, modified)
+        if cached is not None:
+            return cached
+        
+        key = self._detail_key(session, tid, modified)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_order_detail(session, tid, modified))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # shield 避免某个调用方被取消时连带取消共享的请求
+        return copy.deepcopy(await asyncio.shield(task))
+    
+    async def _fetch_order_detail(self, session: str, tid: int, modified: Optional[str]) -> Dict[str, Any]:
+        """
+        请求订单详情并写入缓存
+        
+        Args:
+            session: 会话令牌
+            tid: 订单ID
+            modified: 订单修改时间
+            
+        Returns:
+            订单详情结果
+        """
+        method = "taobao.trade.fullinfo.get"
+        params = {
+            "fields": TRADE_DETAIL_FIELDS,
+            "tid": tid
+        }
+        
+        result = await self.execute(method, params, session)
+        self._cache_detail(session, tid, modified, result)
+        return result
+    
+    async def get_order_details(
+        self,
+        session: str,
+        tids: List[int],
+        modified: Optional[Dict[int, str]] = None,
+        max_concurrency: int = 50
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        并发批量获取淘宝订单详情
+        
+        Args:
+            session: 会话令牌
+            tids: 订单ID列表，重复的订单只请求一次
+            modified: {订单ID: 修改时间}（可选），用于判断缓存是否过期
+            max_concurrency: 最大并发请求数
+            
+        Returns:
+            {订单ID: 订单详情结果}，请求异常的订单以 error_response 形式返回
+        """
+        modified = modified or {}
+        unique_tids = list(dict.fromkeys(int(tid) for tid in tids))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch(tid: int) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await self.get_order_detail(session, tid, modified.get(tid))
+                except Exception as e:
+                    logger.error(f"获取订单 {tid} 详情失败: {str(e)}")
+                    return {"error_response": {"msg": str(e)}}
+        
+        results = await asyncio.gather(*(fetch(tid) for tid in unique_tids))
+        return dict(zip(unique_tids, results))
@@ -0,0 +1,88 @@
+import codecs
+import json
+import re
+from typing import Any, Dict, Generator, Iterable
+
+_WHITESPACE = " \t\r\n,"
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Generator[Any, None, Dict[str, Any]]:
+    """
+    增量解析JSON响应，逐个产出指定数组中的元素
+    
+    找到第一个 "key": [ 后，每解析出一个完整元素就立即产出并丢弃已解析的文本，
+    内存占用只与单个元素大小有关。数组之外的部分（外层结构、has_next 等）
+    拼接为数组为空的外层对象，作为生成器的返回值。
+    
+    Args:
+        chunks: 响应字节块
+        key: 数组所在的键，如 "trade"
+        
+    Yields:
+        数组元素
+        
+    Returns:
+        数组置空后的外层JSON对象；响应中不存在该数组时为完整的响应对象
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    chunks = iter(chunks)
+    buffer = ""
+    exhausted = False
+    
+    def read_more() -> bool:
+        nonlocal buffer, exhausted
+        for chunk in chunks:
+            if chunk:
+                buffer += utf8.decode(chunk)
+                return True
+        buffer += utf8.decode(b"", final=True)
+        exhausted = True
+        return False
+    
+    # 定位数组起始位置
+    match = pattern.search(buffer)
+    while not match:
+        if not read_more():
+            return json.loads(buffer) if buffer.strip() else {}
+        match = pattern.search(buffer)
+    
+    prefix = buffer[:match.end()]
+    buffer = buffer[match.end():]
+    pos = 0
+    
+    while True:
+        # 跳过元素之间的空白和逗号
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buffer):
+            buffer = ""
+            pos = 0
+            if not read_more():
+                raise ValueError("JSON响应不完整")
+            continue
+        
+        if buffer[pos] == "]":
+            break
+        
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            item, end = None, None
+        
+        # 元素不完整（或恰好在块末尾结束，无法确认完整）时继续读取
+        if end is None or (end == len(buffer) and not exhausted):
+            buffer = buffer[pos:]
+            pos = 0
+            if not read_more() and end is None:
+                raise ValueError("JSON响应不完整")
+            continue
+        
+        yield item
+        buffer = buffer[end:]
+        pos = 0
+    
+    # 读取剩余部分，拼出外层对象
+    while read_more():
+        pass
+    return json.loads(prefix + buffer[pos:])
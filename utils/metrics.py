@@ -0,0 +1,256 @@
+import abc
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# 默认耗时分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Metric(abc.ABC):
+    """指标基类：按标签值保存数据，线程安全"""
+    
+    type_name = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        初始化指标
+        
+        Args:
+            name: 指标名
+            documentation: 指标说明
+            labelnames: 标签名列表
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def labels(self, *values: str) -> "BoundMetric":
+        """
+        绑定标签值
+        
+        Args:
+            *values: 标签值，顺序与 labelnames 一致
+        
+        Returns:
+            绑定了标签值的指标
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}")
+        return BoundMetric(self, tuple(str(value) for value in values))
+    
+    def clear(self) -> None:
+        """清空所有标签值的数据"""
+        with self._lock:
+            self._values.clear()
+    
+    def _format_labels(self, key: Tuple[str, ...], extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = []
+        for name, value in pairs:
+            value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+            escaped.append(f'{name}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+    
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """输出各标签值的样本行（不含 HELP/TYPE）"""
+    
+    def render(self) -> str:
+        """输出 Prometheus 文本格式"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+class BoundMetric:
+    """绑定了标签值的指标"""
+    
+    def __init__(self, metric: Metric, key: Tuple[str, ...]):
+        self._metric = metric
+        self._key = key
+    
+    def __getattr__(self, name):
+        method = getattr(self._metric, f"_{name}")
+        return lambda *args, **kwargs: method(self._key, *args, **kwargs)
+
+class Counter(Metric):
+    """只增计数器"""
+    
+    type_name = "counter"
+    
+    def inc(self, amount: float = 1) -> None:
+        """无标签时直接计数"""
+        self._inc((), amount)
+    
+    def _inc(self, key: Tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {value}" for key, value in sorted(self._values.items())]
+
+class Gauge(Counter):
+    """可增可减、可直接设置的数值"""
+    
+    type_name = "gauge"
+    
+    def set(self, value: float) -> None:
+        """无标签时直接设置"""
+        self._set((), value)
+    
+    def _set(self, key: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._values[key] = value
+    
+    def replace(self, values: Dict[Tuple[str, ...], float]) -> None:
+        """
+        用一组新值整体替换所有标签值的数据
+        
+        在锁内一次性替换，并发读取的 /metrics 不会看到清空后尚未填完的中间状态。
+        
+        Args:
+            values: {标签值元组: 数值}，标签值顺序与 labelnames 一致
+        """
+        new_values = {}
+        for key, value in values.items():
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}")
+            new_values[tuple(str(part) for part in key)] = value
+        with self._lock:
+            self._values = new_values
+
+class Histogram(Metric):
+    """分桶直方图，用于耗时分布"""
+    
+    type_name = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        初始化直方图
+        
+        Args:
+            name: 指标名
+            documentation: 指标说明
+            labelnames: 标签名列表
+            buckets: 分桶上界（升序），自动追加 +Inf
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float) -> None:
+        """无标签时直接记录"""
+        self._observe((), value)
+    
+    def time(self):
+        """无标签时直接计时"""
+        return self._time(())
+    
+    def _observe(self, key: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                # [各分桶计数..., 总和, 总数]
+                data = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+    
+    @contextmanager
+    def _time(self, key: Tuple[str, ...]) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._observe(key, time.perf_counter() - started)
+    
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = sorted((key, list(data)) for key, data in self._values.items())
+        for key, data in items:
+            for bound, count in zip(self.buckets, data):
+                lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', repr(float(bound)))])} {count}")
+            lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', '+Inf')])} {data[-1]}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {data[-2]}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {data[-1]}")
+        return lines
+
+class MetricsRegistry:
+    """指标注册表"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric: Metric) -> Metric:
+        """注册指标，同名指标只注册一次"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """注册计数器"""
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """注册数值指标"""
+        return self.register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """注册直方图"""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        """输出所有指标的 Prometheus 文本格式"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+# 进程内全局注册表（多 worker 部署时每个进程各自统计）
+REGISTRY = MetricsRegistry()
+
+# 淘宝API
+TAOBAO_API_LATENCY = REGISTRY.histogram(
+    "taobao_api_request_seconds", "淘宝API单次HTTP请求耗时（不含限流等待和重试退避）", ["method"]
+)
+TAOBAO_API_REQUESTS = REGISTRY.counter(
+    "taobao_api_requests_total", "淘宝API请求次数，按结果区分：success、throttled、error、http_<状态码>、network_error", ["method", "outcome"]
+)
+TAOBAO_API_RETRIES = REGISTRY.counter(
+    "taobao_api_retries_total", "淘宝API重试次数", ["method"]
+)
+TAOBAO_RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "taobao_rate_limit_wait_seconds", "调用淘宝API前在本地限流器上等待的时间", ["method"]
+)
+
+# 订单同步
+SYNC_PAGES = REGISTRY.counter(
+    "sync_pages_total", "已写入的订单页数"
+)
+SYNC_TRADES = REGISTRY.counter(
+    "sync_trades_total", "已处理的订单数，按结果区分：created、updated、unchanged、failed", ["outcome"]
+)
+SYNC_PAGE_WRITE_SECONDS = REGISTRY.histogram(
+    "sync_page_write_seconds", "写入一页订单的数据库耗时"
+)
+SYNC_RUN_SECONDS = REGISTRY.gauge(
+    "sync_last_run_seconds", "最近一次同步的总耗时", ["mode"]
+)
+SYNC_RUN_THROUGHPUT = REGISTRY.gauge(
+    "sync_last_run_trades_per_second", "最近一次同步的吞吐（订单/秒）", ["mode"]
+)
+SYNC_RUN_PAGES_PER_SECOND = REGISTRY.gauge(
+    "sync_last_run_pages_per_second", "最近一次同步的吞吐（页/秒）", ["mode"]
+)
+SYNC_WATERMARK_LAG = REGISTRY.gauge(
+    "sync_watermark_lag_seconds", "店铺增量同步水位落后当前时间的秒数", ["shop_id"]
+)
+SYNC_RETRY_QUEUE = REGISTRY.gauge(
+    "sync_retry_queue_size", "同步失败待重试的记录数", ["kind"]
+)
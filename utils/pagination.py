@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+# 游标：(创建时间, ID)，即上一页最后一条记录的排序键
+Cursor = Tuple[datetime, int]
+
+# 返回下一页游标的响应头
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    """
+    生成不透明游标
+    
+    Args:
+        created_at: 记录创建时间
+        record_id: 记录ID
+    
+    Returns:
+        URL 安全的 base64 字符串
+    """
+    payload = json.dumps([created_at.isoformat(), record_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    解析游标
+    
+    Args:
+        cursor: encode_cursor 生成的字符串
+    
+    Returns:
+        (创建时间, ID)
+    
+    Raises:
+        ValueError: 游标格式错误
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(record_id)
+    except Exception:
+        raise ValueError(f"无效的分页游标: {cursor}")
+
+def paginate(query: Query, model: Any, skip: int = 0, limit: int = 100, after: Optional[Cursor] = None) -> Query:
+    """
+    按 (创建时间, ID) 倒序分页
+    
+    提供游标时只取排在游标之后的记录（键集分页），沿 created_at 索引定位，
+    耗时与翻页深度无关；否则按 skip 偏移，兼容旧的调用方式。两种方式排序一致，可混用。
+    
+    Args:
+        query: 已加好过滤条件的查询
+        model: 模型类，需有 created_at 和 id 字段
+        skip: 偏移量（未提供游标时使用）
+        limit: 每页数量
+        after: 上一页最后一条记录的游标
+    
+    Returns:
+        分页后的查询
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if after is None:
+        return query.offset(skip).limit(limit)
+    
+    created_at, record_id = after
+    return query.filter(or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < record_id)
+    )).limit(limit)
+
+def next_cursor(items: List[Any], limit: int) -> Optional[str]:
+    """
+    根据本页结果生成下一页游标
+    
+    Args:
+        items: 本页记录
+        limit: 每页数量
+    
+    Returns:
+        下一页游标，本页不满说明已是最后一页，返回 None
+    """
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
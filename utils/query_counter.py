@@ -0,0 +1,30 @@
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryCounter:
+    """统计引擎上执行的SQL语句数，用法：with QueryCounter(engine) as counter: ..."""
+    
+    def __init__(self, engine: Engine):
+        """
+        初始化语句计数器
+        
+        Args:
+            engine: 数据库引擎
+        """
+        self.engine = engine
+        self.count = 0
+        self.statements = []
+        self._lock = threading.Lock()
+    
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+            self.statements.append(statement)
+    
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+
+# 进程内最多保留的限流器数量（按会话限流时每个店铺会话一个），超出时淘汰最久未使用的
+MAX_LIMITERS = 10000
+
+class QuotaExceededError(Exception):
+    """当日调用配额已用完"""
+    pass
+
+class TokenBucketLimiter:
+    """令牌桶限流器，线程安全，同时支持同步和异步等待"""
+    
+    def __init__(self, rate: Optional[float], capacity: Optional[float] = None, daily_quota: Optional[int] = None):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate: 每秒补充的令牌数（即每秒调用上限），为空表示只限制每日配额
+            capacity: 桶容量（允许的突发调用数），默认等于 rate
+            daily_quota: 每日调用上限，为空表示不限制
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate or 1, 1)
+        self.daily_quota = daily_quota
+        
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._day = date.today()
+        self._day_count = 0
+        self._lock = threading.Lock()
+    
+    def matches(self, rate: Optional[float], capacity: Optional[float] = None, daily_quota: Optional[int] = None) -> bool:
+        """是否与给定的限流参数一致（capacity 为空时按默认值比较）"""
+        capacity = capacity if capacity is not None else max(rate or 1, 1)
+        return (self.rate, self.capacity, self.daily_quota) == (rate, capacity, daily_quota)
+    
+    def _reserve(self) -> float:
+        """
+        预占一个令牌
+        
+        令牌不足时允许余额为负，返回需要等待的秒数，
+        这样并发调用方按到达顺序排队，无需轮询。
+        
+        Returns:
+            需要等待的秒数
+        """
+        with self._lock:
+            if self.daily_quota is not None:
+                today = date.today()
+                if today != self._day:
+                    self._day = today
+                    self._day_count = 0
+                if self._day_count >= self.daily_quota:
+                    raise QuotaExceededError(f"当日调用次数已达上限: {self.daily_quota}")
+                self._day_count += 1
+            
+            if not self.rate:
+                return 0
+            
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+    
+    def acquire(self) -> None:
+        """获取一个令牌（阻塞等待）"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self) -> None:
+        """获取一个令牌（异步等待，不阻塞事件循环）"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+# 全局限流器，按 key（如 app_key 或 app_key:会话摘要）共享，按最近使用排序
+_limiters: "OrderedDict[str, TokenBucketLimiter]" = OrderedDict()
+_limiters_lock = threading.Lock()
+
+def get_limiter(key: str, rate: Optional[float], capacity: Optional[float] = None, daily_quota: Optional[int] = None) -> TokenBucketLimiter:
+    """
+    获取共享的限流器，同一个 key 在进程内只创建一次
+    
+    限流器只在本进程内计数，多进程部署时需由调用方按进程数分摊上限（见 BaseTaobaoClient 的 process_count）。
+    同一个 key 再次获取时参数必须与首次一致，否则抛出异常，避免先创建者的配置悄悄生效。
+    数量超过 MAX_LIMITERS 时淘汰最久未使用、且没有每日配额的限流器：长时间未使用的令牌桶
+    已经补满，淘汰后重新创建不影响限流；带每日配额的限流器保留，当日计数不会丢失。
+    
+    Args:
+        key: 限流维度，如 app_key 或 app_key:会话摘要
+        rate: 每秒调用上限
+        capacity: 桶容量
+        daily_quota: 每日调用上限
+        
+    Returns:
+        限流器
+    
+    Raises:
+        ValueError: 该 key 已按不同的参数创建过限流器
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is not None:
+            if not limiter.matches(rate, capacity, daily_quota):
+                raise ValueError(
+                    f"限流器 {key} 已按 rate={limiter.rate}, capacity={limiter.capacity}, "
+                    f"daily_quota={limiter.daily_quota} 创建，不能改为 rate={rate}, capacity={capacity}, daily_quota={daily_quota}"
+                )
+            _limiters.move_to_end(key)
+            return limiter
+        
+        limiter = TokenBucketLimiter(rate, capacity, daily_quota)
+        _limiters[key] = limiter
+        if len(_limiters) > MAX_LIMITERS:
+            _evict_limiters()
+        return limiter
+
+def _evict_limiters() -> None:
+    """从最久未使用的开始淘汰没有每日配额的限流器，直到数量不超过 MAX_LIMITERS（调用方持有锁）"""
+    excess = len(_limiters) - MAX_LIMITERS
+    for key in [key for key, limiter in _limiters.items() if limiter.daily_quota is None][:excess]:
+        del _limiters[key]
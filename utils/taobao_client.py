@@ -3,13 +3,80 @@ import json
 import hmac
 import hashlib
 import time
-from typing import Dict, Any, Optional
+import random
+import logging
+import threading
+import copy
+from typing import Dict, Any, Optional, Tuple, List, Generator, Iterator
 from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
+from concurrent.futures import Future, ThreadPoolExecutor
+from utils.rate_limiter import TokenBucketLimiter, get_limiter
+from utils.cache import TTLCache
+from utils.json_stream import iter_json_array
+from utils.metrics import TAOBAO_API_LATENCY, TAOBAO_API_REQUESTS, TAOBAO_API_RETRIES, TAOBAO_RATE_LIMIT_WAIT
 
-class TaobaoClient:
-    """淘宝API客户端"""
+logger = logging.getLogger(__name__)
+
+# 可重试的HTTP状态码
+RETRY_HTTP_STATUS = {429, 500, 502, 503, 504}
+
+# 可重试的淘宝错误码：7 调用频率超限，10 服务暂不可用
+RETRY_ERROR_CODES = {7, 10}
+
+# 可重试的淘宝子错误码前缀：isp.* 为平台内部错误，accesscontrol.* 为流控
+RETRY_SUB_CODE_PREFIXES = ("isp.", "accesscontrol.")
+
+# 订单列表字段
+TRADE_LIST_FIELDS = (
+    "tid,title,type,status,payment,discount_fee,adjust_fee,post_fee,total_fee,"
+    "pay_time,end_time,created,seller_nick,buyer_nick,buyer_message,"
+    "receiver_name,receiver_state,receiver_city,receiver_district,"
+    "receiver_address,receiver_zip,receiver_mobile,receiver_phone"
+)
+
+# 增量订单列表字段
+TRADE_INCREMENT_FIELDS = (
+    "tid,title,type,status,payment,discount_fee,adjust_fee,post_fee,total_fee,"
+    "pay_time,end_time,created,modified,seller_nick,buyer_nick,buyer_message,"
+    "receiver_name,receiver_state,receiver_city,receiver_district,"
+    "receiver_address,receiver_zip,receiver_mobile,receiver_phone"
+)
+
+# 同步订单所需的最少字段，用于减小列表响应体积
+TRADE_SYNC_FIELDS = "tid,status,payment,pay_time,created,modified,seller_nick,buyer_message"
+
+# 订单详情字段
+TRADE_DETAIL_FIELDS = (
+    "tid,title,type,status,payment,discount_fee,adjust_fee,post_fee,total_fee,"
+    "pay_time,end_time,created,seller_nick,buyer_nick,buyer_message,"
+    "receiver_name,receiver_state,receiver_city,receiver_district,"
+    "receiver_address,receiver_zip,receiver_mobile,receiver_phone,"
+    "orders.item_meal_name,orders.title,orders.price,orders.num,orders.total_fee,"
+    "orders.payment,orders.discount_fee,orders.adjust_fee,orders.status,"
+    "orders.sku_properties_name,orders.refund_status,orders.outer_iid,orders.outer_sku_id,"
+    "orders.seller_type"
+)
+
+class BaseTaobaoClient:
+    """淘宝API客户端基类：签名、参数构建、重试判断与限流，不含网络传输"""
     
-    def __init__(self, app_key: str, app_secret: str, sandbox: bool = False):
+    def __init__(
+        self,
+        app_key: str,
+        app_secret: str,
+        sandbox: bool = False,
+        timeout: Tuple[float, float] = (5, 30),
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30,
+        rate_limit: Optional[float] = None,
+        daily_quota: Optional[int] = None,
+        session_rate_limit: Optional[float] = None,
+        detail_cache_size: int = 1000,
+        detail_cache_ttl: float = 300,
+        process_count: int = 1
+    ):
         """
         初始化淘宝API客户端
         
@@ -17,15 +84,101 @@ class TaobaoClient:
             app_key: 应用Key
             app_secret: 应用密钥
             sandbox: 是否使用沙箱环境
+            timeout: (连接超时, 读取超时)，单位秒
+            max_retries: 遇到网络错误、网关错误或限流时的最大重试次数
+            backoff_factor: 指数退避的基数（秒），第n次重试等待 backoff_factor * 2^n
+            max_backoff: 单次退避的最长等待时间（秒）
+            rate_limit: 应用每秒调用上限，为空表示不限流
+            daily_quota: 应用每日调用上限，为空表示不限制
+            session_rate_limit: 每个会话（店铺）每秒调用上限，为空表示不限流
+            detail_cache_size: 订单详情缓存的最大条目数，为0表示不缓存
+            detail_cache_ttl: 订单详情缓存的有效期（秒）
+            process_count: 使用同一 app_key 的进程数（如 uvicorn worker 数 × 副本数），限流器只在进程内计数，
+                应用级每秒上限和每日配额按进程数均分；会话级上限不分摊（同一店铺同一时刻只由一个进程同步）
         """
         self.app_key = app_key
         self.app_secret = app_secret
         self.sandbox = sandbox
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.session_rate_limit = session_rate_limit
         
         if sandbox:
             self.api_url = "https://gw.api.tbsandbox.com/router/rest"
         else:
             self.api_url = "https://eco.taobao.com/router/rest"
+        
+        # 同一 app_key 的所有客户端实例共享限流器，多进程部署时各进程只使用自己的份额
+        self.rate_limiter = None
+        if rate_limit or daily_quota:
+            self.rate_limiter = get_limiter(
+                app_key,
+                rate_limit / process_count if rate_limit else None,
+                daily_quota=max(daily_quota // process_count, 1) if daily_quota else None
+            )
+        
+        # 订单详情缓存，按 (会话, tid, 修改时间) 区分：详情含买家信息，只能返回给有权访问的同一会话
+        self.detail_cache = TTLCache(detail_cache_size, detail_cache_ttl) if detail_cache_size > 0 else None
+    
+    def _detail_key(self, session: str, tid: int, modified: Optional[str]) -> Tuple[str, int, Optional[str]]:
+        """
+        订单详情缓存和并发去重的键
+        
+        包含会话令牌的摘要（不在内存中以明文作键），不同店铺会话之间不会共享详情结果。
+        """
+        session_digest = hashlib.sha256((session or "").encode("utf-8")).hexdigest()
+        return session_digest, int(tid), modified
+    
+    def _get_cached_detail(self, session: str, tid: int, modified: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的订单详情
+        
+        Args:
+            session: 会话令牌
+            tid: 订单ID
+            modified: 订单修改时间，为空时仅按有效期判断新鲜度
+            
+        Returns:
+            订单详情结果的副本，未命中时返回 None
+        """
+        if self.detail_cache is None:
+            return None
+        cached = self.detail_cache.get(self._detail_key(session, tid, modified))
+        return copy.deepcopy(cached) if cached is not None else None
+    
+    def _cache_detail(self, session: str, tid: int, modified: Optional[str], result: Dict[str, Any]) -> None:
+        """
+        缓存订单详情（保存副本），只缓存包含订单详情的成功响应
+        
+        Args:
+            session: 会话令牌
+            tid: 订单ID
+            modified: 订单修改时间
+            result: 订单详情结果
+        """
+        if self.detail_cache is None or "trade_fullinfo_get_response" not in result:
+            return
+        self.detail_cache.set(self._detail_key(session, tid, modified), copy.deepcopy(result))
+    
+    def _get_limiters(self, session: Optional[str]) -> List[TokenBucketLimiter]:
+        """
+        获取本次调用需要经过的限流器
+        
+        Args:
+            session: 会话令牌
+            
+        Returns:
+            限流器列表
+        """
+        limiters = []
+        if self.rate_limiter:
+            limiters.append(self.rate_limiter)
+        if session and self.session_rate_limit:
+            session_digest = hashlib.sha256(session.encode("utf-8")).hexdigest()
+            limiters.append(get_limiter(f"{self.app_key}:{session_digest}", self.session_rate_limit))
+        return limiters
     
     def generate_sign(self, params: Dict[str, Any]) -> str:
         """
@@ -55,9 +208,9 @@ class TaobaoClient:
         
         return sign
     
-    def execute(self, method: str, params: Dict[str, Any], session: Optional[str] = None) -> Dict[str, Any]:
+    def _build_params(self, method: str, params: Dict[str, Any], session: Optional[str] = None) -> Dict[str, Any]:
         """
-        执行API请求
+        构建带签名的请求参数
         
         Args:
             method: API方法名
@@ -65,7 +218,7 @@ class TaobaoClient:
             session: 会话令牌（可选）
             
         Returns:
-            API响应结果
+            完整的请求参数
         """
         # 构建公共参数
         common_params = {
@@ -85,26 +238,332 @@ class TaobaoClient:
         all_params = {**common_params, **params}
         
         # 生成签名
-        sign = self.generate_sign(all_params)
+        all_params["sign"] = self.generate_sign(all_params)
+        
+        return all_params
+    
+    def _is_retryable_error(self, result: Dict[str, Any]) -> bool:
+        """
+        判断淘宝错误响应是否为可重试的临时错误（限流、平台内部错误）
         
-        # 添加签名到参数
-        all_params["sign"] = sign
+        Args:
+            result: API响应结果
+            
+        Returns:
+            是否可重试
+        """
+        error = result.get("error_response") if isinstance(result, dict) else None
+        if not error:
+            return False
         
-        # 发送请求
-        response = requests.post(
-            self.api_url,
-            data=all_params,
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
-        )
+        if error.get("code") in RETRY_ERROR_CODES:
+            return True
         
-        # 解析响应
-        try:
-            result = response.json()
+        sub_code = str(error.get("sub_code", ""))
+        return sub_code.startswith(RETRY_SUB_CODE_PREFIXES)
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        计算第 attempt 次重试前的等待时间（指数退避加随机抖动）
+        
+        Args:
+            attempt: 已重试次数
+            
+        Returns:
+            等待秒数
+        """
+        delay = self.backoff_factor * (2 ** attempt)
+        delay += random.uniform(0, self.backoff_factor)
+        return min(delay, self.max_backoff)
+
+    def _record_status(self, method: str, status_code: int) -> None:
+        """
+        记录非 200 的HTTP响应
+        
+        Args:
+            method: API方法名
+            status_code: HTTP状态码
+        """
+        if status_code != 200:
+            TAOBAO_API_REQUESTS.labels(method, f"http_{status_code}").inc()
+    
+    def _record_result(self, method: str, result: Dict[str, Any]) -> None:
+        """
+        按响应内容记录请求结果：成功、被限流或其他业务错误
+        
+        Args:
+            method: API方法名
+            result: API响应结果
+        """
+        error = result.get("error_response") if isinstance(result, dict) else None
+        if not error:
+            outcome = "success"
+        elif error.get("code") == 7 or str(error.get("sub_code", "")).startswith("accesscontrol."):
+            outcome = "throttled"
+        else:
+            outcome = "error"
+        TAOBAO_API_REQUESTS.labels(method, outcome).inc()
+
+class TaobaoClient(BaseTaobaoClient):
+    """淘宝API客户端"""
+    
+    def __init__(self, app_key: str, app_secret: str, sandbox: bool = False, pool_size: int = 10, **kwargs):
+        """
+        初始化淘宝API客户端
+        
+        Args:
+            app_key: 应用Key
+            app_secret: 应用密钥
+            sandbox: 是否使用沙箱环境
+            pool_size: 连接池大小（并发请求数不应超过该值）
+            **kwargs: 超时、重试与限流参数，见 BaseTaobaoClient
+        """
+        super().__init__(app_key, app_secret, sandbox, **kwargs)
+        
+        # 复用连接的会话，避免每次请求重新握手
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        self.http.headers.update({
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        })
+        
+        # 正在请求中的订单详情，相同订单的并发请求共用一次调用
+        self._inflight: Dict[Tuple[str, int, Optional[str]], Future] = {}
+        self._inflight_lock = threading.Lock()
+    
+    def close(self) -> None:
+        """关闭连接池"""
+        self.http.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def execute(self, method: str, params: Dict[str, Any], session: Optional[str] = None) -> Dict[str, Any]:
+        """
+        执行API请求
+        
+        Args:
+            method: API方法名
+            params: 请求参数
+            session: 会话令牌（可选）
+            
+        Returns:
+            API响应结果
+        """
+        all_params = self._build_params(method, params, session)
+        
+        limiters = self._get_limiters(session)
+        
+        attempt = 0
+        while True:
+            waited_from = time.perf_counter()
+            for limiter in limiters:
+                limiter.acquire()
+            TAOBAO_RATE_LIMIT_WAIT.labels(method).observe(time.perf_counter() - waited_from)
+            
+            # 发送请求
+            try:
+                with TAOBAO_API_LATENCY.labels(method).time():
+                    response = self.http.post(self.api_url, data=all_params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                TAOBAO_API_REQUESTS.labels(method, "network_error").inc()
+                if attempt >= self.max_retries:
+                    raise Exception(f"请求淘宝API失败: {str(e)}")
+                self._backoff(method, attempt, str(e))
+                attempt += 1
+                continue
+            
+            self._record_status(method, response.status_code)
+            if response.status_code in RETRY_HTTP_STATUS and attempt < self.max_retries:
+                self._backoff(method, attempt, f"HTTP {response.status_code}")
+                attempt += 1
+                continue
+            if response.status_code != 200 and attempt >= self.max_retries:
+                raise Exception(f"请求淘宝API失败: HTTP {response.status_code}: {response.text}")
+            
+            # 解析响应
+            try:
+                result = response.json()
+            except json.JSONDecodeError:
+                raise Exception(f"解析响应失败: {response.text}")
+            
+            if response.status_code == 200:
+                self._record_result(method, result)
+            if self._is_retryable_error(result) and attempt < self.max_retries:
+                self._backoff(method, attempt, str(result["error_response"]))
+                attempt += 1
+                continue
+            
             return result
-        except json.JSONDecodeError:
-            raise Exception(f"解析响应失败: {response.text}")
     
-    def get_orders(self, session: str, start_time: str, end_time: str, page_no: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    def execute_stream(
+        self,
+        method: str,
+        params: Dict[str, Any],
+        session: Optional[str] = None,
+        array_key: str = "trade"
+    ) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+        """
+        以流式方式执行API请求，边接收边解析，逐个产出数组元素
+        
+        只在尚未产出任何元素时重试（网络错误、网关错误、限流），
+        避免重试导致重复产出。
+        
+        Args:
+            method: API方法名
+            params: 请求参数
+            session: 会话令牌（可选）
+            array_key: 需要逐个产出的数组所在的键
+            
+        Yields:
+            数组元素
+            
+        Returns:
+            数组置空后的响应对象（包含 has_next、error_response 等）
+        """
+        all_params = self._build_params(method, params, session)
+        
+        limiters = self._get_limiters(session)
+        
+        attempt = 0
+        while True:
+            waited_from = time.perf_counter()
+            for limiter in limiters:
+                limiter.acquire()
+            TAOBAO_RATE_LIMIT_WAIT.labels(method).observe(time.perf_counter() - waited_from)
+            
+            # 发送请求（流式响应只统计到收到响应头的耗时）
+            try:
+                with TAOBAO_API_LATENCY.labels(method).time():
+                    response = self.http.post(self.api_url, data=all_params, timeout=self.timeout, stream=True)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                TAOBAO_API_REQUESTS.labels(method, "network_error").inc()
+                if attempt >= self.max_retries:
+                    raise Exception(f"请求淘宝API失败: {str(e)}")
+                self._backoff(method, attempt, str(e))
+                attempt += 1
+                continue
+            
+            with response:
+                self._record_status(method, response.status_code)
+                if response.status_code in RETRY_HTTP_STATUS and attempt < self.max_retries:
+                    self._backoff(method, attempt, f"HTTP {response.status_code}")
+                    attempt += 1
+                    continue
+                if response.status_code != 200 and attempt >= self.max_retries:
+                    raise Exception(f"请求淘宝API失败: HTTP {response.status_code}: {response.text}")
+                
+                # 解析响应
+                try:
+                    envelope = yield from iter_json_array(response.iter_content(chunk_size=65536), array_key)
+                except ValueError as e:
+                    raise Exception(f"解析响应失败: {str(e)}")
+            
+            if response.status_code == 200:
+                self._record_result(method, envelope)
+            if self._is_retryable_error(envelope) and attempt < self.max_retries:
+                self._backoff(method, attempt, str(envelope["error_response"]))
+                attempt += 1
+                continue
+            
+            return envelope
+    
+    def iter_trades(
+        self,
+        session: str,
+        start_time: str,
+        end_time: str,
+        page_size: int = 100,
+        fields: str = TRADE_SYNC_FIELDS
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        逐笔遍历时间范围内的所有淘宝订单（自动翻页）
+        
+        每页响应边接收边解析，订单逐笔产出，内存占用与页大小无关。
+        
+        Args:
+            session: 会话令牌
+            start_time: 开始时间（格式：YYYY-MM-DD HH:MM:SS）
+            end_time: 结束时间（格式：YYYY-MM-DD HH:MM:SS）
+            page_size: 每页数量
+            fields: 需要返回的字段，默认只取同步所需字段
+            
+        Yields:
+            订单数据
+        """
+        page_no = 1
+        has_next = True
+        
+        while has_next:
+            has_next = yield from self.iter_trades_page(session, start_time, end_time, page_no, page_size, fields)
+            page_no += 1
+    
+    def iter_trades_page(
+        self,
+        session: str,
+        start_time: str,
+        end_time: str,
+        page_no: int,
+        page_size: int = 100,
+        fields: str = TRADE_SYNC_FIELDS
+    ) -> Generator[Dict[str, Any], None, bool]:
+        """
+        以流式方式逐笔产出一页淘宝订单
+        
+        Args:
+            session: 会话令牌
+            start_time: 开始时间（格式：YYYY-MM-DD HH:MM:SS）
+            end_time: 结束时间（格式：YYYY-MM-DD HH:MM:SS）
+            page_no: 页码
+            page_size: 每页数量
+            fields: 需要返回的字段，默认只取同步所需字段
+            
+        Yields:
+            订单数据
+            
+        Returns:
+            是否还有下一页
+        """
+        method = "taobao.trades.sold.get"
+        params = {
+            "fields": fields,
+            "start_created": start_time,
+            "end_created": end_time,
+            "page_no": page_no,
+            "page_size": page_size,
+            "use_has_next": True
+        }
+        envelope = yield from self.execute_stream(method, params, session)
+        
+        if "error_response" in envelope:
+            raise Exception(f"获取淘宝订单失败: {envelope['error_response']}")
+        if "trades_sold_get_response" not in envelope:
+            raise ValueError(f"响应格式错误: {envelope}")
+        
+        return envelope["trades_sold_get_response"].get("has_next", False)
+    
+    def _backoff(self, method: str, attempt: int, reason: str) -> None:
+        """
+        重试前等待
+        
+        Args:
+            method: API方法名
+            attempt: 已重试次数
+            reason: 重试原因
+        """
+        delay = self._backoff_delay(attempt)
+        TAOBAO_API_RETRIES.labels(method).inc()
+        logger.warning(f"调用 {method} 失败，{delay:.2f} 秒后第 {attempt + 1} 次重试: {reason}")
+        time.sleep(delay)
+    
+    def get_orders(self, session: str, start_time: str, end_time: str, page_no: int = 1, page_size: int = 20, use_has_next: bool = True) -> Dict[str, Any]:
         """
         获取淘宝订单列表
         
@@ -114,47 +573,124 @@ class TaobaoClient:
             end_time: 结束时间（格式：YYYY-MM-DD HH:MM:SS）
             page_no: 页码
             page_size: 每页数量
+            use_has_next: 为True时只返回 has_next，为False时返回 total_results（总数）
             
         Returns:
             订单列表结果
         """
         method = "taobao.trades.sold.get"
         params = {
-            "fields": "tid,title,type,status,payment,discount_fee,adjust_fee,post_fee,total_fee,"
-                      "pay_time,end_time,created,seller_nick,buyer_nick,buyer_message,"
-                      "receiver_name,receiver_state,receiver_city,receiver_district,"
-                      "receiver_address,receiver_zip,receiver_mobile,receiver_phone",
+            "fields": TRADE_LIST_FIELDS,
             "start_created": start_time,
             "end_created": end_time,
             "page_no": page_no,
             "page_size": page_size,
+            "use_has_next": use_has_next
+        }
+        
+        return self.execute(method, params, session)
+    
+    def get_increment_orders(self, session: str, start_modified: str, end_modified: str, page_no: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """
+        按修改时间增量获取淘宝订单列表
+        
+        Args:
+            session: 会话令牌
+            start_modified: 修改开始时间（格式：YYYY-MM-DD HH:MM:SS）
+            end_modified: 修改结束时间（格式：YYYY-MM-DD HH:MM:SS），与开始时间跨度不能超过一天
+            page_no: 页码
+            page_size: 每页数量
+            
+        Returns:
+            订单列表结果
+        """
+        method = "taobao.trades.sold.increment.get"
+        params = {
+            "fields": TRADE_INCREMENT_FIELDS,
+            "start_modified": start_modified,
+            "end_modified": end_modified,
+            "page_no": page_no,
+            "page_size": page_size,
             "use_has_next": True
         }
         
         return self.execute(method, params, session)
     
-    def get_order_detail(self, session: str, tid: int) -> Dict[str, Any]:
+    def get_order_detail(self, session: str, tid: int, modified: Optional[str] = None) -> Dict[str, Any]:
         """
         获取淘宝订单详情
         
+        优先读取缓存；同一会话对同一订单的并发请求只会发起一次调用。
+        
         Args:
             session: 会话令牌
             tid: 订单ID
+            modified: 订单修改时间（可选），传入后订单有修改即不会命中旧缓存
             
         Returns:
-            订单详情结果
+            订单详情结果（每个调用方各自的副本）
         """
-        method = "taobao.trade.fullinfo.get"
-        params = {
-            "fields": "tid,title,type,status,payment,discount_fee,adjust_fee,post_fee,total_fee,"
-                      "pay_time,end_time,created,seller_nick,buyer_nick,buyer_message,"
-                      "receiver_name,receiver_state,receiver_city,receiver_district,"
-                      "receiver_address,receiver_zip,receiver_mobile,receiver_phone,"
-                      "orders.item_meal_name,orders.title,orders.price,orders.num,orders.total_fee,"
-                      "orders.payment,orders.discount_fee,orders.adjust_fee,orders.status,"
-                      "orders.sku_properties_name,orders.refund_status,orders.outer_iid,orders.outer_sku_id,"
-                      "orders.seller_type",
-            "tid": tid
-        }
+        cached = self._get_cached_detail(session, tid, modified)
+        if cached is not None:
+            return cached
+        
+        key = self._detail_key(session, tid, modified)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not owner:
+            return copy.deepcopy(future.result())
+        
+        try:
+            method = "taobao.trade.fullinfo.get"
+            params = {
+                "fields": TRADE_DETAIL_FIELDS,
+                "tid": tid
+            }
+            result = self.execute(method, params, session)
+            self._cache_detail(session, tid, modified, result)
+            future.set_result(copy.deepcopy(result))
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
+    def get_order_details(
+        self,
+        session: str,
+        tids: List[int],
+        modified: Optional[Dict[int, str]] = None,
+        max_workers: int = 8
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        并发批量获取淘宝订单详情
+        
+        Args:
+            session: 会话令牌
+            tids: 订单ID列表，重复的订单只请求一次
+            modified: {订单ID: 修改时间}（可选），用于判断缓存是否过期
+            max_workers: 并发请求数
+            
+        Returns:
+            {订单ID: 订单详情结果}，请求异常的订单以 error_response 形式返回
+        """
+        modified = modified or {}
+        unique_tids = list(dict.fromkeys(int(tid) for tid in tids))
+        
+        def fetch(tid: int) -> Dict[str, Any]:
+            try:
+                return self.get_order_detail(session, tid, modified.get(tid))
+            except Exception as e:
+                logger.error(f"获取订单 {tid} 详情失败: {str(e)}")
+                return {"error_response": {"msg": str(e)}}
         
-        return self.execute(method, params, session)
\ No newline at end of file
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="taobao-detail") as executor:
+            results = executor.map(fetch, unique_tids)
+            return dict(zip(unique_tids, results))
\ No newline at end of file